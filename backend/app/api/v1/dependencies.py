@@ -1,9 +1,13 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, Response, status
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import AsyncIterator, Optional
+import hmac
+import uuid
 
 from app.db.session import get_db
 from app.core.config import settings
+from app.schemas.llm import LLMProvider
+from app.services.profiling import PROFILE_KINDS, profiler
 
 def get_database_session() -> Session:
     """Get database session dependency."""
@@ -27,7 +31,7 @@ def check_rate_limit(request_id: Optional[str] = None) -> bool:
 
 def validate_llm_provider(provider: str) -> str:
     """Validate LLM provider name."""
-    valid_providers = ["openai", "anthropic", "google", "groq", "huggingface"]
+    valid_providers = [provider.value for provider in LLMProvider]
     
     if provider.lower() not in valid_providers:
         raise HTTPException(
@@ -43,4 +47,45 @@ def get_storage_config() -> dict:
         "enable_json_storage": settings.ENABLE_JSON_STORAGE,
         "enable_db_storage": settings.ENABLE_DB_STORAGE,
         "json_storage_path": settings.JSON_STORAGE_PATH
-    } 
\ No newline at end of file
+    } 
+
+def require_admin(x_admin_token: Optional[str] = Header(None, alias="X-Admin-Token")) -> None:
+    """Guard admin endpoints with ADMIN_TOKEN; while it is unset they don't exist."""
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, settings.ADMIN_TOKEN):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid admin token")
+
+def requested_profile(
+    x_profile: Optional[str] = Header(None, alias="X-Profile"),
+    x_admin_token: Optional[str] = Header(None, alias="X-Admin-Token")
+) -> Optional[str]:
+    """Kind of profile an admin asked to capture of this request (X-Profile: cpu or memory)."""
+    if not x_profile:
+        return None
+    require_admin(x_admin_token)
+    if x_profile not in PROFILE_KINDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid X-Profile '{x_profile}'. Valid kinds are: {', '.join(PROFILE_KINDS)}"
+        )
+    return x_profile
+
+async def profile_request(
+    response: Response,
+    kind: Optional[str] = Depends(requested_profile)
+) -> AsyncIterator[None]:
+    """
+    Profile the request if an admin asked for it; the result is kept under
+    the id in the X-Profile-Id response header (see /api/v1/admin/profiles).
+    """
+    if kind is None:
+        yield
+        return
+    
+    if profiler.busy:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="A profile is already being captured")
+    profile_id = uuid.uuid4().hex
+    response.headers["X-Profile-Id"] = profile_id
+    async with profiler.profile(profile_id, kind):
+        yield
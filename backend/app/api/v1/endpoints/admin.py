@@ -0,0 +1,87 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse, Response
+from typing import Literal
+import uuid
+
+from app.api.v1.dependencies import require_admin
+from app.core.config import settings
+from app.services.profiling import ProfilerBusy, format_cpu_profile, profiler
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+def _profile_response(profile_id: str, result: dict, output: str, sort: str, limit: int):
+    headers = {"X-Profile-Id": profile_id}
+    if result["kind"] == "memory":
+        return {"id": profile_id, **result}
+    if output == "pstats":
+        headers["Content-Disposition"] = f'attachment; filename="{profile_id}.pstats"'
+        return Response(format_cpu_profile(result, "pstats"), media_type="application/octet-stream", headers=headers)
+    return PlainTextResponse(format_cpu_profile(result, "text", sort, limit), headers=headers)
+
+
+@router.post("/profile/cpu")
+async def profile_cpu(
+    seconds: float = Query(10.0, gt=0),
+    output: Literal["pstats", "text", "collapsed"] = Query("pstats", alias="format"),
+    interval_ms: float = Query(5.0, ge=1, le=1000, description="Sampling interval for collapsed stacks"),
+    sort: str = Query("cumulative", description="pstats sort key for text output"),
+    limit: int = Query(50, ge=1, le=1000)
+):
+    """
+    Profile this worker's CPU use for `seconds`.
+
+    `pstats` (load with pstats.Stats or snakeviz) and `text` record every
+    call on the event loop thread with cProfile. `collapsed` samples the
+    stacks of all threads instead, as input for flamegraph.pl or speedscope.
+    """
+    if seconds > settings.PROFILE_MAX_SECONDS:
+        raise HTTPException(status_code=400, detail=f"Profiles are limited to {settings.PROFILE_MAX_SECONDS} seconds")
+
+    try:
+        if output == "collapsed":
+            stacks = await profiler.sample_stacks(seconds, interval_ms / 1000)
+            return PlainTextResponse(stacks)
+
+        profile_id = uuid.uuid4().hex
+        result = await profiler.capture(profile_id, "cpu", seconds)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    return _profile_response(profile_id, result, output, sort, limit)
+
+
+@router.post("/profile/memory")
+async def profile_memory(
+    seconds: float = Query(10.0, gt=0),
+    limit: int = Query(50, ge=1, le=1000)
+):
+    """
+    Trace memory allocations in this worker for `seconds`; returns the
+    allocation sites whose usage grew most over the window.
+    """
+    if seconds > settings.PROFILE_MAX_SECONDS:
+        raise HTTPException(status_code=400, detail=f"Profiles are limited to {settings.PROFILE_MAX_SECONDS} seconds")
+
+    profile_id = uuid.uuid4().hex
+    try:
+        result = await profiler.capture(profile_id, "memory", seconds, limit)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    return {"id": profile_id, **result}
+
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(
+    profile_id: str,
+    output: Literal["pstats", "text"] = Query("pstats", alias="format"),
+    sort: str = Query("cumulative", description="pstats sort key for text output"),
+    limit: int = Query(50, ge=1, le=1000)
+):
+    """Get a profile captured for a request or workflow run (X-Profile header)."""
+    result = profiler.results.get(profile_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+
+    return _profile_response(profile_id, result, output, sort, limit)
@@ -1,20 +1,20 @@
 # backend/app/api/v1/endpoints/llm_playground.py
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import Optional, List
+import asyncio
 import json
 import uuid
 from datetime import datetime
 
+from app.api.v1.dependencies import profile_request
 from app.db.session import get_db
 from app.schemas.llm import (
     ChatRequest,
     ChatResponse,
-    StreamChunk,
     ModelInfo,
     ModelListResponse,
-    ProviderInfo,
     ProviderListResponse,
     ConversationListResponse,
     ConversationDetail,
@@ -23,71 +23,54 @@ from app.schemas.llm import (
 )
 from app.services.llm_factory import LLMFactory
 from app.services.conversation_service import ConversationService
+from app.services.conversation_writer import conversation_writer
+from app.core.cache import CachedPayload
+from app.core.responses import FastJSONResponse
+from app.services.model_registry import model_registry
+from app.services.provider_health import provider_health
+from app.services.streaming import SSEFrameEncoder, coalesce_tokens
 
 router = APIRouter()
 
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison, as If-None-Match uses; compressed responses carry W/ ETags."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+def _cached_response(request: Request, payload: CachedPayload) -> Response:
+    """Serve a pre-serialized body, or 304 if the client's copy is current."""
+    headers = {"ETag": payload.etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), payload.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=payload.body, media_type="application/json", headers=headers)
+
 @router.get("/providers", response_model=ProviderListResponse)
-async def get_available_providers():
-    """Get list of available LLM providers."""
+async def get_available_providers(request: Request):
+    """Get list of available LLM providers with their last probed health."""
     try:
-        # Get provider status from factory
-        provider_status = LLMFactory.get_provider_status()
-        
-        providers = []
-        for provider_id, status in provider_status.items():
-            # Map provider IDs to readable names
-            provider_names = {
-                "openai": "OpenAI",
-                "anthropic": "Anthropic",
-                "google": "Google",
-                "groq": "Groq",
-                "huggingface": "Hugging Face"
-            }
-            
-            provider_descriptions = {
-                "openai": "OpenAI's GPT models including GPT-4 and GPT-3.5",
-                "anthropic": "Anthropic's Claude models for conversational AI",
-                "google": "Google's Gemini models for advanced reasoning",
-                "groq": "Groq's high-speed inference with open source models",
-                "huggingface": "Hugging Face's open source language models"
-            }
-            
-            providers.append(ProviderInfo(
-                id=provider_id,
-                name=provider_names.get(provider_id, provider_id.title()),
-                description=provider_descriptions.get(provider_id, f"{provider_id.title()} LLM provider"),
-                available=status["available"],
-                configured=status["available"],  # Available means properly configured
-                error=status.get("error")
-            ))
-        
-        return ProviderListResponse(
-            providers=providers,
-            total=len(providers)
-        )
+        return _cached_response(request, provider_health.providers_payload())
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get providers: {str(e)}")
 
 @router.get("/models", response_model=ModelListResponse)
-async def get_available_models(provider: Optional[str] = Query(None, description="Filter by provider")):
+async def get_available_models(
+    request: Request,
+    provider: Optional[str] = Query(None, description="Filter by provider")
+):
     """Get list of available LLM models."""
     try:
-        if provider:
-            models = LLMFactory.get_provider_models(provider)
-        else:
-            models = LLMFactory.get_available_models()
-        
-        return ModelListResponse(
-            models=models,
-            total=len(models)
-        )
+        return _cached_response(request, model_registry.payload(provider))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get models: {str(e)}")
 
-@router.post("/chat", response_model=ChatResponse)
+@router.post("/chat", response_model=ChatResponse, dependencies=[Depends(profile_request)])
 async def chat_with_llm(
-    request: ChatRequest,
-    db: Session = Depends(get_db)
+    request: ChatRequest
 ):
     """Send a chat message to an LLM model."""
     try:
@@ -112,17 +95,17 @@ async def chat_with_llm(
             timestamp=datetime.now()
         )
         
-        # Save conversation if session_id provided
+        # Save conversation if session_id provided; queued like /stream's
+        # saves, so a snapshot queued earlier can't overwrite this one
         if request.session_id:
-            conversation_service = ConversationService(db)
-            await conversation_service.save_conversation(
+            conversation_writer.enqueue(ConversationService.conversation_record(
                 session_id=request.session_id,
                 llm_model_name=request.llm_model_name,
                 llm_model_provider=request.llm_model_provider,
                 system_prompt=request.system_prompt,
                 messages=request.messages + [assistant_message],
                 parameters=request.parameters
-            )
+            ))
         
         return ChatResponse(
             message=assistant_message,
@@ -140,64 +123,64 @@ async def chat_with_llm(
 @router.post("/stream")
 async def stream_chat_with_llm(
     request: ChatRequest,
-    db: Session = Depends(get_db)
+    frame_chars: Optional[int] = Query(None, ge=1, description="Maximum characters per event"),
+    frame_ms: Optional[int] = Query(None, ge=0, le=5000, description="Milliseconds to batch tokens into one event")
 ):
-    """Stream chat responses from an LLM model."""
+    """
+    Stream chat responses from an LLM model.
+    
+    Tokens are batched into events by size or time (overridable with
+    frame_chars and frame_ms); events keep the StreamChunk format. The
+    conversation is saved in the background, including the part of the
+    response streamed before a client disconnects.
+    """
     try:
         # Get LLM service
         llm_service = LLMFactory.get_service(request.llm_model_provider)
+        encoder = SSEFrameEncoder(request.session_id)
+        
+        def queue_save(parts: List[str]) -> None:
+            full_content = "".join(parts)
+            if not (request.session_id and full_content):
+                return
+            assistant_message = ChatMessage(
+                role=MessageRole.ASSISTANT,
+                content=full_content,
+                timestamp=datetime.now()
+            )
+            conversation_writer.enqueue(ConversationService.conversation_record(
+                session_id=request.session_id,
+                llm_model_name=request.llm_model_name,
+                llm_model_provider=request.llm_model_provider,
+                system_prompt=request.system_prompt,
+                messages=request.messages + [assistant_message],
+                parameters=request.parameters
+            ))
         
         async def generate_stream():
+            parts: List[str] = []
             try:
-                full_content = ""
-                async for chunk in llm_service.stream_chat(
+                tokens = llm_service.stream_text(
                     model_name=request.llm_model_name,
                     messages=request.messages,
                     system_prompt=request.system_prompt,
                     parameters=request.parameters
-                ):
-                    full_content += chunk.content
-                    
-                    stream_chunk = StreamChunk(
-                        content=chunk.content,
-                        finished=False,
-                        session_id=request.session_id
-                    )
-                    yield f"data: {stream_chunk.json()}\n\n"
-                
-                # Send final chunk
-                final_chunk = StreamChunk(
-                    content="",
-                    finished=True,
-                    session_id=request.session_id
                 )
-                yield f"data: {final_chunk.json()}\n\n"
+                async for piece in coalesce_tokens(tokens, frame_chars, frame_ms):
+                    parts.append(piece)
+                    yield encoder.frame(piece)
+                
+                # Save conversation if session_id provided, then send final chunk
+                queue_save(parts)
+                parts = []  # Saved; nothing left to save on a later disconnect
+                yield encoder.final_frame
                 
-                # Save conversation if session_id provided
-                if request.session_id and full_content:
-                    assistant_message = ChatMessage(
-                        role=MessageRole.ASSISTANT,
-                        content=full_content,
-                        timestamp=datetime.now()
-                    )
-                    
-                    conversation_service = ConversationService(db)
-                    await conversation_service.save_conversation(
-                        session_id=request.session_id,
-                        llm_model_name=request.llm_model_name,
-                        llm_model_provider=request.llm_model_provider,
-                        system_prompt=request.system_prompt,
-                        messages=request.messages + [assistant_message],
-                        parameters=request.parameters
-                    )
-                    
+            except (GeneratorExit, asyncio.CancelledError):
+                # Client disconnected: keep what was streamed so far
+                queue_save(parts)
+                raise
             except Exception as e:
-                error_chunk = StreamChunk(
-                    content=f"Error: {str(e)}",
-                    finished=True,
-                    session_id=request.session_id
-                )
-                yield f"data: {error_chunk.json()}\n\n"
+                yield encoder.error_frame(f"Error: {str(e)}")
         
         return StreamingResponse(
             generate_stream(),
@@ -227,7 +210,8 @@ async def get_conversations(
             page_size=page_size,
             llm_model_provider=llm_model_provider
         )
-        return result
+        # Dumped once by pydantic-core rather than validated again by FastAPI
+        return FastJSONResponse(result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get conversations: {str(e)}")
 
@@ -244,7 +228,7 @@ async def get_conversation_detail(
         if not conversation:
             raise HTTPException(status_code=404, detail="Conversation not found")
             
-        return conversation
+        return FastJSONResponse(conversation)
     except HTTPException:
         raise
     except Exception as e:
@@ -273,20 +257,22 @@ async def test_llm_connection(
     provider: str,
     model_name: Optional[str] = Query(None, description="Model name to test")
 ):
-    """Test connection to an LLM provider."""
+    """Test connection to an LLM provider, answered from a recent probe if there is one."""
     try:
         # Validate provider
-        if provider not in ["openai", "anthropic", "google", "groq", "huggingface"]:
+        if provider not in LLMFactory.get_supported_providers():
             raise HTTPException(status_code=400, detail=f"Unsupported provider: {provider}")
         
-        llm_service = LLMFactory.get_service(provider)
-        result = await llm_service.test_connection(model_name)
+        probe = await provider_health.check(provider, model_name)
+        result = bool(probe.healthy)
         
         return {
             "provider": provider,
             "model_name": model_name or "default",
             "status": "connected" if result else "failed",
-            "message": "Connection successful" if result else "Connection failed"
+            "message": "Connection successful" if result else (probe.error or "Connection failed"),
+            "latency_ms": probe.latency_ms,
+            "checked_at": probe.checked_at
         }
         
     except Exception as e:
@@ -1,15 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
 import uuid
 
-from app.db.session import get_db
+from app.core.config import settings
+from app.core.responses import FastJSONResponse
+from app.db.session import get_db, SessionLocal
 from app.schemas.prompt import (
     PromptCreate,
     PromptUpdate,
     PromptResponse,
     PromptListResponse,
     PromptVersionResponse,
+    PromptImportResponse,
     StorageConfigUpdate,
     PromptSearchRequest
 )
@@ -21,7 +25,7 @@ router = APIRouter()
 async def list_prompts(
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(50, ge=1, le=100, description="Items per page"),
-    search: Optional[str] = Query(None, description="Search query"),
+    search: Optional[str] = Query(None, description="Search query; content matches only the newest version of each name"),
     tags: Optional[List[str]] = Query(None, description="Filter by tags"),
     author: Optional[str] = Query(None, description="Filter by author"),
     is_active: Optional[bool] = Query(None, description="Filter by active status"),
@@ -39,7 +43,43 @@ async def list_prompts(
     
     prompt_service = PromptService(db)
     result = await prompt_service.search_prompts(search_request)
-    return result
+    # Dumped once by pydantic-core rather than validated again by FastAPI
+    return FastJSONResponse(result)
+
+@router.post("/bulk/import", response_model=PromptImportResponse)
+async def import_prompts(
+    request: Request,
+    chunk_size: int = Query(settings.PROMPT_IMPORT_CHUNK_SIZE, ge=1, le=10000, description="Rows per upsert batch"),
+    db: Session = Depends(get_db)
+):
+    """
+    Bulk import prompts from an NDJSON request body.
+    Existing prompts with the same name and version are overwritten.
+    """
+    prompt_service = PromptService(db)
+    return await prompt_service.import_prompts(request.stream(), chunk_size=chunk_size)
+
+@router.get("/bulk/export")
+async def export_prompts(
+    name: Optional[str] = Query(None, description="Filter by prompt name"),
+    is_active: Optional[bool] = Query(None, description="Filter by active status"),
+    batch_size: int = Query(1000, ge=1, le=10000, description="Rows fetched per cursor batch")
+):
+    """Bulk export prompts as a streamed NDJSON response."""
+    def generate_ndjson():
+        # The export outlives the request scope, so it owns its session
+        db = SessionLocal()
+        try:
+            prompt_service = PromptService(db)
+            yield from prompt_service.export_prompts(name=name, is_active=is_active, batch_size=batch_size)
+        finally:
+            db.close()
+    
+    return StreamingResponse(
+        generate_ndjson(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": "attachment; filename=prompts.ndjson"}
+    )
 
 @router.get("/{prompt_id}", response_model=PromptResponse)
 async def get_prompt(
@@ -119,17 +159,18 @@ async def delete_prompt(
 @router.get("/{prompt_id}/versions", response_model=PromptVersionResponse)
 async def get_prompt_versions(
     prompt_id: uuid.UUID,
+    include_content: bool = Query(False, description="Include the full content of each version"),
     db: Session = Depends(get_db)
 ):
     """Get all versions of a prompt by its name."""
     prompt_service = PromptService(db)
     
     # First get the prompt to find its name
-    prompt = await prompt_service.get_prompt(prompt_id)
-    if not prompt:
+    name = await prompt_service.get_prompt_name(prompt_id)
+    if not name:
         raise HTTPException(status_code=404, detail="Prompt not found")
     
-    versions = await prompt_service.get_prompt_versions(prompt.name)
+    versions = await prompt_service.get_prompt_versions(name, include_content=include_content)
     return PromptVersionResponse(
         versions=versions,
         total_versions=len(versions)
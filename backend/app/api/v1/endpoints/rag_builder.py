@@ -1,94 +1,137 @@
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Awaitable, Iterable
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, defer
 from sqlalchemy import desc
 
-from app.db.session import get_db
+from app.api.v1.dependencies import requested_profile
+from app.core.config import settings
+from app.core.responses import FastJSONResponse
+from app.core.tracing import current_span, traced
+from app.db.session import get_db, SessionLocal
 from app.db.models import Workflow, WorkflowExecution, NodeExecution
 from app.schemas.rag_builder import (
+    NodeSchema,
+    NodePosition,
+    NodeData,
+    EdgeSchema,
+    EdgeData,
     WorkflowCreate,
     WorkflowUpdate,
     WorkflowResponse,
     ExecutionRequest,
+    BatchExecutionRequest,
     WorkflowExecutionResponse,
     NodeExecutionResponse,
     ExecutionStateResponse,
     ExecutionUpdateMessage
 )
+from app.services.profiling import profiler
+from app.services.workflow.batch import BatchRow, WorkflowBatchRunner, iter_csv_rows, iter_list_rows, iter_ndjson_rows
+from app.services.workflow.compiler import ExecutionPlan, WorkflowCompileError, plan_cache
+from app.services.workflow.engine import WorkflowEngine
+from app.services.workflow.event_hub import Subscriber, execution_hub
+from app.services.workflow.run_control import ExecutionCancelled, RunControl, RunLimits, active_runs
 import json
 import asyncio
+import tempfile
 from datetime import datetime
 
 router = APIRouter()
 
-# WebSocket connection manager
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
-        self.execution_connections: Dict[str, List[WebSocket]] = {}
 
-    async def connect(self, websocket: WebSocket, execution_id: Optional[str] = None):
-        await websocket.accept()
-        self.active_connections.append(websocket)
-        
-        if execution_id:
-            if execution_id not in self.execution_connections:
-                self.execution_connections[execution_id] = []
-            self.execution_connections[execution_id].append(websocket)
-
-    def disconnect(self, websocket: WebSocket, execution_id: Optional[str] = None):
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
-        
-        if execution_id and execution_id in self.execution_connections:
-            if websocket in self.execution_connections[execution_id]:
-                self.execution_connections[execution_id].remove(websocket)
-            if not self.execution_connections[execution_id]:
-                del self.execution_connections[execution_id]
-
-    async def broadcast_execution_update(self, execution_id: str, message: dict):
-        if execution_id in self.execution_connections:
-            disconnected = []
-            for connection in self.execution_connections[execution_id]:
-                try:
-                    await connection.send_text(json.dumps(message))
-                except:
-                    disconnected.append(connection)
-            
-            # Remove disconnected connections
-            for connection in disconnected:
-                self.disconnect(connection, execution_id)
+def execution_publisher(execution_id: str):
+    """Create an engine publisher that fans updates out through the hub."""
+    async def publish(message: Dict[str, Any]):
+        # For slow subscribers, successive states of a node and partial
+        # results replace each other, while streamed tokens are concatenated
+        message_type = message.get("type")
+        if message_type == "node_output":
+            await execution_hub.publish(execution_id, message, coalesce_key=f"output:{message['node_id']}", append=True)
+        elif message_type in ("node_update", "node_partial"):
+            await execution_hub.publish(execution_id, message, coalesce_key=f"{message_type}:{message['node_id']}")
+        else:
+            await execution_hub.publish(execution_id, message)
+    return publish
 
-manager = ConnectionManager()
 
+_NODE_FIELDS = frozenset(NodeSchema.model_fields)
+_NODE_POSITION_FIELDS = frozenset(NodePosition.model_fields)
+_NODE_DATA_FIELDS = frozenset(NodeData.model_fields)
+_EDGE_FIELDS = frozenset(EdgeSchema.model_fields)
+_EDGE_DATA_FIELDS = frozenset(EdgeData.model_fields)
 
-@router.get("/workflows", response_model=List[WorkflowResponse])
-async def list_workflows(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
-):
-    """List all workflows with pagination."""
-    workflows = db.query(Workflow).order_by(desc(Workflow.updated_at)).offset(skip).limit(limit).all()
+
+def _is_dumped_graph(nodes: Any, edges: Any) -> bool:
+    """
+    Whether stored nodes and edges have exactly the fields that create and
+    update dump from the schemas, so they can be sent without validation.
+    """
+    if not isinstance(nodes, list) or not isinstance(edges, list):
+        return False
+    for node in nodes:
+        if (
+            not isinstance(node, dict)
+            or node.keys() != _NODE_FIELDS
+            or not isinstance(node["position"], dict)
+            or node["position"].keys() != _NODE_POSITION_FIELDS
+            or not isinstance(node["data"], dict)
+            or node["data"].keys() != _NODE_DATA_FIELDS
+        ):
+            return False
+    for edge in edges:
+        if not isinstance(edge, dict) or edge.keys() != _EDGE_FIELDS:
+            return False
+        if edge["data"] is not None and (not isinstance(edge["data"], dict) or edge["data"].keys() != _EDGE_DATA_FIELDS):
+            return False
+    return True
+
+
+def _workflow_body(workflow: Workflow) -> Dict[str, Any]:
+    """A workflow as WorkflowResponse JSON, building the model only for graphs stored some other way."""
+    graph_data = workflow.graph_data or {"nodes": [], "edges": []}
+    nodes = graph_data.get("nodes", [])
+    edges = graph_data.get("edges", [])
     
-    result = []
-    for workflow in workflows:
-        # Parse graph_data to extract nodes and edges
-        graph_data = workflow.graph_data or {"nodes": [], "edges": []}
-        result.append(WorkflowResponse(
+    if not _is_dumped_graph(nodes, edges):
+        # Let the schema fill in defaults (and reject what it can't read)
+        return WorkflowResponse(
             id=str(workflow.id),
             name=workflow.name,
             description=workflow.description,
-            nodes=graph_data.get("nodes", []),
-            edges=graph_data.get("edges", []),
+            nodes=nodes,
+            edges=edges,
             metadata=workflow.workflow_metadata or {},
             created_at=workflow.created_at,
             updated_at=workflow.updated_at,
             created_by=workflow.created_by
-        ))
+        ).model_dump(mode="json")
     
-    return result
+    return {
+        "id": str(workflow.id),
+        "name": workflow.name,
+        "description": workflow.description,
+        "nodes": nodes,
+        "edges": edges,
+        "metadata": workflow.workflow_metadata or {},
+        "created_at": workflow.created_at,
+        "updated_at": workflow.updated_at,
+        "created_by": workflow.created_by
+    }
+
+
+@router.get("/workflows", response_model=List[WorkflowResponse])
+async def list_workflows(
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_db)
+):
+    """List all workflows with pagination."""
+    workflows = db.query(Workflow).order_by(desc(Workflow.updated_at)).offset(skip).limit(limit).all()
+    
+    # Stored graphs go out as they are, without a model round-trip
+    return FastJSONResponse([_workflow_body(workflow) for workflow in workflows])
 
 
 @router.post("/workflows", response_model=WorkflowResponse)
@@ -140,20 +183,7 @@ async def get_workflow(
     if not workflow:
         raise HTTPException(status_code=404, detail="Workflow not found")
     
-    # Parse graph data
-    graph_data = workflow.graph_data or {"nodes": [], "edges": []}
-    
-    return WorkflowResponse(
-        id=str(workflow.id),
-        name=workflow.name,
-        description=workflow.description,
-        nodes=graph_data.get("nodes", []),
-        edges=graph_data.get("edges", []),
-        metadata=workflow.workflow_metadata or {},
-        created_at=workflow.created_at,
-        updated_at=workflow.updated_at,
-        created_by=workflow.created_by
-    )
+    return FastJSONResponse(_workflow_body(workflow))
 
 
 @router.put("/workflows/{workflow_id}", response_model=WorkflowResponse)
@@ -178,7 +208,8 @@ async def update_workflow(
     
     # Update graph data if provided
     if workflow_update.nodes is not None or workflow_update.edges is not None:
-        current_graph = workflow.graph_data or {"nodes": [], "edges": []}
+        # Copy so the JSON column registers the change
+        current_graph = dict(workflow.graph_data or {"nodes": [], "edges": []})
         
         if workflow_update.nodes is not None:
             current_graph["nodes"] = [node.dict() for node in workflow_update.nodes]
@@ -189,6 +220,7 @@ async def update_workflow(
     
     db.commit()
     db.refresh(workflow)
+    plan_cache.invalidate(workflow_id)
     
     # Parse updated graph data
     graph_data = workflow.graph_data or {"nodes": [], "edges": []}
@@ -219,6 +251,7 @@ async def delete_workflow(
     
     db.delete(workflow)
     db.commit()
+    plan_cache.invalidate(workflow_id)
     
     return {"message": "Workflow deleted successfully"}
 
@@ -227,14 +260,29 @@ async def delete_workflow(
 async def execute_workflow(
     workflow_id: UUID,
     execution_request: ExecutionRequest,
+    response: Response,
+    profile: Optional[str] = Depends(requested_profile),
     db: Session = Depends(get_db)
 ):
-    """Execute a workflow."""
-    workflow = db.query(Workflow).filter(Workflow.id == workflow_id).first()
+    """
+    Execute a workflow.
+    
+    Admins can profile the run with an X-Profile header; the profile is kept
+    under the execution id (see /api/v1/admin/profiles).
+    """
+    if profile and profiler.busy:
+        raise HTTPException(status_code=409, detail="A profile is already being captured")
+    
+    workflow = _get_workflow_for_execution(db, workflow_id)
     
     if not workflow:
         raise HTTPException(status_code=404, detail="Workflow not found")
     
+    try:
+        plan = plan_cache.get(workflow)
+    except WorkflowCompileError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
     # Create execution record
     execution = WorkflowExecution(
         workflow_id=workflow_id,
@@ -247,8 +295,10 @@ async def execute_workflow(
     db.commit()
     db.refresh(execution)
     
-    # Start async execution (in a real implementation, this would be done in background)
-    asyncio.create_task(execute_workflow_async(str(execution.id), workflow, execution_request, db))
+    # Start async execution in the background
+    start_execution(str(execution.id), plan, execution_request, profile=profile)
+    if profile:
+        response.headers["X-Profile-Id"] = str(execution.id)
     
     return WorkflowExecutionResponse(
         id=str(execution.id),
@@ -259,6 +309,107 @@ async def execute_workflow(
     )
 
 
+@router.post("/workflows/{workflow_id}/execute/batch")
+async def execute_workflow_batch(
+    workflow_id: UUID,
+    request: Request,
+    config: Optional[str] = Query(None, description="JSON execution config for file uploads"),
+    db: Session = Depends(get_db)
+):
+    """
+    Execute a workflow over many inputs.
+    
+    The body is either a JSON BatchExecutionRequest, a JSONL file
+    (application/x-ndjson) with one input object per line, or a CSV file
+    (text/csv) whose header names the input keys. Results stream back as
+    NDJSON, one line per row in completion order, followed by a summary.
+    """
+    workflow = _get_workflow_for_execution(db, workflow_id)
+    
+    if not workflow:
+        raise HTTPException(status_code=404, detail="Workflow not found")
+    
+    try:
+        plan = plan_cache.get(workflow)
+    except WorkflowCompileError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type == "application/json":
+        try:
+            batch_request = BatchExecutionRequest(**await request.json())
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        exec_config = batch_request.config or {}
+        rows = iter_list_rows(batch_request.inputs)
+    elif content_type in ("application/x-ndjson", "application/jsonl", "text/csv"):
+        try:
+            exec_config = json.loads(config) if config else {}
+        except ValueError:
+            raise HTTPException(status_code=422, detail="config must be a JSON object")
+        
+        # Spool the upload (to disk once large) so rows are parsed lazily
+        upload = tempfile.SpooledTemporaryFile(max_size=settings.WORKFLOW_BATCH_SPOOL_SIZE)
+        async for chunk in request.stream():
+            upload.write(chunk)
+        upload.seek(0)
+        rows = iter_csv_rows(upload) if content_type == "text/csv" else iter_ndjson_rows(upload)
+    else:
+        raise HTTPException(status_code=415, detail=f"Unsupported content type: {content_type}")
+    
+    # One execution record for the whole batch
+    execution = WorkflowExecution(
+        workflow_id=workflow_id,
+        status="running",
+        inputs={"batch": {"source": content_type}},
+        started_at=datetime.now()
+    )
+    db.add(execution)
+    db.commit()
+    
+    execution_id = str(execution.id)
+    control = RunControl(RunLimits.for_batch(exec_config))
+    results: asyncio.Queue = asyncio.Queue(maxsize=settings.WORKFLOW_BATCH_CONCURRENCY * 4)
+    task = asyncio.create_task(
+        execute_workflow_batch_async(execution_id, plan, rows, exec_config, control, results)
+    )
+    active_runs.register(execution_id, task, control)
+    
+    async def stream_results():
+        try:
+            yield _ndjson_line({"type": "batch_start", "execution_id": execution_id})
+            while True:
+                getter = asyncio.ensure_future(results.get())
+                await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+                if not getter.done():
+                    getter.cancel()
+                    break
+                yield _ndjson_line(getter.result())
+            while not results.empty():
+                yield _ndjson_line(results.get_nowait())
+            yield _ndjson_line(task.result())
+        finally:
+            if not task.done():
+                # The client went away
+                active_runs.cancel(execution_id, "Client disconnected")
+    
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+
+def _get_workflow_for_execution(db: Session, workflow_id: UUID) -> Optional[Workflow]:
+    """Load a workflow to run; graph_data is only fetched if its plan isn't cached."""
+    return (
+        db.query(Workflow)
+        .options(defer(Workflow.graph_data))
+        .filter(Workflow.id == workflow_id)
+        .first()
+    )
+
+
+def _ndjson_line(message: Dict[str, Any]) -> bytes:
+    return (json.dumps(message, default=str) + "\n").encode("utf-8")
+
+
 @router.get("/workflows/{workflow_id}/executions", response_model=List[WorkflowExecutionResponse])
 async def list_workflow_executions(
     workflow_id: UUID,
@@ -316,6 +467,58 @@ async def get_execution(
     )
 
 
+@router.post("/executions/{execution_id}/cancel", response_model=WorkflowExecutionResponse)
+async def cancel_execution(
+    execution_id: UUID,
+    response: Response,
+    force: bool = Query(False, description="Mark a run that no worker is running anymore as cancelled"),
+    db: Session = Depends(get_db)
+):
+    """
+    Cancel a running execution. A run owned by another worker is asked to
+    stop through the backplane and 202 is returned; it records its own
+    cancellation. Without a backplane such runs can't be reached, and only
+    `force` closes out a run known to be lost (e.g. on a restart).
+    """
+    execution = db.query(WorkflowExecution).filter(WorkflowExecution.id == execution_id).first()
+    
+    if not execution:
+        raise HTTPException(status_code=404, detail="Execution not found")
+    
+    if execution.status != "running":
+        raise HTTPException(status_code=409, detail=f"Execution is already {execution.status}")
+    
+    status = "cancelled"
+    if active_runs.cancel(str(execution_id)):
+        pass
+    elif await execution_hub.request_cancel(str(execution_id)):
+        # The owning worker stops the run and records it as cancelled
+        response.status_code = 202
+        status = execution.status
+    elif force:
+        execution.status = "cancelled"
+        execution.error_message = "Cancelled by user"
+        execution.completed_at = datetime.now()
+        db.commit()
+    else:
+        raise HTTPException(
+            status_code=409,
+            detail="Execution is not running in this worker; use force=true if it was lost"
+        )
+    
+    return WorkflowExecutionResponse(
+        id=str(execution.id),
+        workflow_id=str(execution.workflow_id),
+        status=status,
+        inputs=execution.inputs or {},
+        outputs=execution.outputs,
+        execution_time_ms=execution.execution_time_ms,
+        error_message=execution.error_message or ("Cancelled by user" if status == "cancelled" else None),
+        started_at=execution.started_at,
+        completed_at=execution.completed_at
+    )
+
+
 @router.get("/executions/{execution_id}/nodes", response_model=List[NodeExecutionResponse])
 async def get_execution_nodes(
     execution_id: UUID,
@@ -346,79 +549,187 @@ async def get_execution_nodes(
     ]
 
 
+@router.websocket("/executions/{execution_id}/subscribe")
+async def subscribe_execution_updates(
+    websocket: WebSocket,
+    execution_id: str
+):
+    """Receive real-time updates of an execution started elsewhere."""
+    await websocket.accept()
+    subscriber = execution_hub.subscribe(execution_id, websocket)
+    
+    try:
+        # Keep the connection open until the client goes away
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        execution_hub.unsubscribe(execution_id, subscriber)
+
+
 @router.websocket("/workflows/{workflow_id}/execute/stream")
 async def execute_workflow_stream(
     websocket: WebSocket,
-    workflow_id: str,
+    workflow_id: UUID,
     db: Session = Depends(get_db)
 ):
-    """Execute workflow with real-time updates via WebSocket."""
-    await manager.connect(websocket)
+    """
+    Execute a workflow with real-time updates via WebSocket.
+    
+    Client messages:
+    - {"action": "start", "inputs": {...}, "config": {...}}
+    - {"action": "pause" | "resume" | "cancel", "execution_id": "..."}
+    
+    Node state transitions, streamed LLM tokens and partial node results are
+    pushed as they are produced. Control messages are handled while the run
+    is in progress.
+    """
+    await websocket.accept()
+    subscribers: Dict[str, Subscriber] = {}
     
     try:
         while True:
-            # Wait for execution start message
             data = await websocket.receive_text()
-            message = json.loads(data)
+            try:
+                message = json.loads(data)
+            except ValueError as e:
+                await websocket.send_text(json.dumps({"type": "error", "message": f"Invalid JSON: {e}"}))
+                continue
+            if not isinstance(message, dict):
+                await websocket.send_text(json.dumps({"type": "error", "message": "Message must be a JSON object"}))
+                continue
+            action = message.get("action")
             
-            if message.get("action") == "start":
-                # Start workflow execution
-                execution_id = f"exec-{datetime.now().timestamp()}"
-                await manager.connect(websocket, execution_id)
+            if action == "start":
+                workflow = _get_workflow_for_execution(db, workflow_id)
+                if not workflow:
+                    await websocket.send_text(json.dumps({"type": "error", "message": "Workflow not found"}))
+                    continue
+                
+                try:
+                    plan = plan_cache.get(workflow)
+                except WorkflowCompileError as e:
+                    await websocket.send_text(json.dumps({"type": "error", "message": str(e)}))
+                    continue
+                
+                execution_request = ExecutionRequest(
+                    inputs=message.get("inputs") or {},
+                    config=message.get("config") or {}
+                )
+                execution = WorkflowExecution(
+                    workflow_id=workflow_id,
+                    status="running",
+                    inputs=execution_request.inputs,
+                    started_at=datetime.now()
+                )
+                db.add(execution)
+                db.commit()
                 
-                # Send initial status
-                await manager.broadcast_execution_update(execution_id, {
-                    "type": "execution_start",
+                execution_id = str(execution.id)
+                
+                # Subscribe before starting so no update is missed
+                subscribers[execution_id] = execution_hub.subscribe(execution_id, websocket)
+                start_execution(execution_id, plan, execution_request, stream_outputs=True)
+            
+            elif action in ("pause", "resume", "cancel"):
+                execution_id = message.get("execution_id") or next(reversed(subscribers), None)
+                control = active_runs.get(execution_id) if execution_id else None
+                if control is None:
+                    await websocket.send_text(json.dumps({"type": "error", "message": "Execution not running"}))
+                    continue
+                
+                if action == "pause":
+                    control.pause()
+                elif action == "resume":
+                    control.resume()
+                else:
+                    # Also interrupts in-flight provider calls
+                    active_runs.cancel(execution_id)
+                
+                await execution_hub.publish(execution_id, {
+                    "type": f"execution_{action}d" if action != "cancel" else "execution_cancel_requested",
                     "execution_id": execution_id,
-                    "workflow_id": workflow_id,
-                    "status": "running",
                     "timestamp": datetime.now().isoformat()
                 })
                 
-                # Simulate workflow execution
-                await simulate_workflow_execution(execution_id, workflow_id)
-                
     except WebSocketDisconnect:
-        manager.disconnect(websocket)
+        pass
+    finally:
+        for execution_id, subscriber in subscribers.items():
+            execution_hub.unsubscribe(execution_id, subscriber)
 
 
+def start_execution(
+    execution_id: str,
+    plan: ExecutionPlan,
+    execution_request: ExecutionRequest,
+    stream_outputs: bool = False,
+    profile: Optional[str] = None
+) -> RunControl:
+    """
+    Start a workflow run in the background and register it for cancellation.
+    With `profile` ("cpu" or "memory"), the run is profiled under its execution id.
+    """
+    control = RunControl(RunLimits.from_config(execution_request.config))
+    run = execute_workflow_async(
+        execution_id,
+        plan,
+        execution_request,
+        control=control,
+        stream_outputs=stream_outputs
+    )
+    if profile:
+        # Held from now on, so the execution id is a valid profile id; raises
+        # ProfilerBusy if another profile is being captured
+        profiler.reserve(execution_id)
+        run = _profiled(execution_id, profile, run)
+    task = asyncio.create_task(run)
+    if profile:
+        # A run cancelled before it starts never takes up its reservation
+        task.add_done_callback(lambda _: profiler.release(execution_id))
+    active_runs.register(execution_id, task, control)
+    return control
+
+
+async def _profiled(profile_id: str, kind: str, run: Awaitable[None]) -> None:
+    async with profiler.profile(profile_id, kind):
+        await run
+
+
+@traced("workflow.execute")
 async def execute_workflow_async(
     execution_id: str, 
-    workflow: Workflow, 
+    plan: ExecutionPlan, 
     execution_request: ExecutionRequest,
-    db: Session
+    control: Optional[RunControl] = None,
+    stream_outputs: bool = False
 ):
-    """Execute workflow asynchronously (placeholder implementation)."""
+    """Execute workflow asynchronously with its own database session."""
+    current_span().set_attribute("road.execution_id", execution_id)
+    config = execution_request.config or {}
+    db = SessionLocal()
+    publish = execution_publisher(execution_id)
+    
     try:
-        # Parse workflow nodes
-        graph_data = workflow.graph_data or {"nodes": [], "edges": []}
-        nodes = graph_data.get("nodes", [])
-        
         start_time = datetime.now()
         
-        # Simulate node execution
-        for node in nodes:
-            node_start = datetime.now()
-            
-            # Create node execution record
-            node_execution = NodeExecution(
-                execution_id=execution_id,
-                node_id=node.get("id"),
-                node_type=node.get("type"),
-                status="running",
-                input_data={"simulation": True}
-            )
-            db.add(node_execution)
-            db.commit()
-            
-            # Simulate processing time
-            await asyncio.sleep(1)
-            
-            # Update node execution
-            node_execution.status = "success"
-            node_execution.output_data = {"result": f"Processed {node.get('type')} node"}
-            node_execution.execution_time_ms = int((datetime.now() - node_start).total_seconds() * 1000)
-            db.commit()
+        await execution_hub.publish(execution_id, {
+            "type": "execution_start",
+            "execution_id": execution_id,
+            "status": "running",
+            "timestamp": start_time.isoformat()
+        })
+        
+        engine = WorkflowEngine(db, publish=publish)
+        outputs = await engine.run(
+            execution_id,
+            plan,
+            inputs=execution_request.inputs,
+            use_cache=config.get("use_cache", True),
+            control=control,
+            stream_outputs=stream_outputs or config.get("stream_outputs", False)
+        )
         
         # Update execution status
         execution = db.query(WorkflowExecution).filter(WorkflowExecution.id == execution_id).first()
@@ -426,47 +737,94 @@ async def execute_workflow_async(
             execution.status = "completed"
             execution.completed_at = datetime.now()
             execution.execution_time_ms = int((datetime.now() - start_time).total_seconds() * 1000)
-            execution.outputs = {"status": "completed", "nodes_processed": len(nodes)}
+            execution.outputs = outputs
             db.commit()
+        
+        await execution_hub.publish(execution_id, {
+            "type": "execution_complete",
+            "execution_id": execution_id,
+            "status": "completed",
+            "outputs": outputs,
+            "timestamp": datetime.now().isoformat()
+        })
+    
+    except (ExecutionCancelled, asyncio.CancelledError) as e:
+        db.rollback()
+        execution = db.query(WorkflowExecution).filter(WorkflowExecution.id == execution_id).first()
+        if execution:
+            execution.status = "cancelled"
+            execution.error_message = str(e) or (control.reason if control else None) or "Execution cancelled"
+            execution.completed_at = datetime.now()
+            db.commit()
+        
+        await execution_hub.publish(execution_id, {
+            "type": "execution_complete",
+            "execution_id": execution_id,
+            "status": "cancelled",
+            "timestamp": datetime.now().isoformat()
+        })
             
     except Exception as e:
         # Update execution with error
+        db.rollback()
         execution = db.query(WorkflowExecution).filter(WorkflowExecution.id == execution_id).first()
         if execution:
             execution.status = "failed"
             execution.error_message = str(e)
             execution.completed_at = datetime.now()
             db.commit()
-
-
-async def simulate_workflow_execution(execution_id: str, workflow_id: str):
-    """Simulate workflow execution with WebSocket updates."""
-    # Simulate node execution progress
-    for i in range(3):  # Simulate 3 nodes
-        await asyncio.sleep(2)
         
-        await manager.broadcast_execution_update(execution_id, {
-            "type": "node_update",
+        await execution_hub.publish(execution_id, {
+            "type": "execution_error",
             "execution_id": execution_id,
-            "node_id": f"node-{i}",
-            "status": "running",
-            "timestamp": datetime.now().isoformat()
-        })
-        
-        await asyncio.sleep(1)
-        
-        await manager.broadcast_execution_update(execution_id, {
-            "type": "node_update",
-            "execution_id": execution_id,
-            "node_id": f"node-{i}",
-            "status": "success",
+            "status": "failed",
+            "error": str(e),
             "timestamp": datetime.now().isoformat()
         })
+    finally:
+        db.close()
+
+
+async def execute_workflow_batch_async(
+    execution_id: str,
+    plan: ExecutionPlan,
+    rows: Iterable[BatchRow],
+    config: Dict[str, Any],
+    control: RunControl,
+    results: asyncio.Queue
+) -> Dict[str, Any]:
+    """Execute a batch run and return its summary message."""
+    db = SessionLocal()
+    runner = WorkflowBatchRunner(db, execution_id, plan, control, config)
+    start_time = datetime.now()
+    status, error = "completed", None
     
-    # Send completion message
-    await manager.broadcast_execution_update(execution_id, {
-        "type": "execution_complete",
+    try:
+        await runner.run(rows, results.put)
+    except (ExecutionCancelled, asyncio.CancelledError) as e:
+        db.rollback()
+        status, error = "cancelled", str(e) or control.reason or "Execution cancelled"
+    except Exception as e:
+        db.rollback()
+        status, error = "failed", str(e)
+    
+    summary = runner.summary()
+    try:
+        execution = db.query(WorkflowExecution).filter(WorkflowExecution.id == execution_id).first()
+        if execution:
+            execution.status = status
+            execution.error_message = error
+            execution.completed_at = datetime.now()
+            execution.execution_time_ms = int((datetime.now() - start_time).total_seconds() * 1000)
+            execution.outputs = summary
+            db.commit()
+    finally:
+        db.close()
+    
+    return {
+        "type": "batch_complete",
         "execution_id": execution_id,
-        "status": "completed",
-        "timestamp": datetime.now().isoformat()
-    }) 
\ No newline at end of file
+        "status": status,
+        "error": error,
+        **summary
+    }
@@ -0,0 +1,129 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
+from sqlalchemy.orm import Session
+from starlette.requests import ClientDisconnect
+from uuid import UUID
+
+from app.core.config import settings
+from app.db.models import FileUpload
+from app.db.session import get_db
+from app.schemas.upload import FileUploadCreate, FileUploadResponse
+from app.services.upload_service import UploadOffsetMismatch, UploadService, UploadTooLarge
+
+router = APIRouter()
+
+
+def _upload_response(upload: FileUpload) -> FileUploadResponse:
+    return FileUploadResponse(
+        id=str(upload.id),
+        filename=upload.filename,
+        content_type=upload.content_type,
+        size=upload.size,
+        offset=upload.received_bytes,
+        status=upload.status,
+        sha256=upload.sha256,
+        chunk_size=settings.UPLOAD_CHUNK_SIZE,
+        created_at=upload.created_at,
+        completed_at=upload.completed_at
+    )
+
+
+def _get_upload_or_404(service: UploadService, upload_id: UUID) -> FileUpload:
+    upload = service.get_upload(upload_id)
+    if not upload:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return upload
+
+
+@router.post("", response_model=FileUploadResponse)
+async def create_upload(
+    upload_data: FileUploadCreate,
+    db: Session = Depends(get_db)
+):
+    """
+    Start a chunked upload.
+
+    With a declared size the upload completes by itself once all bytes have
+    arrived. A declared sha256 must match the received content, or the
+    upload restarts at offset 0.
+    """
+    service = UploadService(db)
+    try:
+        upload = service.create_upload(upload_data)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    return _upload_response(upload)
+
+
+@router.get("/{upload_id}", response_model=FileUploadResponse)
+async def get_upload(
+    upload_id: UUID,
+    db: Session = Depends(get_db)
+):
+    """Get the state of an upload; `offset` is where to resume."""
+    service = UploadService(db)
+    return _upload_response(_get_upload_or_404(service, upload_id))
+
+
+@router.patch("/{upload_id}", response_model=FileUploadResponse)
+async def append_upload_chunk(
+    upload_id: UUID,
+    request: Request,
+    upload_offset: int = Header(..., alias="Upload-Offset", ge=0),
+    db: Session = Depends(get_db)
+):
+    """
+    Append the raw request body to an upload.
+
+    The body is streamed to disk, never held in memory as a whole.
+    Upload-Offset must equal the bytes received so far; a mismatch returns
+    409 with the current offset in the Upload-Offset header.
+    """
+    service = UploadService(db)
+    upload = _get_upload_or_404(service, upload_id)
+
+    try:
+        upload = await service.append_chunk(upload, upload_offset, request.stream())
+    except UploadOffsetMismatch as e:
+        raise HTTPException(status_code=409, detail=str(e), headers={"Upload-Offset": str(e.offset)})
+    except ClientDisconnect:
+        # Bytes that arrived are kept; the client resumes from the stored offset
+        raise HTTPException(status_code=400, detail="Client disconnected")
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    return _upload_response(upload)
+
+
+@router.post("/{upload_id}/complete", response_model=FileUploadResponse)
+async def complete_upload(
+    upload_id: UUID,
+    db: Session = Depends(get_db)
+):
+    """Complete an upload whose size was not declared up front."""
+    service = UploadService(db)
+    upload = _get_upload_or_404(service, upload_id)
+
+    try:
+        upload = await service.complete_upload(upload)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    return _upload_response(upload)
+
+
+@router.delete("/{upload_id}")
+async def delete_upload(
+    upload_id: UUID,
+    db: Session = Depends(get_db)
+):
+    """Abort or delete an upload."""
+    service = UploadService(db)
+    upload = _get_upload_or_404(service, upload_id)
+    try:
+        await service.delete_upload(upload)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    
+    return {"message": "Upload deleted successfully"}
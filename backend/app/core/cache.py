@@ -0,0 +1,87 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Hashable, Optional
+import hashlib
+
+from pydantic import BaseModel
+
+from app.core.metrics import metrics
+
+# Reported for caches created with a name
+_cache_hits = metrics.counter("road_cache_hits_total", "Lookups served from the cache", ["cache"])
+_cache_misses = metrics.counter("road_cache_misses_total", "Lookups not found in the cache", ["cache"])
+_cache_entries = metrics.gauge("road_cache_entries", "Entries held by the cache", ["cache"])
+_cache_hit_ratio = metrics.gauge("road_cache_hit_ratio", "Fraction of lookups served from the cache", ["cache"])
+
+
+class LRUCache:
+    """Small thread-safe LRU cache with hit/miss counters."""
+
+    def __init__(self, max_size: int = 256, name: Optional[str] = None):
+        self.max_size = max_size
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = Lock()
+
+        if name is not None:
+            # Read when metrics are scraped; lookups pay nothing extra
+            _cache_hits.labels(name).set_function(lambda: self.hits)
+            _cache_misses.labels(name).set_function(lambda: self.misses)
+            _cache_entries.labels(name).set_function(lambda: len(self))
+            _cache_hit_ratio.labels(name).set_function(lambda: self.hit_rate)
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """Get a cached value and mark it as recently used."""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entry if full."""
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """Remove a value from the cache."""
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def clear(self) -> None:
+        """Remove all cached values."""
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+@dataclass(frozen=True)
+class CachedPayload:
+    """A response body serialized once, with its ETag."""
+    body: bytes
+    etag: str
+
+    @classmethod
+    def of(cls, model: BaseModel) -> "CachedPayload":
+        body = model.model_dump_json().encode("utf-8")
+        return cls(body, f'"{hashlib.sha1(body).hexdigest()}"')
@@ -0,0 +1,155 @@
+# backend/app/core/compression.py
+"""
+Compression of large JSON and text responses.
+
+Responses of at least COMPRESSION_MIN_SIZE bytes are compressed with
+brotli when the client accepts it and the brotli package is installed,
+and with gzip otherwise. Streaming responses (SSE, exports) pass through
+as sent, so that events are not held back in a compressor's buffer.
+
+Compressed bodies of responses with a strong ETag, such as the cached
+model and provider lists, are kept and reused. The ETag of a compressed
+response is made weak, since its bytes differ from the uncompressed ones.
+"""
+from typing import Dict, Optional
+import asyncio
+import gzip
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "application/xml")
+
+# Never compressed: sent incrementally and read as they arrive
+STREAMING_TYPES = ("text/event-stream", "application/x-ndjson")
+
+# Larger bodies are compressed on a worker thread, so the event loop keeps serving
+OFFLOAD_SIZE = 256 * 1024
+
+_compressed_bodies = LRUCache(max_size=64, name="compressed_responses")
+
+
+def _accepted_encodings(accept_encoding: str) -> Dict[str, float]:
+    """Encodings in an Accept-Encoding header, with their q-values."""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip().lower()] = quality
+    return accepted
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """The encoding to respond with: "br", "gzip", or None for identity."""
+    accepted = _accepted_encodings(accept_encoding)
+    wildcard = accepted.get("*", 0.0)
+    if brotli is not None and accepted.get("br", wildcard) > 0:
+        return "br"
+    if accepted.get("gzip", wildcard) > 0:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+def _is_compressible(content_type: str) -> bool:
+    return content_type.startswith(COMPRESSIBLE_TYPES) and not content_type.startswith(STREAMING_TYPES)
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing complete responses above COMPRESSION_MIN_SIZE."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        start_message = None
+        passthrough = False
+
+        async def send_compressed(message) -> None:
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                # Held until the body shows whether the response is complete
+                start_message = message
+                return
+
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+
+            passthrough = True
+            if message.get("more_body", False):
+                await send(start_message)
+                await send(message)
+                return
+
+            await self._send_complete(start_message, message, encoding, send)
+
+        await self.app(scope, receive, send_compressed)
+
+    async def _send_complete(self, start_message, message, encoding: Optional[str], send) -> None:
+        body = message.get("body", b"")
+        headers = MutableHeaders(raw=start_message["headers"])
+
+        if (
+            len(body) < settings.COMPRESSION_MIN_SIZE
+            or start_message["status"] in (204, 304)
+            or "content-encoding" in headers
+            or not _is_compressible(headers.get("content-type", ""))
+        ):
+            await send(start_message)
+            await send(message)
+            return
+
+        headers.add_vary_header("Accept-Encoding")
+        if encoding is None:
+            await send(start_message)
+            await send(message)
+            return
+
+        etag = headers.get("etag")
+        cache_key = (etag, encoding) if etag and not etag.startswith("W/") else None
+        compressed = _compressed_bodies.get(cache_key) if cache_key else None
+        if compressed is None:
+            if len(body) >= OFFLOAD_SIZE:
+                compressed = await asyncio.to_thread(compress, body, encoding)
+            else:
+                compressed = compress(body, encoding)
+            if cache_key:
+                _compressed_bodies.set(cache_key, compressed)
+
+        headers["Content-Encoding"] = encoding
+        headers["Content-Length"] = str(len(compressed))
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = f"W/{etag}"
+
+        await send(start_message)
+        await send({"type": "http.response.body", "body": compressed, "more_body": False})
@@ -0,0 +1,311 @@
+# backend/app/core/metrics.py
+"""
+In-process metrics in the Prometheus text format, served at /metrics.
+
+Counters and histograms are sharded per thread: each thread updates its
+own list of numbers without locking, and shards are only summed when the
+metrics are scraped. Histogram buckets are fixed when a metric is declared,
+so an observation is a bisect and two additions. Values that already live
+elsewhere (queue lengths, cache counters) are read by callbacks at scrape
+time instead of being pushed.
+"""
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+import math
+import threading
+import time
+
+# Seconds; covers sub-millisecond cache hits to multi-minute LLM calls
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0
+)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Shards:
+    """Per-thread lists of numbers, summed on read."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._local = threading.local()
+        self._all: List[List[float]] = []
+        self._lock = threading.Lock()  # Only taken when a thread first writes
+
+    def get(self) -> List[float]:
+        try:
+            return self._local.values
+        except AttributeError:
+            values = self._local.values = [0] * self.size
+            with self._lock:
+                self._all.append(values)
+            return values
+
+    def sum(self) -> List[float]:
+        with self._lock:
+            shards = list(self._all)
+        return [sum(column) for column in zip(*shards)] if shards else [0] * self.size
+
+
+class _Value:
+    """One labelled counter or gauge."""
+
+    def __init__(self):
+        self._shards = _Shards(1)
+        self._function: Optional[Callable[[], float]] = None
+        self._set: Optional[float] = None
+
+    def inc(self, amount: float = 1) -> None:
+        self._shards.get()[0] += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self._shards.get()[0] -= amount
+
+    def set(self, value: float) -> None:
+        self._set = value
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Read the value from `function` whenever metrics are scraped."""
+        self._function = function
+
+    def get(self) -> float:
+        if self._function is not None:
+            return self._function()
+        base = self._set if self._set is not None else 0
+        return base + self._shards.sum()[0]
+
+
+class _HistogramValue:
+    """One labelled histogram."""
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self._buckets = buckets
+        # One slot per bucket, one for +Inf, and the running sum
+        self._shards = _Shards(len(buckets) + 2)
+
+    def observe(self, value: float) -> None:
+        values = self._shards.get()
+        values[bisect_left(self._buckets, value)] += 1
+        values[-1] += value
+
+    def time(self) -> "_Timer":
+        """Observe the duration of a `with` block."""
+        return _Timer(self)
+
+    def snapshot(self) -> Tuple[List[Tuple[float, float]], float, float]:
+        """Cumulative (bound, count) pairs, the count and the sum."""
+        totals = self._shards.sum()
+        cumulative, running = [], 0
+        for bound, count in zip(self._buckets + (math.inf,), totals[:-1]):
+            running += count
+            cumulative.append((bound, running))
+        return cumulative, running, totals[-1]
+
+
+class _Timer:
+    def __init__(self, histogram: _HistogramValue):
+        self._histogram = histogram
+
+    def __enter__(self) -> "_Timer":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._histogram.observe(time.perf_counter() - self._started)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str):
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.label_names):
+                raise ValueError(f"{self.name} takes labels {self.label_names}, got {values}")
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    child = self._children[values] = self._new_child()
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.kind}"
+        for values, child in list(self._children.items()):
+            yield from self._render_child(values, child)
+
+    def _render_child(self, values: Tuple[str, ...], child) -> Iterable[str]:
+        try:
+            value = child.get()
+        except Exception as e:
+            print(f"Error reading metric {self.name}: {e}")
+            return
+        yield f"{self.name}{_format_labels(self.label_names, values)} {_format_value(value)}"
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def inc(self, amount: float = 1) -> None:
+        self.labels().inc(amount)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        self.labels().set_function(function)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> _HistogramValue:
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def _render_child(self, values: Tuple[str, ...], child: _HistogramValue) -> Iterable[str]:
+        cumulative, count, total = child.snapshot()
+        for bound, running in cumulative:
+            labels = _format_labels(self.label_names, values, f'le="{_format_value(bound)}"')
+            yield f"{self.name}_bucket{labels} {_format_value(running)}"
+        labels = _format_labels(self.label_names, values)
+        yield f"{self.name}_sum{labels} {_format_value(total)}"
+        yield f"{self.name}_count{labels} {_format_value(count)}"
+
+
+class MetricsRegistry:
+    """The declared metrics, rendered together."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+
+    def counter(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labels))
+
+    def gauge(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labels))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labels, buckets))
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """Run `collector` before each scrape, e.g. to label newly created objects."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in self._collectors:
+            try:
+                collector()
+            except Exception as e:
+                print(f"Error collecting metrics: {e}")
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric: _Metric):
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            # Modules reloaded in development declare their metrics again
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+
+metrics = MetricsRegistry()
+
+
+_request_duration = metrics.histogram(
+    "road_http_request_duration_seconds",
+    "Duration of HTTP requests by route template",
+    ["method", "route", "status"]
+)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing each request under its route template, so that
+    /workflows/{workflow_id} is one series rather than one per id. Streaming
+    responses are timed until their last byte.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The router leaves the matched route in the scope
+            route = getattr(scope.get("route"), "path", "unmatched")
+            _request_duration.labels(scope["method"], route, str(status)).observe(time.perf_counter() - started)
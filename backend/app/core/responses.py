@@ -0,0 +1,46 @@
+# backend/app/core/responses.py
+"""
+JSON responses rendered with orjson.
+
+FastAPI validates what an endpoint returns against its response_model and
+runs it through jsonable_encoder before the response class renders it. For
+large lists that costs more than the query behind them. Endpoints returning
+rows in bulk therefore build a FastJSONResponse themselves, which FastAPI
+sends as is. Pydantic models are dumped once by pydantic-core. Plain dicts
+and lists are dumped by orjson, which handles UUIDs and datetimes natively.
+The routes keep their response_model for the OpenAPI schema.
+"""
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+# UTC datetimes end in "Z", as Pydantic writes them
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+
+
+def _default(value: Any) -> Any:
+    """Types orjson does not serialize itself, encoded as jsonable_encoder would."""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize a model, or plain JSON-like data, to JSON bytes."""
+    if isinstance(content, BaseModel):
+        return content.model_dump_json().encode("utf-8")
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with pydantic-core or orjson instead of json.dumps."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,45 @@
+# backend/app/core/startup_profile.py
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Tuple
+import sys
+import time
+
+
+class StartupProfile:
+    """
+    Wall-clock time of the startup phases, printed once the app is ready.
+
+    Create it before the app's imports so that their time is measured too.
+    For a per-module breakdown of import time, start the worker with
+    `python -X importtime`.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: List[Tuple[str, float]] = []
+        self._modules = len(sys.modules)
+        self._last = self.started
+
+    def mark(self, name: str) -> None:
+        """Record the time since the previous mark as phase `name`."""
+        now = time.perf_counter()
+        self.phases.append((name, now - self._last))
+        self._last = now
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        self._last = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.mark(name)
+
+    @property
+    def total(self) -> float:
+        return sum(seconds for _, seconds in self.phases)
+
+    def report(self, title: Optional[str] = None) -> None:
+        print(f"⏱️  {title or 'Started'} in {self.total * 1000:.0f} ms "
+              f"({len(sys.modules) - self._modules} modules imported)")
+        for name, seconds in self.phases:
+            print(f"   {name:<28} {seconds * 1000:8.1f} ms")
@@ -0,0 +1,460 @@
+# backend/app/core/tracing.py
+"""
+Request tracing in the OpenTelemetry data model.
+
+Spans carry W3C trace context (`traceparent`), so traces continue across
+services, and are exported as OTLP/JSON, so any OpenTelemetry collector or
+backend (Jaeger, Tempo, Honeycomb, ...) can receive them. Sampling is
+decided once per trace: root spans are sampled at TRACING_SAMPLE_RATE,
+and child spans, including those of an incoming `traceparent`, follow
+their parent. Unsampled spans only carry ids, and with TRACING_EXPORTER
+unset tracing is a no-op.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import functools
+import os
+import queue
+import random
+import re
+import threading
+import time
+
+from app.core.config import settings
+
+_KINDS = {"internal": 1, "server": 2, "client": 3, "producer": 4, "consumer": 5}
+_STATUS_CODES = {"unset": 0, "ok": 1, "error": 2}
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+
+class Span:
+    """A timed operation within a trace."""
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        span_id: str,
+        parent_id: Optional[str] = None,
+        kind: str = "internal",
+        sampled: bool = True,
+        attributes: Optional[Dict[str, Any]] = None,
+        links: Optional[List[Tuple[str, str, Dict[str, Any]]]] = None
+    ):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.kind = kind
+        self.sampled = sampled
+        self.attributes: Dict[str, Any] = dict(attributes or {}) if sampled else {}
+        self.links = list(links or []) if sampled else []
+        self.events: List[Tuple[int, str, Dict[str, Any]]] = []
+        self.status = "unset"
+        self.status_message: Optional[str] = None
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        if self.sampled:
+            self.attributes[key] = value
+
+    def add_event(self, name: str, attributes: Optional[Dict[str, Any]] = None) -> None:
+        if self.sampled:
+            self.events.append((time.time_ns(), name, attributes or {}))
+
+    def add_link(self, trace_id: str, span_id: str, attributes: Optional[Dict[str, Any]] = None) -> None:
+        if self.sampled:
+            self.links.append((trace_id, span_id, attributes or {}))
+
+    def set_status(self, status: str, message: Optional[str] = None) -> None:
+        self.status = status
+        self.status_message = message
+
+    def record_exception(self, error: BaseException) -> None:
+        self.set_status("error", str(error))
+        self.add_event("exception", {
+            "exception.type": type(error).__name__,
+            "exception.message": str(error)
+        })
+
+    def end(self) -> None:
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        if self.sampled:
+            tracer.processor.on_end(self)
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        return (self.end_ns - self.start_ns) / 1e6 if self.end_ns is not None else None
+
+
+class _NoopSpan:
+    """Stands in for spans while tracing is off."""
+    trace_id = span_id = parent_id = None
+    sampled = False
+    traceparent = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def add_event(self, name: str, attributes: Optional[Dict[str, Any]] = None) -> None:
+        pass
+
+    def add_link(self, trace_id: str, span_id: str, attributes: Optional[Dict[str, Any]] = None) -> None:
+        pass
+
+    def set_status(self, status: str, message: Optional[str] = None) -> None:
+        pass
+
+    def record_exception(self, error: BaseException) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_span():
+    """The active span of this task or thread (a no-op span if there is none)."""
+    return _current_span.get() or NOOP_SPAN
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[Tuple[str, str, bool]]:
+    """(trace id, parent span id, sampled) of a W3C traceparent header."""
+    match = _TRACEPARENT.match((header or "").strip().lower())
+    if match is None or match.group(1) == "0" * 32 or match.group(2) == "0" * 16:
+        return None
+    return match.group(1), match.group(2), bool(int(match.group(3), 16) & 1)
+
+
+# --- Exporters ---------------------------------------------------------------
+
+class InMemorySpanExporter:
+    """Keeps finished spans in a list, e.g. for tests."""
+
+    def __init__(self):
+        self.spans: List[Span] = []
+
+    def export(self, spans: List[Span]) -> None:
+        self.spans.extend(spans)
+
+    def clear(self) -> None:
+        self.spans.clear()
+
+    def find(self, name: str) -> List[Span]:
+        return [span for span in self.spans if span.name == name]
+
+
+class ConsoleSpanExporter:
+    """Prints one line per finished span."""
+
+    def export(self, spans: List[Span]) -> None:
+        for span in spans:
+            parent = f" parent={span.parent_id}" if span.parent_id else ""
+            print(f"🔎 {span.name} {span.duration_ms:.1f}ms trace={span.trace_id} span={span.span_id}{parent} {span.attributes}")
+
+
+class OTLPSpanExporter:
+    """Sends spans to an OpenTelemetry collector over OTLP/HTTP with JSON encoding."""
+
+    def __init__(self, endpoint: str, service_name: str):
+        import httpx
+
+        self.endpoint = endpoint
+        self.resource = {"attributes": [_attribute("service.name", service_name)]}
+        self._client = httpx.Client(timeout=10.0)
+
+    def export(self, spans: List[Span]) -> None:
+        body = {
+            "resourceSpans": [{
+                "resource": self.resource,
+                "scopeSpans": [{"scope": {"name": "road"}, "spans": [_otlp_span(span) for span in spans]}]
+            }]
+        }
+        response = self._client.post(self.endpoint, json=body)
+        response.raise_for_status()
+
+
+def _attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        encoded = {"boolValue": value}
+    elif isinstance(value, int):
+        encoded = {"intValue": str(value)}
+    elif isinstance(value, float):
+        encoded = {"doubleValue": value}
+    else:
+        encoded = {"stringValue": str(value)}
+    return {"key": key, "value": encoded}
+
+
+def _otlp_span(span: Span) -> Dict[str, Any]:
+    encoded = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": _KINDS.get(span.kind, 1),
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": [_attribute(key, value) for key, value in span.attributes.items()],
+        "events": [
+            {"timeUnixNano": str(at), "name": name, "attributes": [_attribute(k, v) for k, v in attributes.items()]}
+            for at, name, attributes in span.events
+        ],
+        "links": [
+            {"traceId": trace_id, "spanId": span_id, "attributes": [_attribute(k, v) for k, v in attributes.items()]}
+            for trace_id, span_id, attributes in span.links
+        ],
+        "status": {"code": _STATUS_CODES.get(span.status, 0), "message": span.status_message or ""}
+    }
+    if span.parent_id:
+        encoded["parentSpanId"] = span.parent_id
+    return encoded
+
+
+# --- Processors --------------------------------------------------------------
+
+class SimpleSpanProcessor:
+    """Exports each span as it ends, on the calling thread."""
+
+    def __init__(self, exporter):
+        self.exporter = exporter
+
+    def on_end(self, span: Span) -> None:
+        try:
+            self.exporter.export([span])
+        except Exception as e:
+            print(f"Error exporting span: {e}")
+
+    def shutdown(self) -> None:
+        pass
+
+
+class BatchSpanProcessor:
+    """
+    Exports spans in batches from a background thread. Ending a span only
+    appends it to a bounded queue; when the queue is full, spans are dropped
+    rather than slowing requests down.
+    """
+
+    def __init__(self, exporter, max_queue: int = 2048, batch_size: int = 512, interval: float = 2.0):
+        self.exporter = exporter
+        self.batch_size = batch_size
+        self.interval = interval
+        self.dropped = 0
+        self._queue: "queue.Queue[Optional[Span]]" = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+        self._thread.start()
+
+    def on_end(self, span: Span) -> None:
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def shutdown(self) -> None:
+        """Export what is queued and stop."""
+        self._queue.put(None)
+        self._thread.join(timeout=10.0)
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch: List[Span] = []
+            deadline = time.monotonic() + self.interval
+            while len(batch) < self.batch_size:
+                try:
+                    span = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if span is None:
+                    stopping = True
+                    break
+                batch.append(span)
+            if batch:
+                try:
+                    self.exporter.export(batch)
+                except Exception as e:
+                    print(f"Error exporting {len(batch)} spans: {e}")
+
+
+class _NoopProcessor:
+    def on_end(self, span: Span) -> None:
+        pass
+
+    def shutdown(self) -> None:
+        pass
+
+
+# --- Tracer ------------------------------------------------------------------
+
+class Tracer:
+    """Creates spans and decides which traces are sampled."""
+
+    def __init__(self):
+        self.enabled = False
+        self.sample_rate = 0.0
+        self.processor = _NoopProcessor()
+        self._random = random.Random(os.urandom(8))
+
+    def configure(
+        self,
+        exporter: Optional[Any] = None,
+        sample_rate: Optional[float] = None,
+        batch: bool = True
+    ) -> None:
+        """
+        Export finished spans to `exporter` (None turns tracing off).
+        Exports run on a background thread unless `batch` is false.
+        """
+        self.processor.shutdown()
+        self.enabled = exporter is not None
+        self.sample_rate = settings.TRACING_SAMPLE_RATE if sample_rate is None else sample_rate
+        if exporter is None:
+            self.processor = _NoopProcessor()
+        else:
+            self.processor = BatchSpanProcessor(exporter) if batch else SimpleSpanProcessor(exporter)
+
+    def configure_from_settings(self) -> None:
+        exporter = None
+        if settings.TRACING_EXPORTER == "otlp":
+            exporter = OTLPSpanExporter(settings.TRACING_OTLP_ENDPOINT, settings.TRACING_SERVICE_NAME)
+        elif settings.TRACING_EXPORTER == "console":
+            exporter = ConsoleSpanExporter()
+        elif settings.TRACING_EXPORTER == "memory":
+            exporter = InMemorySpanExporter()
+        elif settings.TRACING_EXPORTER:
+            raise ValueError(f"Unsupported tracing exporter: {settings.TRACING_EXPORTER}")
+        self.configure(exporter, batch=settings.TRACING_EXPORTER != "memory")
+
+    def shutdown(self) -> None:
+        self.processor.shutdown()
+
+    def start_span(
+        self,
+        name: str,
+        kind: str = "internal",
+        attributes: Optional[Dict[str, Any]] = None,
+        links: Optional[List[Tuple[str, str, Dict[str, Any]]]] = None,
+        traceparent: Optional[str] = None,
+        root: bool = False
+    ):
+        """
+        Start a span without making it current; call `end()` when done.
+        Its parent is the current span, or the remote parent given as a
+        `traceparent` header, unless `root` is set.
+        """
+        if not self.enabled:
+            return NOOP_SPAN
+
+        parent = None if root else _current_span.get()
+        remote = parse_traceparent(traceparent) if parent is None and not root else None
+        if parent is not None:
+            trace_id, parent_id, sampled = parent.trace_id, parent.span_id, parent.sampled
+        elif remote is not None:
+            trace_id, parent_id, sampled = remote
+        else:
+            trace_id, parent_id = f"{self._random.getrandbits(128):032x}", None
+            sampled = self._sample(trace_id)
+        span_id = f"{self._random.getrandbits(64):016x}"
+        return Span(name, trace_id, span_id, parent_id, kind, sampled, attributes, links)
+
+    @contextmanager
+    def span(self, name: str, kind: str = "internal", **kwargs) -> Iterator[Any]:
+        """Run a block in a new span that is current for the block's duration."""
+        span = self.start_span(name, kind, **kwargs)
+        if span is NOOP_SPAN:
+            yield span
+            return
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_exception(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+
+    def child_span(self, name: str, kind: str = "internal", attributes: Optional[Dict[str, Any]] = None):
+        """Start a span only if a sampled span is current, e.g. for frequent operations."""
+        parent = _current_span.get()
+        if parent is None or not parent.sampled:
+            return NOOP_SPAN
+        return self.start_span(name, kind, attributes)
+
+    def _sample(self, trace_id: str) -> bool:
+        # Decided by the trace id, as OpenTelemetry's TraceIdRatioBased sampler does
+        if self.sample_rate >= 1:
+            return True
+        return int(trace_id[16:], 16) < self.sample_rate * (1 << 64)
+
+
+def traced(name: str, kind: str = "internal"):
+    """Run a coroutine function in a span of its own."""
+    def decorator(function: Callable):
+        @functools.wraps(function)
+        async def wrapper(*args, **kwargs):
+            with tracer.span(name, kind):
+                return await function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+tracer = Tracer()
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware opening a server span per request, continuing the
+    caller's trace if it sent a `traceparent` header. Sampled responses
+    carry the trace id in an X-Trace-Id header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        traceparent = None
+        for key, value in scope.get("headers", ()):
+            if key == b"traceparent":
+                traceparent = value.decode("latin-1")
+                break
+
+        with tracer.span(f"{scope['method']} {scope['path']}", "server", traceparent=traceparent) as span:
+            span.set_attribute("http.request.method", scope["method"])
+            span.set_attribute("url.path", scope["path"])
+
+            async def send_with_trace(message) -> None:
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.response.status_code", message["status"])
+                    if message["status"] >= 500:
+                        span.set_status("error")
+                    if span.sampled:
+                        message = {**message, "headers": list(message.get("headers", [])) + [
+                            (b"x-trace-id", span.trace_id.encode("ascii"))
+                        ]}
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_trace)
+            finally:
+                route = getattr(scope.get("route"), "path", None)
+                if route is not None:
+                    # Named after the route template, as OpenTelemetry's HTTP conventions suggest
+                    span.name = f"{scope['method']} {route}"
+                    span.set_attribute("http.route", route)
@@ -0,0 +1,193 @@
+# backend/app/core/traffic_capture.py
+"""
+Capture of request shapes and timings, for replaying realistic traffic
+(see benchmarks/replay.py).
+
+Each captured request becomes one JSON line: its route template, query
+and body with user content replaced by placeholders, and how long the
+response took. Structural values (roles, node types, providers, model
+names, numbers, booleans) are kept so that replayed requests still route
+and validate; every other string becomes {"$text": <length>}, so sizes
+survive but content does not. Lines are buffered in memory and appended
+to TRAFFIC_CAPTURE_PATH by a background task.
+"""
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs
+import asyncio
+import json
+import random
+import time
+
+from app.core.config import settings
+
+TEXT = "$text"
+
+# Keys whose string values describe structure rather than user content
+STRUCTURAL_KEYS = frozenset({
+    "role", "type", "id", "source", "target", "status", "version",
+    "llm_model_provider", "llm_model_name", "provider", "model",
+    "strategy", "inputKey", "format", "sort", "order"
+})
+
+# Never captured: operational endpoints and admin calls
+EXCLUDED_PREFIXES = ("/metrics", "/api/v1/health", "/api/v1/admin", "/docs", "/redoc", "/openapi.json")
+
+
+def sanitize(value: Any, key: Optional[str] = None) -> Any:
+    """`value` with user-provided strings replaced by {"$text": length}."""
+    if isinstance(value, str):
+        return value if key in STRUCTURAL_KEYS else {TEXT: len(value)}
+    if isinstance(value, dict):
+        return {k: sanitize(v, k) for k, v in value.items()}
+    if isinstance(value, list):
+        return [sanitize(item, key) for item in value]
+    return value
+
+
+def _sanitize_query(query_string: bytes) -> Dict[str, List[Any]]:
+    query: Dict[str, List[Any]] = {}
+    for key, values in parse_qs(query_string.decode("latin-1"), keep_blank_values=True).items():
+        query[key] = [value if key in STRUCTURAL_KEYS or value.lstrip("-").isdigit() else {TEXT: len(value)} for value in values]
+    return query
+
+
+class TrafficRecorder:
+    """Buffers captured requests and appends them to the capture file."""
+
+    def __init__(self):
+        self._buffer: List[str] = []
+        self._task: Optional[asyncio.Task] = None
+        self.dropped = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(settings.TRAFFIC_CAPTURE_PATH)
+
+    def record(self, entry: Dict[str, Any]) -> None:
+        if len(self._buffer) >= settings.TRAFFIC_CAPTURE_BUFFER_SIZE:
+            # The writer is falling behind; lose samples rather than memory
+            self.dropped += 1
+            return
+        self._buffer.append(json.dumps(entry, separators=(",", ":")))
+
+    def start(self) -> None:
+        if self.enabled and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._run())
+            print(f"📼 Capturing traffic to {settings.TRAFFIC_CAPTURE_PATH}")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+    async def flush(self) -> None:
+        if not self._buffer:
+            return
+        lines, self._buffer = self._buffer, []
+        try:
+            await asyncio.to_thread(self._append, lines)
+        except OSError as e:
+            print(f"Error writing captured traffic: {e}")
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(settings.TRAFFIC_CAPTURE_FLUSH_INTERVAL)
+            await self.flush()
+
+    @staticmethod
+    def _append(lines: List[str]) -> None:
+        with open(settings.TRAFFIC_CAPTURE_PATH, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+
+traffic_recorder = TrafficRecorder()
+
+
+class TrafficCaptureMiddleware:
+    """
+    ASGI middleware recording a sample (TRAFFIC_CAPTURE_SAMPLE_RATE) of
+    HTTP requests. Bodies are read as they pass through to the app; JSON
+    bodies up to TRAFFIC_CAPTURE_MAX_BODY bytes are kept as shapes, others
+    only by size. Streaming responses also record the time to their first
+    body bytes.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["path"].startswith(EXCLUDED_PREFIXES)
+            or random.random() >= settings.TRAFFIC_CAPTURE_SAMPLE_RATE
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        started_at = time.time()
+        started = time.perf_counter()
+        body = bytearray()
+        body_bytes = 0
+        response: Dict[str, Any] = {"status": 500, "bytes": 0, "first_byte": None, "content_type": ""}
+
+        async def receive_and_keep():
+            nonlocal body_bytes
+            message = await receive()
+            if message["type"] == "http.request":
+                chunk = message.get("body", b"")
+                body_bytes += len(chunk)
+                if len(body) + len(chunk) <= settings.TRAFFIC_CAPTURE_MAX_BODY:
+                    body.extend(chunk)
+            return message
+
+        async def send_and_time(message) -> None:
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                for key, value in message.get("headers", ()):
+                    if key == b"content-type":
+                        response["content_type"] = value.decode("latin-1")
+            elif message["type"] == "http.response.body" and message.get("body"):
+                if response["first_byte"] is None:
+                    response["first_byte"] = time.perf_counter()
+                response["bytes"] += len(message["body"])
+            await send(message)
+
+        try:
+            await self.app(scope, receive_and_keep, send_and_time)
+        finally:
+            route = getattr(scope.get("route"), "path", None)
+            if route is not None:
+                traffic_recorder.record(self._entry(scope, route, started_at, started, bytes(body), body_bytes, response))
+
+    @staticmethod
+    def _entry(scope, route: str, started_at: float, started: float, body: bytes, body_bytes: int, response: Dict[str, Any]) -> Dict[str, Any]:
+        content_type = ""
+        for key, value in scope.get("headers", ()):
+            if key == b"content-type":
+                content_type = value.decode("latin-1").split(";")[0].strip()
+
+        shape = None
+        if body and content_type == "application/json" and len(body) == body_bytes:
+            try:
+                shape = sanitize(json.loads(body))
+            except ValueError:
+                shape = None
+
+        entry = {
+            "t": round(started_at, 6),
+            "method": scope["method"],
+            "route": route,
+            "path_params": sorted(scope.get("path_params", {})),
+            "query": _sanitize_query(scope.get("query_string", b"")),
+            "content_type": content_type,
+            "body": shape,
+            "body_bytes": body_bytes,
+            "status": response["status"],
+            "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+            "response_bytes": response["bytes"]
+        }
+        if response["content_type"].startswith("text/event-stream") and response["first_byte"] is not None:
+            entry["stream"] = True
+            entry["first_byte_ms"] = round((response["first_byte"] - started) * 1000, 3)
+        return entry
@@ -0,0 +1,138 @@
+# backend/app/db/migrations.py
+"""
+Schema migrations from database/migrations.
+
+Each NNN_name.sql file is applied once, in order, in its own transaction,
+and recorded in schema_migrations. Run on startup (MIGRATE_ON_STARTUP) or
+by hand:
+
+    python -m app.db.migrations           # apply pending migrations
+    python -m app.db.migrations --status  # list applied and pending ones
+"""
+from typing import List, Optional, Tuple
+import glob
+import os
+import re
+import sys
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from app.core.config import settings
+
+# Repository root, which holds the database directory
+_REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+
+_MIGRATION_FILE = re.compile(r"^(\d+)_.+\.sql$")
+
+# Migrations that predate this runner were applied by hand, and the tables
+# they create were also created by the app itself on startup. Later ones
+# must be applied to such databases, so they tolerate objects that exist.
+_LEGACY_MIGRATIONS_THROUGH = "003"
+
+# Held while migrating so that concurrently starting workers migrate once
+_LOCK_ID = 7203110435
+
+_CREATE_SCHEMA_MIGRATIONS = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version VARCHAR(255) PRIMARY KEY,
+    applied_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+
+def migrations_path() -> str:
+    return settings.MIGRATIONS_PATH or os.path.join(_REPO_ROOT, "database", "migrations")
+
+
+def init_script_path() -> str:
+    return settings.DATABASE_INIT_SCRIPT or os.path.join(_REPO_ROOT, "database", "init.sql")
+
+
+def available_migrations(path: Optional[str] = None) -> List[Tuple[str, str]]:
+    """(version, file) of every migration, in order of version."""
+    migrations = []
+    for file in glob.glob(os.path.join(path or migrations_path(), "*.sql")):
+        name = os.path.basename(file)
+        if _MIGRATION_FILE.match(name):
+            migrations.append((name[:-len(".sql")], file))
+    return sorted(migrations)
+
+
+def applied_migrations(connection: Connection) -> List[str]:
+    if not _has_table(connection, "schema_migrations"):
+        return []
+    return [row[0] for row in connection.execute(text("SELECT version FROM schema_migrations ORDER BY version"))]
+
+
+def apply_migrations(engine: Engine, path: Optional[str] = None) -> List[str]:
+    """Apply pending migrations; returns the versions applied."""
+    migrations = available_migrations(path)
+    applied: List[str] = []
+
+    with engine.connect() as connection:
+        connection.execute(text("SELECT pg_advisory_lock(:id)"), {"id": _LOCK_ID})
+        connection.commit()
+        try:
+            if not _has_table(connection, "schema_migrations"):
+                _bootstrap(connection, migrations)
+
+            done = set(applied_migrations(connection))
+            for version, file in migrations:
+                if version in done:
+                    continue
+                with open(file, "r", encoding="utf-8") as f:
+                    sql = f.read()
+                try:
+                    connection.exec_driver_sql(sql)
+                    _record(connection, version)
+                    connection.commit()
+                except Exception:
+                    connection.rollback()
+                    raise
+                print(f"📊 Applied migration {version}")
+                applied.append(version)
+        finally:
+            connection.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": _LOCK_ID})
+            connection.commit()
+
+    return applied
+
+
+def _bootstrap(connection: Connection, migrations: List[Tuple[str, str]]) -> None:
+    """Create schema_migrations, and the base schema on an empty database."""
+    if not _has_table(connection, "prompts"):
+        with open(init_script_path(), "r", encoding="utf-8") as f:
+            connection.exec_driver_sql(f.read())
+        print("📊 Created base schema from init.sql")
+    connection.execute(text(_CREATE_SCHEMA_MIGRATIONS))
+
+    if _has_table(connection, "workflows"):
+        # Schema built by earlier versions: its legacy migrations are in place
+        legacy = [version for version, _ in migrations if version.split("_", 1)[0] <= _LEGACY_MIGRATIONS_THROUGH]
+        for version in legacy:
+            _record(connection, version)
+        if legacy:
+            print(f"📊 Recorded existing schema as migrated through {legacy[-1]}")
+    connection.commit()
+
+
+def _record(connection: Connection, version: str) -> None:
+    connection.execute(text("INSERT INTO schema_migrations (version) VALUES (:version)"), {"version": version})
+
+
+def _has_table(connection: Connection, table: str) -> bool:
+    return connection.execute(text("SELECT to_regclass(:table)"), {"table": table}).scalar() is not None
+
+
+if __name__ == "__main__":
+    from app.db.session import engine
+
+    if "--status" in sys.argv[1:]:
+        with engine.connect() as connection:
+            done = set(applied_migrations(connection))
+        for version, _ in available_migrations():
+            print(f"{'applied' if version in done else 'pending'}  {version}")
+    else:
+        applied = apply_migrations(engine)
+        print(f"Applied {len(applied)} migrations" if applied else "Database is up to date")
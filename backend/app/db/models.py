@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, Boolean, DateTime, ARRAY, JSON, Integer, ForeignKey
+from sqlalchemy import Column, String, Text, Boolean, DateTime, ARRAY, JSON, Integer, BigInteger, ForeignKey, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 import uuid
@@ -10,11 +10,17 @@ class Prompt(Base):
     """Prompt model for storing prompt templates and versions."""
     
     __tablename__ = "prompts"
+    __table_args__ = (
+        UniqueConstraint("name", "version", name="prompts_name_version_key"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
     name = Column(String(255), nullable=False, index=True)
     version = Column(String(50), nullable=False, default="1.0")
-    content = Column(Text, nullable=False)
+    content = Column(Text, nullable=True)  # Full text for snapshots, NULL for delta rows
+    content_delta = Column(JSON, nullable=True)  # Line delta against base_prompt_id
+    base_prompt_id = Column(UUID(as_uuid=True), ForeignKey("prompts.id"), nullable=True, index=True)
+    search_content = Column(Text, nullable=True)  # Full text of a delta row while it is the newest version
     description = Column(Text, nullable=True)
     author = Column(String(255), nullable=True)
     tags = Column(ARRAY(String), nullable=True, default=[])
@@ -112,6 +118,49 @@ class NodeExecution(Base):
     execution = relationship("WorkflowExecution", back_populates="node_executions")
 
 
+class NodeOutputCacheEntry(Base):
+    __tablename__ = "node_output_cache"
+
+    cache_key = Column(String(64), primary_key=True)  # sha256 of node type, config and upstream outputs
+    node_type = Column(String(100), nullable=False)
+    output_data = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+
+class IngestionManifestEntry(Base):
+    __tablename__ = "ingestion_manifest"
+    __table_args__ = (
+        UniqueConstraint("index_name", "source_path", name="ingestion_manifest_index_source_key"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    index_name = Column(String(255), nullable=False, index=True)
+    index_generation = Column(String(64), nullable=False)  # Index instance the chunks were written to
+    source_path = Column(Text, nullable=False)
+    content_hash = Column(String(64), nullable=False)
+    mtime = Column(BigInteger, nullable=False)  # Modification time in nanoseconds
+    size = Column(BigInteger, nullable=False)
+    chunk_ids = Column(JSON, nullable=False, default=list)
+    split_hash = Column(String(64))  # Chunk size and overlap the source was split with
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class FileUpload(Base):
+    __tablename__ = "file_uploads"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    filename = Column(String(255), nullable=False)
+    content_type = Column(String(255))
+    size = Column(BigInteger)  # Declared total size, if known up front
+    received_bytes = Column(BigInteger, nullable=False, default=0)
+    status = Column(String(50), nullable=False, default="uploading")  # uploading, complete
+    sha256 = Column(String(64), index=True)  # Set on completion
+    storage_path = Column(Text)  # Content-addressed file, shared by identical uploads
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    completed_at = Column(DateTime(timezone=True))
+
+
 class WorkflowTemplate(Base):
     __tablename__ = "workflow_templates"
 
@@ -1,9 +1,12 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 from typing import Generator
+import time
 
 from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.tracing import tracer
 
 # Create SQLAlchemy engine
 engine = create_engine(
@@ -13,6 +16,53 @@ engine = create_engine(
     echo=settings.DEBUG
 )
 
+# Time every statement for the metrics, and trace it within sampled traces
+_query_duration = metrics.histogram(
+    "road_db_query_duration_seconds",
+    "Duration of database statements",
+    ["operation"]
+)
+metrics.gauge(
+    "road_db_connections_in_use",
+    "Pooled database connections checked out"
+).set_function(lambda: engine.pool.checkedout())
+
+_OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH"}
+
+def _operation(statement: str) -> str:
+    words = statement.lstrip().split(None, 1)
+    operation = words[0].upper() if words else ""
+    return operation if operation in _OPERATIONS else "OTHER"
+
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info["query_started"] = time.perf_counter()
+    span = tracer.child_span(f"db {_operation(statement)}", "client")
+    if span.sampled:
+        span.set_attribute("db.system", "postgresql")
+        span.set_attribute("db.statement", statement[:1000])
+        conn.info["query_span"] = span
+
+def _observe_query(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.pop("query_started", None)
+    if started is not None and settings.METRICS_ENABLED:
+        _query_duration.labels(_operation(statement)).observe(time.perf_counter() - started)
+    span = conn.info.pop("query_span", None)
+    if span is not None:
+        span.end()
+
+def _end_failed_query(exception_context):
+    conn = exception_context.connection
+    span = conn.info.pop("query_span", None) if conn is not None else None
+    if span is not None:
+        span.record_exception(exception_context.original_exception)
+        span.end()
+
+# Without metrics or tracing, statements run without the per-statement hooks
+if settings.METRICS_ENABLED or settings.TRACING_EXPORTER:
+    event.listen(engine, "before_cursor_execute", _start_query_timer)
+    event.listen(engine, "after_cursor_execute", _observe_query)
+    event.listen(engine, "handle_error", _end_failed_query)
+
 # Create SessionLocal class
 SessionLocal = sessionmaker(
     autocommit=False,
@@ -12,16 +12,36 @@
 # print(f"DEBUG: Calculated project_backend_dir: {project_backend_dir}")
 # print(f"DEBUG: sys.path after modification: {sys.path}")
 
+from app.core.startup_profile import StartupProfile
+
+# Started before everything else so the imports below are measured
+startup_profile = StartupProfile()
+
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from contextlib import asynccontextmanager
+from datetime import datetime, timezone
 import os
+import time
 from dotenv import load_dotenv
 
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
-from app.api.v1.endpoints import llm_playground, prompts, rag_builder
+from app.core.metrics import MetricsMiddleware, metrics
+from app.core.responses import FastJSONResponse
+from app.core.tracing import TracingMiddleware, tracer
+from app.core.traffic_capture import TrafficCaptureMiddleware, traffic_recorder
+from app.api.v1.endpoints import admin, llm_playground, prompts, rag_builder, uploads
+from app.db.migrations import apply_migrations
 from app.db.session import engine
-from app.db.models import Base
+from app.services.conversation_writer import conversation_writer
+from app.services.ingestion.parsing import document_parsers
+from app.services.ingestion.spool import chunk_spools
+from app.services.model_registry import model_registry
+from app.services.provider_health import provider_health
+from app.services.workflow.event_hub import execution_hub
 
 # Load environment variables
 load_dotenv()
@@ -34,15 +54,42 @@ async def lifespan(app: FastAPI):
     """
     # Startup
     print("🚀 Starting ROAD Platform...")
+    startup_profile.mark("import and app setup")
+    tracer.configure_from_settings()
+    traffic_recorder.start()
+    
+    # Bring the schema up to date (database/migrations)
+    if settings.MIGRATE_ON_STARTUP:
+        with startup_profile.phase("database migrations"):
+            await asyncio.to_thread(apply_migrations, engine)
+    
+    # Connect execution update fan-out (and its Redis backplane if enabled)
+    with startup_profile.phase("execution updates"):
+        await execution_hub.start()
+    
+    # Model catalog, watched for edits
+    with startup_profile.phase("model registry"):
+        model_registry.start()
     
-    # Create database tables
-    Base.metadata.create_all(bind=engine)
-    print("📊 Database tables created/verified")
+    # Background conversation persistence and provider health probes
+    with startup_profile.phase("background services"):
+        conversation_writer.start()
+        provider_health.start()
+    
+    startup_profile.report("ROAD Platform ready")
     
     yield
     
     # Shutdown
     print("🛑 Shutting down ROAD Platform...")
+    await provider_health.stop()
+    await model_registry.stop()
+    await conversation_writer.stop()
+    await execution_hub.stop()
+    document_parsers.shutdown()
+    chunk_spools.release_all()
+    tracer.shutdown()
+    await traffic_recorder.stop()
 
 # Create FastAPI app instance
 app = FastAPI(
@@ -51,9 +98,14 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=FastJSONResponse,
     lifespan=lifespan
 )
 
+# Compress large responses (innermost, so the other middleware see the bytes sent)
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -63,6 +115,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# A span per request, continuing the caller's trace
+app.add_middleware(TracingMiddleware)
+
+# Request shapes and timings for replay, when TRAFFIC_CAPTURE_PATH is set
+if settings.TRAFFIC_CAPTURE_PATH:
+    app.add_middleware(TrafficCaptureMiddleware)
+
+# Request latency per route (outermost, so it includes the other middleware)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Health check endpoint
 @app.get("/", tags=["Health"])
 async def root():
@@ -82,9 +145,16 @@ async def health_check():
         "status": "healthy",
         "version": "1.0.0",
         "database": "connected",
-        "timestamp": "2024-01-01T00:00:00Z"
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "uptime_seconds": round(time.perf_counter() - startup_profile.started, 1)
     }
 
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def get_metrics():
+        """Metrics in the Prometheus text exposition format."""
+        return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 # Include API routers
 app.include_router(
     llm_playground.router,
@@ -104,6 +174,18 @@ app.include_router(
     tags=["RAG Builder"]
 )
 
+app.include_router(
+    uploads.router,
+    prefix="/api/v1/uploads",
+    tags=["File Uploads"]
+)
+
+app.include_router(
+    admin.router,
+    prefix="/api/v1/admin",
+    tags=["Admin"]
+)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
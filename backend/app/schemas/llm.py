@@ -11,6 +11,7 @@ class LLMProvider(str, Enum):
     GOOGLE = "google"
     GROQ = "groq"
     HUGGINGFACE = "huggingface"
+    SIMULATED = "simulated"  # Offline, for load tests
 
 class MessageRole(str, Enum):
     """Chat message roles."""
@@ -76,7 +77,8 @@ class ModelInfo(BaseModel):
     """Schema for LLM model information."""
     model_config = {
         "protected_namespaces": (),
-        "use_enum_values": True
+        "use_enum_values": True,
+        "frozen": True  # Shared by every lookup of the model registry
     }
     
     name: str
@@ -104,6 +106,9 @@ class ProviderInfo(BaseModel):
     available: bool
     configured: bool
     error: Optional[str] = None
+    healthy: Optional[bool] = None  # Result of the last connection probe, None if not probed
+    latency_ms: Optional[float] = None
+    checked_at: Optional[datetime] = None
 
 class ProviderListResponse(BaseModel):
     """Schema for list of available providers."""
@@ -60,11 +60,44 @@ class PromptListResponse(BaseModel):
     page: int = 1
     page_size: int = 50
 
+class PromptVersionInfo(BaseModel):
+    """Schema for a single entry in a prompt's version history."""
+    id: uuid.UUID
+    name: str
+    version: str
+    description: Optional[str] = None
+    author: Optional[str] = None
+    tags: Optional[List[str]] = None
+    is_active: bool
+    is_snapshot: bool = Field(..., description="Whether the version is stored as a full snapshot")
+    content: Optional[str] = Field(None, description="Prompt content, only included when requested")
+    created_at: datetime
+    updated_at: datetime
+
 class PromptVersionResponse(BaseModel):
     """Schema for prompt version history."""
-    versions: List[PromptResponse]
+    versions: List[PromptVersionInfo]
     total_versions: int
 
+class PromptImportRow(PromptBase):
+    """Schema for a single NDJSON line of a bulk prompt import."""
+    is_active: bool = Field(default=True, description="Active status")
+    created_at: Optional[datetime] = Field(None, description="Kept for new versions, e.g. from an export; versions are ordered by it")
+
+class PromptImportError(BaseModel):
+    """Schema for a row that failed to import."""
+    line: int = Field(..., description="1-based line number in the NDJSON body")
+    name: Optional[str] = None
+    version: Optional[str] = None
+    error: str
+
+class PromptImportResponse(BaseModel):
+    """Schema for bulk prompt import results."""
+    total: int
+    imported: int
+    failed: int
+    errors: List[PromptImportError]
+
 class StorageConfigUpdate(BaseModel):
     """Schema for updating storage configuration."""
     enable_json_storage: bool = Field(default=True, description="Enable JSON file storage")
@@ -73,7 +106,7 @@ class StorageConfigUpdate(BaseModel):
 
 class PromptSearchRequest(BaseModel):
     """Schema for prompt search request."""
-    query: Optional[str] = Field(None, description="Search query")
+    query: Optional[str] = Field(None, description="Search query; content matches only the newest version of each name")
     tags: Optional[List[str]] = Field(None, description="Filter by tags")
     author: Optional[str] = Field(None, description="Filter by author")
     is_active: Optional[bool] = Field(None, description="Filter by active status")
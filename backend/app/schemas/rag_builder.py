@@ -99,10 +99,15 @@ class ExecutionRequest(BaseModel):
     config: Optional[Dict[str, Any]] = Field(default_factory=dict)
 
 
+class BatchExecutionRequest(BaseModel):
+    inputs: List[Dict[str, Any]]
+    config: Optional[Dict[str, Any]] = Field(default_factory=dict)
+
+
 class WorkflowExecutionResponse(BaseModel):
     id: str
     workflow_id: str
-    status: Literal['running', 'completed', 'failed']
+    status: Literal['running', 'completed', 'failed', 'cancelled']
     inputs: Dict[str, Any]
     outputs: Optional[Dict[str, Any]] = None
     execution_time_ms: Optional[int] = None
@@ -120,7 +125,7 @@ class NodeExecutionResponse(BaseModel):
     execution_id: str
     node_id: str
     node_type: str
-    status: Literal['running', 'success', 'error']
+    status: Literal['running', 'success', 'error', 'cancelled']
     input_data: Optional[Dict[str, Any]] = None
     output_data: Optional[Dict[str, Any]] = None
     error_message: Optional[str] = None
@@ -0,0 +1,23 @@
+from datetime import datetime
+from typing import Optional, Literal
+from pydantic import BaseModel, Field
+
+
+class FileUploadCreate(BaseModel):
+    filename: str = Field(..., min_length=1, max_length=255)
+    content_type: Optional[str] = None
+    size: Optional[int] = Field(None, ge=0)  # Completes the upload automatically once received
+    sha256: Optional[str] = Field(None, min_length=64, max_length=64)  # Checked against the received content on completion
+
+
+class FileUploadResponse(BaseModel):
+    id: str
+    filename: str
+    content_type: Optional[str] = None
+    size: Optional[int] = None
+    offset: int  # Bytes received; the next chunk starts here
+    status: Literal['uploading', 'complete']
+    sha256: Optional[str] = None
+    chunk_size: int  # Suggested bytes per chunk request
+    created_at: datetime
+    completed_at: Optional[datetime] = None
@@ -1,9 +1,9 @@
 # backend/app/services/conversation_service.py
 from sqlalchemy.orm import Session
 from sqlalchemy import desc, func
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 import uuid
-from datetime import datetime
+from datetime import datetime, timezone
 
 from app.db.models import Conversation
 from app.schemas.llm import (
@@ -31,6 +31,27 @@ class ConversationService:
         parameters: LLMParameters
     ) -> str:
         """Save or update a conversation."""
+        record = self.conversation_record(
+            session_id,
+            llm_model_name,
+            llm_model_provider,
+            system_prompt,
+            messages,
+            parameters
+        )
+        self.save_conversation_records([record])
+        return session_id
+    
+    @staticmethod
+    def conversation_record(
+        session_id: str,
+        llm_model_name: str,
+        llm_model_provider: LLMProvider,
+        system_prompt: Optional[str],
+        messages: List[ChatMessage],
+        parameters: LLMParameters
+    ) -> Dict[str, Any]:
+        """Column values of a conversation as stored."""
         # Convert messages to dict format for JSON storage
         messages_dict = [
             {
@@ -44,31 +65,46 @@ class ConversationService:
         # Convert parameters to dict
         parameters_dict = parameters.dict()
         
-        # Check if conversation already exists
-        existing_conversation = self.db.query(Conversation).filter(
-            Conversation.session_id == session_id
-        ).first()
-        
-        if existing_conversation:
-            # Update existing conversation
-            existing_conversation.messages = messages_dict
-            existing_conversation.parameters = parameters_dict
-            existing_conversation.system_prompt = system_prompt
-            existing_conversation.updated_at = datetime.utcnow()
-        else:
-            # Create new conversation
-            new_conversation = Conversation(
-                session_id=session_id,
-                model_name=llm_model_name,
-                model_provider=llm_model_provider.value if hasattr(llm_model_provider, 'value') else llm_model_provider,
-                system_prompt=system_prompt,
-                messages=messages_dict,
-                parameters=parameters_dict
+        return {
+            "session_id": session_id,
+            "model_name": llm_model_name,
+            "model_provider": llm_model_provider.value if hasattr(llm_model_provider, 'value') else llm_model_provider,
+            "system_prompt": system_prompt,
+            "messages": messages_dict,
+            "parameters": parameters_dict
+        }
+    
+    def save_conversation_records(self, records: List[Dict[str, Any]]) -> None:
+        """
+        Save or update several conversations (see conversation_record) in one
+        transaction. A record older than the stored conversation, judged by
+        the timestamp of its last message, is skipped: it was queued before
+        a newer save of the same session (possibly by another worker).
+        """
+        existing = {
+            conversation.session_id: conversation
+            for conversation in self.db.query(Conversation).filter(
+                Conversation.session_id.in_([record["session_id"] for record in records])
             )
-            self.db.add(new_conversation)
+        }
+        
+        for record in records:
+            existing_conversation = existing.get(record["session_id"])
+            if existing_conversation:
+                if _last_message_at(record["messages"]) < _last_message_at(existing_conversation.messages):
+                    continue
+                # Update existing conversation
+                existing_conversation.messages = record["messages"]
+                existing_conversation.parameters = record["parameters"]
+                existing_conversation.system_prompt = record["system_prompt"]
+                existing_conversation.updated_at = datetime.utcnow()
+            else:
+                # Create new conversation
+                new_conversation = Conversation(**record)
+                self.db.add(new_conversation)
+                existing[record["session_id"]] = new_conversation
         
         self.db.commit()
-        return session_id
     
     async def get_conversations(
         self,
@@ -204,4 +240,23 @@ class ConversationService:
                 total_chars += len(msg["content"])
         
         # Rough estimation: ~4 characters per token
-        return total_chars // 4
\ No newline at end of file
+        return total_chars // 4
+
+
+def _last_message_at(messages: Optional[List[Dict[str, Any]]]) -> datetime:
+    """
+    Timestamp of the last message with a parseable one, in UTC; the earliest
+    datetime if there is none. Naive timestamps are taken to be UTC.
+    """
+    for message in reversed(messages or []):
+        timestamp = message.get("timestamp")
+        if not isinstance(timestamp, str):
+            continue
+        try:
+            parsed = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+        except ValueError:
+            continue
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed.astimezone(timezone.utc)
+    return datetime.min.replace(tzinfo=timezone.utc)
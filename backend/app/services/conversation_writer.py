@@ -0,0 +1,111 @@
+# backend/app/services/conversation_writer.py
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+import asyncio
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.db.session import SessionLocal
+from app.services.conversation_service import ConversationService
+
+
+class ConversationWriter:
+    """
+    Persists conversations in the background, off the request path.
+
+    Writes are keyed by session: a conversation queued again before it was
+    written replaces the queued version, since each write is a full
+    snapshot. Queued writes are saved in batches in one transaction, retried
+    with backoff on failure (then record by record), and drained on
+    shutdown.
+    """
+
+    def __init__(self):
+        self._pending: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def start(self) -> None:
+        """Start the writer task on the running event loop."""
+        if self._task is not None and not self._task.done():
+            return
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        if self._pending:
+            self._wakeup.set()
+
+    def enqueue(self, record: Dict[str, Any]) -> None:
+        """Queue a conversation record (see ConversationService.conversation_record)."""
+        self._pending[record["session_id"]] = record
+        self._pending.move_to_end(record["session_id"])
+        self.start()
+        self._wakeup.set()
+
+    async def stop(self) -> None:
+        """Write everything queued, waiting up to CONVERSATION_WRITE_DRAIN_TIMEOUT."""
+        if self._task is None:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        try:
+            await asyncio.wait_for(self._task, settings.CONVERSATION_WRITE_DRAIN_TIMEOUT)
+        except asyncio.TimeoutError:
+            print(f"Conversation writer stopped with {len(self._pending)} writes pending")
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            if not self._pending:
+                if self._stopping:
+                    return
+                await self._wakeup.wait()
+                self._wakeup.clear()
+                continue
+
+            if not self._stopping and len(self._pending) < settings.CONVERSATION_WRITE_BATCH_SIZE:
+                # Let concurrent streams finish into the same batch
+                await asyncio.sleep(settings.CONVERSATION_WRITE_BATCH_WAIT_MS / 1000)
+
+            batch = []
+            while self._pending and len(batch) < settings.CONVERSATION_WRITE_BATCH_SIZE:
+                batch.append(self._pending.popitem(last=False)[1])
+            await self._write(batch)
+
+    async def _write(self, batch: List[Dict[str, Any]]) -> None:
+        attempts = settings.CONVERSATION_WRITE_MAX_ATTEMPTS
+        for attempt in range(1, attempts + 1):
+            try:
+                await asyncio.to_thread(_save_records, batch)
+                return
+            except Exception as e:
+                print(f"Error saving {len(batch)} conversations (attempt {attempt} of {attempts}): {e}")
+                if attempt < attempts:
+                    await asyncio.sleep(settings.CONVERSATION_WRITE_RETRY_DELAY * 2 ** (attempt - 1))
+
+        # Don't let one bad record lose the batch: save record by record, dropping failures
+        for record in batch:
+            try:
+                await asyncio.to_thread(_save_records, [record])
+            except Exception as e:
+                print(f"Error saving conversation {record['session_id']}, dropped: {e}")
+
+
+def _save_records(records: List[Dict[str, Any]]) -> None:
+    db = SessionLocal()
+    try:
+        ConversationService(db).save_conversation_records(records)
+    finally:
+        db.close()
+
+
+conversation_writer = ConversationWriter()
+
+metrics.gauge("road_queue_depth", "Items waiting in in-process queues", ["queue"]).labels(
+    "conversation_writes"
+).set_function(lambda: conversation_writer.pending)
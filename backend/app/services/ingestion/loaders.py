@@ -0,0 +1,397 @@
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from html.parser import HTMLParser
+import codecs
+import glob
+import hashlib
+import json
+import mmap
+import os
+import re
+import signal
+
+# Extensions the loaders understand; PDF and DOCX need pypdf / python-docx
+SUPPORTED_EXTENSIONS = {".txt", ".md", ".markdown", ".html", ".htm", ".json", ".csv", ".pdf", ".docx"}
+
+# Text sections are flushed at the next paragraph break past this size
+SECTION_MAX_CHARS = 64 * 1024
+
+_MARKDOWN_HEADING = re.compile(rb"^#{1,6}\s")
+
+# A section of a document: its metadata (page, heading, ...) and text
+Section = Tuple[Dict[str, Any], str]
+
+
+class _HTMLTextExtractor(HTMLParser):
+    """Collects the visible text of an HTML document."""
+
+    _SKIPPED_TAGS = {"script", "style", "head"}
+
+    def __init__(self):
+        super().__init__()
+        self.parts: List[str] = []
+        self._skipping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self._SKIPPED_TAGS:
+            self._skipping += 1
+
+    def handle_endtag(self, tag):
+        if tag in self._SKIPPED_TAGS and self._skipping:
+            self._skipping -= 1
+        elif tag in ("p", "div", "br", "li", "h1", "h2", "h3", "h4", "h5", "h6", "tr"):
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        if not self._skipping:
+            self.parts.append(data)
+
+    def take(self) -> str:
+        """Return and forget the text collected so far."""
+        text = "".join(self.parts)
+        self.parts = []
+        return text
+
+
+def discover_sources(path: str, pattern: Optional[str] = None) -> List[str]:
+    """Absolute paths of the supported documents at a file or under a directory."""
+    path = os.path.abspath(path)
+    if os.path.isfile(path):
+        return [path]
+    if not os.path.isdir(path):
+        raise ValueError(f"Document path not found: {path}")
+
+    matches = glob.glob(os.path.join(path, pattern or "**/*"), recursive=True)
+    return sorted(
+        match for match in matches
+        if os.path.isfile(match) and os.path.splitext(match)[1].lower() in SUPPORTED_EXTENSIONS
+    )
+
+
+def file_digest(path: str, block_size: int = 1024 * 1024) -> str:
+    """sha256 of a file's content, read in blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def iter_sections(path: str) -> Iterator[Section]:
+    """
+    Yield the sections of a document: pages of a PDF, heading sections of
+    Markdown and DOCX, size-bounded runs of paragraphs otherwise. Files are
+    memory-mapped and read section by section, never decoded in full.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if os.path.getsize(path) == 0:
+        return
+
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        if extension == ".pdf":
+            yield from _pdf_sections(mapped)
+        elif extension == ".docx":
+            yield from _docx_sections(mapped)
+        elif extension in (".html", ".htm"):
+            yield from _html_sections(mapped)
+        elif extension == ".json":
+            yield from _json_sections(mapped)
+        else:
+            yield from _text_sections(mapped, headings=extension in (".md", ".markdown"))
+
+
+def _text_sections(mapped: mmap.mmap, headings: bool) -> Iterator[Section]:
+    lines: List[str] = []
+    size = 0
+    section = 0
+    heading: Optional[str] = None
+
+    for line in iter(mapped.readline, b""):
+        starts_heading = headings and _MARKDOWN_HEADING.match(line) is not None
+        if lines and (starts_heading or (size >= SECTION_MAX_CHARS and not line.strip())):
+            yield {"section": section, "heading": heading}, "".join(lines)
+            section += 1
+            lines, size = [], 0
+        text = line.decode("utf-8", errors="replace")
+        if starts_heading:
+            heading = text.lstrip("#").strip()
+        lines.append(text)
+        size += len(text)
+
+    if lines:
+        yield {"section": section, "heading": heading}, "".join(lines)
+
+
+def _html_sections(mapped: mmap.mmap, block_size: int = 1024 * 1024) -> Iterator[Section]:
+    extractor = _HTMLTextExtractor()
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")  # Blocks may split characters
+    section = 0
+    for start in range(0, len(mapped), block_size):
+        extractor.feed(decoder.decode(mapped[start:start + block_size]))
+        if sum(len(part) for part in extractor.parts) >= SECTION_MAX_CHARS:
+            yield {"section": section}, extractor.take()
+            section += 1
+    extractor.feed(decoder.decode(b"", final=True))
+    extractor.close()
+    text = extractor.take()
+    if text.strip():
+        yield {"section": section}, text
+
+
+class _JSONReader:
+    """Decodes a mapped JSON file block by block, for parsing one value at a time."""
+
+    def __init__(self, mapped: mmap.mmap, block_size: int):
+        self.mapped = mapped
+        self.block_size = block_size
+        self.decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self.text = ""
+        self.position = 0
+        self.offset = 0  # Bytes of the file decoded so far
+
+    def read_more(self) -> bool:
+        """Decode more of the file: at least a block, or as much as is buffered."""
+        if self.offset >= len(self.mapped):
+            return False
+        # Growing reads keep re-parsing a large value linear overall
+        size = max(self.block_size, len(self.text) - self.position)
+        data = self.mapped[self.offset:self.offset + size]
+        self.offset += len(data)
+        self.text = self.text[self.position:] + self.decoder.decode(data, final=self.offset >= len(self.mapped))
+        self.position = 0
+        return True
+
+    def skip_whitespace(self) -> str:
+        """The next non-whitespace character, or "" at the end of the file."""
+        while True:
+            while self.position < len(self.text) and self.text[self.position] in " \t\r\n":
+                self.position += 1
+            if self.position < len(self.text):
+                return self.text[self.position]
+            if not self.read_more():
+                return ""
+
+    def expect(self, characters: str) -> str:
+        character = self.skip_whitespace()
+        if character == "" or character not in characters:
+            raise ValueError(f"Invalid JSON: expected one of {characters!r} at byte {self.offset}")
+        self.position += 1
+        return character
+
+    def value(self) -> Any:
+        self.skip_whitespace()
+        while True:
+            try:
+                value, end = _JSON_DECODER.raw_decode(self.text, self.position)
+            except json.JSONDecodeError:
+                if self.read_more():
+                    continue
+                raise
+            # A number may continue in the next block
+            if end == len(self.text) and self.read_more():
+                continue
+            self.position = end
+            return value
+
+
+_JSON_DECODER = json.JSONDecoder()
+
+
+def _json_sections(mapped: mmap.mmap, block_size: int = 1024 * 1024) -> Iterator[Section]:
+    """
+    Members of a top-level object or array, pretty-printed and grouped into
+    sections of about SECTION_MAX_CHARS. One member is decoded at a time.
+    """
+    reader = _JSONReader(mapped, block_size)
+    opening = reader.skip_whitespace()
+    if opening not in ("{", "["):
+        yield {}, json.dumps(reader.value(), ensure_ascii=False, indent=2)
+        return
+    reader.position += 1
+    closing = "}" if opening == "{" else "]"
+
+    parts: List[str] = []
+    size = 0
+    section = 0
+    if reader.skip_whitespace() == closing:
+        return
+    while True:
+        if opening == "{":
+            key = reader.value()
+            reader.expect(":")
+            text = json.dumps({key: reader.value()}, ensure_ascii=False, indent=2)
+        else:
+            text = json.dumps(reader.value(), ensure_ascii=False, indent=2)
+        parts.append(text)
+        size += len(text)
+        if size >= SECTION_MAX_CHARS:
+            yield {"section": section}, "\n".join(parts)
+            section += 1
+            parts, size = [], 0
+        if reader.expect("," + closing) == closing:
+            break
+
+    if parts:
+        yield {"section": section}, "\n".join(parts)
+
+
+def _pdf_sections(mapped: mmap.mmap) -> Iterator[Section]:
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        raise ValueError("Parsing PDF documents needs the pypdf package")
+
+    for number, page in enumerate(PdfReader(mapped).pages, start=1):
+        yield {"page": number}, page.extract_text() or ""
+
+
+def _docx_sections(mapped: mmap.mmap) -> Iterator[Section]:
+    try:
+        import docx
+    except ImportError:
+        raise ValueError("Parsing DOCX documents needs the python-docx package")
+
+    section = 0
+    heading: Optional[str] = None
+    paragraphs: List[str] = []
+    for paragraph in docx.Document(mapped).paragraphs:
+        if paragraph.style is not None and paragraph.style.name.startswith("Heading"):
+            if paragraphs:
+                yield {"section": section, "heading": heading}, "\n\n".join(paragraphs)
+                section += 1
+                paragraphs = []
+            heading = paragraph.text.strip()
+        if paragraph.text.strip():
+            paragraphs.append(paragraph.text)
+    if paragraphs:
+        yield {"section": section, "heading": heading}, "\n\n".join(paragraphs)
+
+
+def split_text(text: str, chunk_size: int = 1000, chunk_overlap: int = 200) -> List[str]:
+    """
+    Split text into chunks of at most `chunk_size` characters overlapping by
+    `chunk_overlap`, preferring to break at paragraphs, lines, then spaces.
+    """
+    text = text.strip()
+    if not text:
+        return []
+    chunk_overlap = min(chunk_overlap, chunk_size // 2)
+
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(start + chunk_size, len(text))
+        if end < len(text):
+            for separator in ("\n\n", "\n", " "):
+                cut = text.rfind(separator, start + chunk_overlap + 1, end)
+                if cut != -1:
+                    end = cut
+                    break
+
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+        if end >= len(text):
+            break
+        start = max(end - chunk_overlap, start + 1)
+    return chunks
+
+
+class _CPUTimeout:
+    """
+    Interrupts parsing with TimeoutError after `seconds` of CPU time, via
+    SIGPROF (Unix only; elsewhere parsing is not interrupted). CPU time
+    rather than wall time, and paused while sending, so a worker blocked
+    on a slow consumer never times out mid-message.
+    """
+
+    def __init__(self, path: str, seconds: Optional[float]):
+        self.path = path
+        self.seconds = seconds if seconds and hasattr(signal, "setitimer") else None
+        self._previous = None
+
+    def start(self) -> None:
+        if self.seconds:
+            self._previous = signal.signal(signal.SIGPROF, self._expired)
+            signal.setitimer(signal.ITIMER_PROF, self.seconds)
+
+    def pause(self) -> float:
+        return signal.setitimer(signal.ITIMER_PROF, 0)[0] if self.seconds else 0.0
+
+    def resume(self, remaining: float) -> None:
+        if self.seconds:
+            signal.setitimer(signal.ITIMER_PROF, max(remaining, 1e-6))
+
+    def stop(self) -> None:
+        if self.seconds:
+            signal.setitimer(signal.ITIMER_PROF, 0)
+            signal.signal(signal.SIGPROF, self._previous)
+
+    def _expired(self, signum, frame):
+        raise TimeoutError(f"Parsing {self.path} took longer than {self.seconds}s")
+
+
+def parse_document(
+    path: str,
+    send: Callable[[List[Dict[str, Any]]], None],
+    chunk_size: int = 1000,
+    chunk_overlap: int = 200,
+    timeout: Optional[float] = None,
+    batch_chars: int = 1024 * 1024
+) -> None:
+    """
+    Parse and split a document section by section, passing
+    [{"metadata", "chunks"}] of about `batch_chars` characters of chunks at
+    a time to `send`. With `timeout`, parsing is interrupted with
+    TimeoutError after that many seconds of CPU time.
+    """
+    deadline = _CPUTimeout(path, timeout)
+    batch: List[Dict[str, Any]] = []
+    size = 0
+
+    def flush() -> None:
+        remaining = deadline.pause()
+        send(batch)
+        deadline.resume(remaining)
+
+    deadline.start()
+    try:
+        for metadata, text in iter_sections(path):
+            chunks = split_text(text, chunk_size, chunk_overlap)
+            if not chunks:
+                continue
+            batch.append({"metadata": metadata, "chunks": chunks})
+            size += sum(len(chunk) for chunk in chunks)
+            if size >= batch_chars:
+                flush()
+                batch, size = [], 0
+        if batch:
+            flush()
+    finally:
+        deadline.stop()
+
+
+def serve_parser(connection) -> None:
+    """
+    Main loop of a parser worker process. Takes (path, chunk_size,
+    chunk_overlap, timeout, batch_chars) requests from `connection` and
+    answers each with ("sections", [...]) messages, then ("done", None) or
+    ("error", message). Only the path goes in; files are mapped here.
+    """
+    while True:
+        try:
+            path, chunk_size, chunk_overlap, timeout, batch_chars = connection.recv()
+        except EOFError:
+            return
+        try:
+            parse_document(
+                path,
+                lambda batch: connection.send(("sections", batch)),
+                chunk_size,
+                chunk_overlap,
+                timeout,
+                batch_chars
+            )
+        except Exception as e:
+            connection.send(("error", str(e)))
+        else:
+            connection.send(("done", None))
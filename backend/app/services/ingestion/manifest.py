@@ -0,0 +1,179 @@
+from sqlalchemy.orm import Session
+from typing import Any, Dict, Iterable, List, Optional
+from dataclasses import asdict, dataclass, field
+import hashlib
+import json
+import os
+
+from app.db.models import IngestionManifestEntry
+from app.services.ingestion.loaders import file_digest
+
+
+@dataclass
+class SourceState:
+    """A document source as found on disk."""
+    path: str
+    mtime: int
+    size: int
+    content_hash: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class IngestionDiff:
+    """What an ingestion run has to do to bring an index up to date."""
+    added: List[SourceState] = field(default_factory=list)
+    changed: List[SourceState] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    stale_chunk_ids: List[str] = field(default_factory=list)  # Chunks of changed and removed sources
+    full_rebuild: bool = False
+
+    @property
+    def to_process(self) -> List[SourceState]:
+        return self.added + self.changed
+
+
+def split_signature(chunk_size: int, chunk_overlap: int) -> str:
+    """Hash of the settings that shape a source's chunks."""
+    config = json.dumps({"chunk_size": chunk_size, "chunk_overlap": chunk_overlap}, sort_keys=True)
+    return hashlib.sha256(config.encode("utf-8")).hexdigest()
+
+
+class IngestionManifest:
+    """
+    Per-index record of ingested sources: content hash, mtime, size and the
+    chunk ids each source produced.
+
+    A source whose mtime and size are unchanged is skipped without reading
+    it; otherwise its content hash decides. A source split with other
+    settings (see split_signature) counts as changed, so its chunks are
+    replaced. Entries remember the generation
+    of the index they were written to, so a restarted (empty) in-memory
+    index is rebuilt in full instead of being considered up to date.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def diff(
+        self,
+        index_name: str,
+        generation: str,
+        paths: Iterable[str],
+        roots: Optional[Iterable[str]] = None,
+        hashes: Optional[Dict[str, str]] = None,
+        split_hash: Optional[str] = None
+    ) -> IngestionDiff:
+        """
+        Compare sources on disk with the manifest of an index. Only entries
+        under `roots` (files or directories) count as removed when missing;
+        `hashes` supplies content hashes already known, e.g. from uploads.
+        `split_hash` is the split_signature the sources would be split with.
+        """
+        hashes = hashes or {}
+        roots = [os.path.abspath(root) for root in roots] if roots is not None else None
+        entries = {
+            entry.source_path: entry
+            for entry in self.db.query(IngestionManifestEntry).filter(
+                IngestionManifestEntry.index_name == index_name
+            )
+        }
+        # Entries of other roots may stay behind from an earlier index instance;
+        # only this run's sources say whether it has to start over
+        diff = IngestionDiff(full_rebuild=any(
+            entry.index_generation != generation
+            for path, entry in entries.items()
+            if _under_roots(path, roots)
+        ))
+        seen = set()
+
+        for path in paths:
+            seen.add(path)
+            stat = os.stat(path)
+            entry = None if diff.full_rebuild else entries.get(path)
+
+            if entry is not None and entry.split_hash != split_hash:
+                state = SourceState(path, stat.st_mtime_ns, stat.st_size, hashes.get(path) or file_digest(path))
+                diff.changed.append(state)
+                diff.stale_chunk_ids.extend(entry.chunk_ids or [])
+                continue
+
+            if entry is not None and entry.mtime == stat.st_mtime_ns and entry.size == stat.st_size:
+                diff.unchanged.append(path)
+                continue
+
+            state = SourceState(path, stat.st_mtime_ns, stat.st_size, hashes.get(path) or file_digest(path))
+            if entry is None:
+                diff.added.append(state)
+            elif entry.content_hash == state.content_hash:
+                # Touched but identical: remember the new mtime and move on
+                entry.mtime = state.mtime
+                diff.unchanged.append(path)
+            else:
+                diff.changed.append(state)
+                diff.stale_chunk_ids.extend(entry.chunk_ids or [])
+
+        for path, entry in entries.items():
+            if path not in seen and _under_roots(path, roots):
+                diff.removed.append(path)
+                if not diff.full_rebuild:
+                    diff.stale_chunk_ids.extend(entry.chunk_ids or [])
+
+        self.db.commit()
+        return diff
+
+    def record(
+        self,
+        index_name: str,
+        generation: str,
+        sources: Iterable[Dict[str, Any]],
+        removed: Optional[Iterable[str]] = None,
+        split_hash: Optional[str] = None
+    ) -> None:
+        """
+        Record ingested sources ({path, mtime, size, content_hash, chunk_ids})
+        and forget removed ones, once their chunks are in the index. Entries
+        written to an earlier instance of the index are forgotten as well:
+        their chunks are gone, so their sources count as new next time.
+        """
+        self.db.query(IngestionManifestEntry).filter(
+            IngestionManifestEntry.index_name == index_name,
+            IngestionManifestEntry.index_generation != generation
+        ).delete(synchronize_session=False)
+        
+        sources = list(sources)
+        paths = [source["path"] for source in sources] + list(removed or [])
+        existing = {
+            entry.source_path: entry
+            for entry in self.db.query(IngestionManifestEntry).filter(
+                IngestionManifestEntry.index_name == index_name,
+                IngestionManifestEntry.source_path.in_(paths)
+            )
+        } if paths else {}
+
+        for path in removed or []:
+            if path in existing:
+                self.db.delete(existing[path])
+
+        for source in sources:
+            entry = existing.get(source["path"])
+            if entry is None:
+                entry = IngestionManifestEntry(index_name=index_name, source_path=source["path"])
+                self.db.add(entry)
+            entry.index_generation = generation
+            entry.content_hash = source["content_hash"]
+            entry.mtime = source["mtime"]
+            entry.size = source["size"]
+            entry.chunk_ids = source["chunk_ids"]
+            entry.split_hash = split_hash
+
+        self.db.commit()
+
+
+def _under_roots(path: str, roots: Optional[List[str]]) -> bool:
+    if roots is None:
+        return True
+    return any(path == root or path.startswith(root.rstrip(os.sep) + os.sep) for root in roots)
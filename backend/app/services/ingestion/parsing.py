@@ -0,0 +1,205 @@
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
+from dataclasses import dataclass, field
+import asyncio
+import itertools
+import multiprocessing
+import os
+import time
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.services.ingestion.loaders import serve_parser
+
+
+@dataclass
+class ParsedBatch:
+    """
+    Sections of a document as a parser worker sent them. The last batch of
+    a document has `done` set, or `error` if parsing failed; chunks of a
+    failed document sent before the error should be discarded.
+    """
+    path: str
+    sections: List[Dict[str, Any]] = field(default_factory=list)  # [{"metadata", "chunks"}]
+    first_chunk: int = 0  # Number of the batch's first chunk within the document
+    done: bool = False
+    error: Optional[str] = None
+
+    @property
+    def chunk_count(self) -> int:
+        return sum(len(section["chunks"]) for section in self.sections)
+
+    def iter_chunks(self) -> Iterable[Dict[str, Any]]:
+        """Yield {"text", "metadata"} per chunk, numbered across the document."""
+        number = self.first_chunk
+        for section in self.sections:
+            for text in section["chunks"]:
+                yield {"text": text, "metadata": {**section["metadata"], "source": self.path, "chunk": number}}
+                number += 1
+
+
+class _ParserProcess:
+    """A parser worker process and its end of the pipe to it."""
+
+    def __init__(self, context):
+        self.connection, child = context.Pipe()
+        self.process = context.Process(target=serve_parser, args=(child,), daemon=True)
+        self.process.start()
+        child.close()
+
+    async def readable(self, timeout: Optional[float]) -> bool:
+        """
+        Wait until the worker has sent something, or it exited, watching
+        the pipe from the event loop rather than from a thread.
+        """
+        loop = asyncio.get_running_loop()
+        ready = loop.create_future()
+        fileno = self.connection.fileno()
+        loop.add_reader(fileno, lambda: ready.done() or ready.set_result(None))
+        try:
+            await asyncio.wait_for(ready, timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            loop.remove_reader(fileno)
+
+    def kill(self) -> None:
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(timeout=1)
+        self.connection.close()
+
+
+class DocumentParserPool:
+    """
+    Parses documents in worker processes, so CPU-bound parsing neither
+    blocks the event loop nor is limited to one core.
+
+    Each worker has a pipe of its own: it receives a file path, maps the
+    file itself and sends the chunks back in batches of about
+    INGESTION_PARSE_BATCH_CHARS characters as it goes, so neither side
+    holds a whole document. Batches are queued with a small bound, which
+    stalls the workers while the consumer is busy. Workers enforce the
+    per-file timeout themselves; one that does not answer shortly after
+    it has expired is killed and replaced, and other files in flight are
+    not affected.
+    """
+
+    # Seconds past the timeout before a worker is considered hung
+    _GRACE_SECONDS = 5.0
+
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = workers or os.cpu_count() or 1
+        self._context = multiprocessing.get_context("spawn")  # The server process holds sockets, threads and a loop
+        self._idle: List[_ParserProcess] = []
+        self.in_flight = 0
+
+    async def parse(
+        self,
+        paths: Iterable[str],
+        chunk_size: int = 1000,
+        chunk_overlap: int = 200,
+        timeout: Optional[float] = None
+    ) -> AsyncIterator[ParsedBatch]:
+        """Parse documents, yielding batches as they arrive (documents interleave)."""
+        timeout = timeout or settings.INGESTION_PARSE_TIMEOUT_SECONDS
+        paths = iter(paths)
+        batches: asyncio.Queue = asyncio.Queue(maxsize=self.workers * 2)
+        tasks = set()
+
+        def submit(count: int) -> None:
+            for path in itertools.islice(paths, count):
+                tasks.add(asyncio.create_task(self._parse_one(path, chunk_size, chunk_overlap, timeout, batches)))
+
+        submit(self.workers)
+        try:
+            while tasks or not batches.empty():
+                if batches.empty():
+                    getter = asyncio.ensure_future(batches.get())
+                    await asyncio.wait(tasks | {getter}, return_when=asyncio.FIRST_COMPLETED)
+                    if not getter.done():
+                        getter.cancel()
+                        finished = {task for task in tasks if task.done()}
+                        tasks -= finished
+                        for task in finished:
+                            task.result()
+                        submit(len(finished))
+                        continue
+                    batch = getter.result()
+                else:
+                    batch = batches.get_nowait()
+                yield batch
+                if batch.done:
+                    finished = {task for task in tasks if task.done()}
+                    tasks -= finished
+                    submit(len(finished))
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _parse_one(
+        self,
+        path: str,
+        chunk_size: int,
+        chunk_overlap: int,
+        timeout: Optional[float],
+        batches: asyncio.Queue
+    ) -> None:
+        worker = self._acquire()
+        healthy = False
+        number = 0
+        # Time spent waiting for the worker; time blocked on the queue doesn't count
+        budget = timeout + self._GRACE_SECONDS if timeout else None
+        self.in_flight += 1
+        try:
+            worker.connection.send((path, chunk_size, chunk_overlap, timeout, settings.INGESTION_PARSE_BATCH_CHARS))
+            while True:
+                started = time.monotonic()
+                ready = await worker.readable(budget)
+                if budget is not None:
+                    budget = max(budget - (time.monotonic() - started), 0.0)
+                if not ready:
+                    await batches.put(ParsedBatch(path, first_chunk=number, done=True, error=f"Parsing {path} took longer than {timeout}s"))
+                    return
+                # Workers send each message in one go, so reading the rest is quick
+                kind, payload = worker.connection.recv()
+                if kind == "sections":
+                    batch = ParsedBatch(path, payload, number)
+                    number += batch.chunk_count
+                    await batches.put(batch)
+                    continue
+                healthy = True
+                await batches.put(ParsedBatch(path, first_chunk=number, done=True, error=payload if kind == "error" else None))
+                return
+        except (EOFError, OSError):
+            await batches.put(ParsedBatch(path, first_chunk=number, done=True, error=f"Parser worker died while parsing {path}"))
+        finally:
+            self.in_flight -= 1
+            self._release(worker, healthy)
+
+    def _acquire(self) -> _ParserProcess:
+        while self._idle:
+            worker = self._idle.pop()
+            if worker.process.is_alive():
+                return worker
+            worker.kill()
+        return _ParserProcess(self._context)
+
+    def _release(self, worker: _ParserProcess, healthy: bool) -> None:
+        if healthy and len(self._idle) < self.workers:
+            self._idle.append(worker)
+        else:
+            # Hung, dead, or abandoned mid-document: its pipe may hold a stale answer
+            worker.kill()
+
+    def shutdown(self) -> None:
+        idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.kill()
+
+
+document_parsers = DocumentParserPool(settings.INGESTION_PARSER_WORKERS)
+
+metrics.gauge("road_queue_depth", "Items waiting in in-process queues", ["queue"]).labels(
+    "document_parsing"
+).set_function(lambda: document_parsers.in_flight)
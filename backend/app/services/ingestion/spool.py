@@ -0,0 +1,103 @@
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import uuid
+
+
+class SpooledDocument:
+    """Chunks of one document being written to a spool, kept only if committed."""
+
+    def __init__(self, spool: "ChunkSpool", path: str):
+        self.spool = spool
+        self.path = path
+        self.chunk_count = 0
+        self._digest = hashlib.sha256()
+        descriptor, self._filename = tempfile.mkstemp(suffix=".ndjson", dir=spool.directory)
+        self._file = os.fdopen(descriptor, "wb")
+
+    def write(self, chunks: Iterable[Dict[str, Any]]) -> None:
+        for chunk in chunks:
+            line = json.dumps(chunk, ensure_ascii=False).encode("utf-8") + b"\n"
+            self._file.write(line)
+            self._digest.update(line)
+            self.chunk_count += 1
+
+    def commit(self) -> None:
+        self._file.close()
+        self.spool._commit(self._filename, self.chunk_count, self._digest.hexdigest())
+
+    def discard(self) -> None:
+        self._file.close()
+        os.unlink(self._filename)
+
+
+class ChunkSpool:
+    """
+    Chunks produced by a document loader, kept in NDJSON files on disk
+    instead of in the node's output, so that neither the run's outputs nor
+    the recorded NodeExecution rows hold the documents. Downstream nodes
+    read the chunks back by the spool's id.
+    """
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self.directory = tempfile.mkdtemp(prefix="road-chunks-")
+        self.chunk_count = 0
+        self._files: List[str] = []
+        self._digest = hashlib.sha256()  # Over the digests of the committed documents
+
+    def document(self, path: str) -> SpooledDocument:
+        return SpooledDocument(self, path)
+
+    def _commit(self, filename: str, chunk_count: int, digest: str) -> None:
+        self._files.append(filename)
+        self.chunk_count += chunk_count
+        self._digest.update(digest.encode("ascii"))
+
+    @property
+    def sha256(self) -> str:
+        return self._digest.hexdigest()
+
+    def iter_chunks(self) -> Iterator[Dict[str, Any]]:
+        for filename in self._files:
+            with open(filename, "rb") as file:
+                for line in file:
+                    yield json.loads(line)
+
+    def remove(self) -> None:
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+class ChunkSpoolRegistry:
+    """
+    Spools of running workflows by id. Only spools created here can be
+    looked up, so node outputs (or run inputs) can't point at other files.
+    The engine releases the spools in a run's outputs when the run ends.
+    """
+
+    def __init__(self):
+        self._spools: Dict[str, ChunkSpool] = {}
+
+    def create(self) -> ChunkSpool:
+        spool = ChunkSpool()
+        self._spools[spool.id] = spool
+        return spool
+
+    def get(self, spool_id: str) -> Optional[ChunkSpool]:
+        return self._spools.get(spool_id)
+
+    def release(self, spool_id: str) -> None:
+        spool = self._spools.pop(spool_id, None)
+        if spool is not None:
+            spool.remove()
+
+    def release_all(self) -> None:
+        spools, self._spools = self._spools, {}
+        for spool in spools.values():
+            spool.remove()
+
+
+chunk_spools = ChunkSpoolRegistry()
@@ -1,99 +1,94 @@
 from typing import Dict, List, Optional
-from abc import ABC, abstractmethod
+from importlib import import_module
+from threading import Lock
 
 from app.schemas.llm import ModelInfo, LLMProvider
 from app.services.llm_providers.base_provider import BaseLLMProvider
-from app.services.llm_providers.openai import OpenAIProvider
-from app.services.llm_providers.anthropic import AnthropicProvider
-from app.services.llm_providers.google import GoogleProvider
-from app.services.llm_providers.groq import GroqProvider
-from app.services.llm_providers.huggingface import HuggingFaceProvider
+from app.services.model_registry import model_registry
+
+# Provider implementations as "module:Class", imported on first use so
+# their SDKs don't weigh on startup
+PROVIDER_CLASSES = {
+    LLMProvider.OPENAI.value: "app.services.llm_providers.openai:OpenAIProvider",
+    LLMProvider.ANTHROPIC.value: "app.services.llm_providers.anthropic:AnthropicProvider",
+    LLMProvider.GOOGLE.value: "app.services.llm_providers.google:GoogleProvider",
+    LLMProvider.GROQ.value: "app.services.llm_providers.groq:GroqProvider",
+    LLMProvider.HUGGINGFACE.value: "app.services.llm_providers.huggingface:HuggingFaceProvider",
+    LLMProvider.SIMULATED.value: "app.services.llm_providers.simulated:SimulatedProvider"
+}
 
 class LLMFactory:
-    """Factory class for managing LLM providers."""
+    """
+    Factory class for managing LLM providers.
+    
+    Providers are registered by import path and instantiated on first use.
+    """
     
+    _provider_classes: Dict[str, str] = dict(PROVIDER_CLASSES)
     _providers: Dict[str, BaseLLMProvider] = {}
-    _initialized = False
+    _lock = Lock()
     
     @classmethod
-    def _initialize_providers(cls):
-        """Initialize all LLM providers."""
-        if cls._initialized:
-            return
-        
-        cls._providers = {
-            "openai": OpenAIProvider(),
-            "anthropic": AnthropicProvider(),
-            "google": GoogleProvider(),
-            "groq": GroqProvider(),
-            "huggingface": HuggingFaceProvider()
-        }
-        cls._initialized = True
+    def register_provider(cls, provider: str, class_path: str):
+        """Register (or replace) a provider implementation given as "module:Class"."""
+        with cls._lock:
+            cls._provider_classes[provider] = class_path
+            cls._providers.pop(provider, None)
     
     @classmethod
     def get_service(cls, provider: str) -> BaseLLMProvider:
         """Get LLM service by provider name."""
-        cls._initialize_providers()
+        service = cls._providers.get(provider)
+        if service is not None:
+            return service
         
-        if provider not in cls._providers:
+        if provider not in cls._provider_classes:
             raise ValueError(f"Unsupported LLM provider: {provider}")
         
-        return cls._providers[provider]
+        with cls._lock:
+            service = cls._providers.get(provider)
+            if service is None:
+                module_name, _, class_name = cls._provider_classes[provider].partition(":")
+                service = getattr(import_module(module_name), class_name)()
+                cls._providers[provider] = service
+        return service
     
     @classmethod
     def get_available_models(cls) -> List[ModelInfo]:
         """Get list of all available models from all providers."""
-        cls._initialize_providers()
-        
-        all_models = []
-        for provider_name, provider in cls._providers.items():
-            try:
-                models = provider.get_available_models()
-                all_models.extend(models)
-            except Exception as e:
-                print(f"Error getting models from {provider_name}: {e}")
-                # Continue with other providers
-                continue
-        
-        return all_models
+        return list(model_registry.models())
     
     @classmethod
     def get_provider_models(cls, provider: str) -> List[ModelInfo]:
         """Get models for a specific provider."""
-        cls._initialize_providers()
-        
-        if provider not in cls._providers:
+        if provider not in cls._provider_classes:
             raise ValueError(f"Unsupported LLM provider: {provider}")
         
-        return cls._providers[provider].get_available_models()
+        return list(model_registry.models(provider))
     
     @classmethod
     def get_supported_providers(cls) -> List[str]:
         """Get list of supported provider names."""
-        cls._initialize_providers()
-        return list(cls._providers.keys())
+        return list(cls._provider_classes.keys())
     
     @classmethod
     def is_provider_available(cls, provider: str) -> bool:
         """Check if a provider is available and properly configured."""
-        cls._initialize_providers()
-        
-        if provider not in cls._providers:
+        if provider not in cls._provider_classes:
             return False
         
         try:
-            return cls._providers[provider].is_available()
+            return cls.get_service(provider).is_available()
         except Exception:
             return False
     
     @classmethod
     def get_provider_status(cls) -> Dict[str, dict]:
         """Get status of all providers."""
-        cls._initialize_providers()
-        
         status = {}
-        for provider_name, provider in cls._providers.items():
+        for provider_name in cls.get_supported_providers():
             try:
+                provider = cls.get_service(provider_name)
                 is_available = provider.is_available()
                 models_count = len(provider.get_available_models()) if is_available else 0
                 
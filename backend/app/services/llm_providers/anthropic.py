@@ -8,6 +8,7 @@ from app.schemas.llm import (
     LLMProvider,
     StreamChunk
 )
+from app.services.model_registry import model_registry
 from app.services.llm_providers.base_provider import BaseLLMProvider, LLMResponse
 
 class AnthropicProvider(BaseLLMProvider):
@@ -20,45 +21,7 @@ class AnthropicProvider(BaseLLMProvider):
     
     def get_available_models(self) -> List[ModelInfo]:
         """Get list of available Anthropic models."""
-        models = [
-            ModelInfo(
-                name="claude-3-opus-20240229",
-                provider=LLMProvider.ANTHROPIC,
-                description="Claude 3 Opus - Most powerful model for complex tasks",
-                max_tokens=4096,
-                supports_streaming=True,
-                parameters={
-                    "temperature": {"min": 0, "max": 1, "default": 1},
-                    "max_tokens": {"min": 1, "max": 4096, "default": 1000},
-                    "top_p": {"min": 0, "max": 1, "default": 1}
-                }
-            ),
-            ModelInfo(
-                name="claude-3-sonnet-20240229",
-                provider=LLMProvider.ANTHROPIC,
-                description="Claude 3 Sonnet - Balanced performance and speed",
-                max_tokens=4096,
-                supports_streaming=True,
-                parameters={
-                    "temperature": {"min": 0, "max": 1, "default": 1},
-                    "max_tokens": {"min": 1, "max": 4096, "default": 1000},
-                    "top_p": {"min": 0, "max": 1, "default": 1}
-                }
-            ),
-            ModelInfo(
-                name="claude-3-haiku-20240307",
-                provider=LLMProvider.ANTHROPIC,
-                description="Claude 3 Haiku - Fast and efficient",
-                max_tokens=4096,
-                supports_streaming=True,
-                parameters={
-                    "temperature": {"min": 0, "max": 1, "default": 1},
-                    "max_tokens": {"min": 1, "max": 4096, "default": 1000},
-                    "top_p": {"min": 0, "max": 1, "default": 1}
-                }
-            )
-        ]
-        return models
+        return list(model_registry.models(LLMProvider.ANTHROPIC.value))
     
     async def chat(
         self,
@@ -1,7 +1,12 @@
 from abc import ABC, abstractmethod
 from typing import List, Optional, AsyncGenerator
 from dataclasses import dataclass
+import asyncio
+import functools
+import time
 
+from app.core.metrics import metrics
+from app.core.tracing import tracer
 from app.schemas.llm import (
     ChatMessage,
     LLMParameters,
@@ -9,6 +14,105 @@ from app.schemas.llm import (
     LLMProvider,
     StreamChunk
 )
+from app.services.model_registry import model_registry
+
+_call_duration = metrics.histogram(
+    "road_llm_request_duration_seconds",
+    "Duration of LLM provider calls",
+    ["provider", "model", "mode", "outcome"]
+)
+_time_to_first_token = metrics.histogram(
+    "road_llm_time_to_first_token_seconds",
+    "Time from a streaming call to its first text",
+    ["provider", "model"]
+)
+_tokens_per_second = metrics.histogram(
+    "road_llm_tokens_per_second",
+    "Generation rate after the first token (streamed deltas count as one token each)",
+    ["provider", "model"],
+    buckets=(1, 5, 10, 20, 40, 60, 80, 100, 150, 200, 300, 500, 1000)
+)
+_completion_tokens = metrics.counter(
+    "road_llm_completion_tokens_total",
+    "Tokens generated by LLM providers",
+    ["provider", "model"]
+)
+
+
+def _model_name(args: tuple, kwargs: dict) -> str:
+    return kwargs.get("model_name", args[0] if args else "")
+
+
+def _labels(provider: "BaseLLMProvider", model_name: str) -> tuple:
+    # Unknown model names are pooled to keep the number of series bounded
+    return provider.provider_name, model_name if model_registry.knows(model_name) else "other"
+
+
+def _instrument_chat(chat):
+    @functools.wraps(chat)
+    async def instrumented(self, *args, **kwargs):
+        model_name = _model_name(args, kwargs)
+        provider, model = _labels(self, model_name)
+        started = time.perf_counter()
+        outcome = "error"
+        with tracer.span("llm.chat", "client") as span:
+            span.set_attribute("gen_ai.system", provider)
+            span.set_attribute("gen_ai.request.model", model_name)
+            try:
+                response = await chat(self, *args, **kwargs)
+                outcome = "success"
+            finally:
+                elapsed = time.perf_counter() - started
+                _call_duration.labels(provider, model, "chat", outcome).observe(elapsed)
+
+            tokens = (response.usage or {}).get("completion_tokens")
+            if tokens:
+                span.set_attribute("gen_ai.usage.output_tokens", tokens)
+                _completion_tokens.labels(provider, model).inc(tokens)
+                _tokens_per_second.labels(provider, model).observe(tokens / max(elapsed, 1e-6))
+        return response
+    return instrumented
+
+
+def _instrument_stream(stream_text):
+    @functools.wraps(stream_text)
+    async def instrumented(self, *args, **kwargs):
+        model_name = _model_name(args, kwargs)
+        provider, model = _labels(self, model_name)
+        # Not made current: the generator's caller runs between yields
+        span = tracer.start_span("llm.stream", "client")
+        span.set_attribute("gen_ai.system", provider)
+        span.set_attribute("gen_ai.request.model", model_name)
+        started = time.perf_counter()
+        first_token_at = None
+        tokens = 0
+        outcome = "error"
+        try:
+            async for delta in stream_text(self, *args, **kwargs):
+                if first_token_at is None:
+                    first_token_at = time.perf_counter()
+                    _time_to_first_token.labels(provider, model).observe(first_token_at - started)
+                    span.add_event("first_token")
+                tokens += 1
+                yield delta
+            outcome = "success"
+        except (GeneratorExit, asyncio.CancelledError):
+            outcome = "cancelled"
+            raise
+        except Exception as e:
+            span.record_exception(e)
+            raise
+        finally:
+            finished = time.perf_counter()
+            _call_duration.labels(provider, model, "stream", outcome).observe(finished - started)
+            if tokens:
+                _completion_tokens.labels(provider, model).inc(tokens)
+            if tokens > 1:
+                _tokens_per_second.labels(provider, model).observe((tokens - 1) / max(finished - first_token_at, 1e-6))
+            span.set_attribute("gen_ai.usage.output_tokens", tokens)
+            span.set_attribute("road.outcome", outcome)
+            span.end()
+    return instrumented
 
 @dataclass
 class LLMResponse:
@@ -19,7 +123,19 @@ class LLMResponse:
     finish_reason: Optional[str] = None
 
 class BaseLLMProvider(ABC):
-    """Abstract base class for LLM providers."""
+    """
+    Abstract base class for LLM providers.
+    
+    `chat` and `stream_text` of every provider are timed for the metrics
+    and traced without the providers having to do anything.
+    """
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if "chat" in cls.__dict__:
+            cls.chat = _instrument_chat(cls.__dict__["chat"])
+        if "stream_text" in cls.__dict__:
+            cls.stream_text = _instrument_stream(cls.__dict__["stream_text"])
     
     def __init__(self):
         self.provider_name = ""
@@ -53,6 +169,24 @@ class BaseLLMProvider(ABC):
         """Stream chat responses from the LLM."""
         pass
     
+    @_instrument_stream
+    async def stream_text(
+        self,
+        model_name: str,
+        messages: List[ChatMessage],
+        system_prompt: Optional[str] = None,
+        parameters: Optional[LLMParameters] = None
+    ) -> AsyncGenerator[str, None]:
+        """Stream the response as plain text deltas, without a model object per token."""
+        async for chunk in self.stream_chat(
+            model_name=model_name,
+            messages=messages,
+            system_prompt=system_prompt,
+            parameters=parameters
+        ):
+            if chunk.content:
+                yield chunk.content
+    
     @abstractmethod
     async def test_connection(self, model_name: Optional[str] = None) -> bool:
         """Test connection to the provider."""
@@ -8,6 +8,7 @@ from app.schemas.llm import (
     LLMProvider,
     StreamChunk
 )
+from app.services.model_registry import model_registry
 from app.services.llm_providers.base_provider import BaseLLMProvider, LLMResponse
 
 class GoogleProvider(BaseLLMProvider):
@@ -20,33 +21,7 @@ class GoogleProvider(BaseLLMProvider):
     
     def get_available_models(self) -> List[ModelInfo]:
         """Get list of available Google models."""
-        models = [
-            ModelInfo(
-                name="gemini-pro",
-                provider=LLMProvider.GOOGLE,
-                description="Gemini Pro - Google's most capable model",
-                max_tokens=8192,
-                supports_streaming=True,
-                parameters={
-                    "temperature": {"min": 0, "max": 1, "default": 0.9},
-                    "max_tokens": {"min": 1, "max": 8192, "default": 1000},
-                    "top_p": {"min": 0, "max": 1, "default": 1}
-                }
-            ),
-            ModelInfo(
-                name="gemini-pro-vision",
-                provider=LLMProvider.GOOGLE,
-                description="Gemini Pro Vision - Multimodal model with image understanding",
-                max_tokens=4096,
-                supports_streaming=True,
-                parameters={
-                    "temperature": {"min": 0, "max": 1, "default": 0.4},
-                    "max_tokens": {"min": 1, "max": 4096, "default": 1000},
-                    "top_p": {"min": 0, "max": 1, "default": 1}
-                }
-            )
-        ]
-        return models
+        return list(model_registry.models(LLMProvider.GOOGLE.value))
     
     async def chat(
         self,
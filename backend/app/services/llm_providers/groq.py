@@ -8,6 +8,7 @@ from app.schemas.llm import (
     LLMProvider,
     StreamChunk
 )
+from app.services.model_registry import model_registry
 from app.services.llm_providers.base_provider import BaseLLMProvider, LLMResponse
 
 class GroqProvider(BaseLLMProvider):
@@ -20,45 +21,7 @@ class GroqProvider(BaseLLMProvider):
     
     def get_available_models(self) -> List[ModelInfo]:
         """Get list of available Groq models."""
-        models = [
-            ModelInfo(
-                name="llama3-8b-8192",
-                provider=LLMProvider.GROQ,
-                description="Llama 3 8B - Fast inference with 8K context",
-                max_tokens=8192,
-                supports_streaming=True,
-                parameters={
-                    "temperature": {"min": 0, "max": 2, "default": 1},
-                    "max_tokens": {"min": 1, "max": 8192, "default": 1000},
-                    "top_p": {"min": 0, "max": 1, "default": 1}
-                }
-            ),
-            ModelInfo(
-                name="llama3-70b-8192",
-                provider=LLMProvider.GROQ,
-                description="Llama 3 70B - More capable with 8K context",
-                max_tokens=8192,
-                supports_streaming=True,
-                parameters={
-                    "temperature": {"min": 0, "max": 2, "default": 1},
-                    "max_tokens": {"min": 1, "max": 8192, "default": 1000},
-                    "top_p": {"min": 0, "max": 1, "default": 1}
-                }
-            ),
-            ModelInfo(
-                name="mixtral-8x7b-32768",
-                provider=LLMProvider.GROQ,
-                description="Mixtral 8x7B - High performance mixture of experts",
-                max_tokens=32768,
-                supports_streaming=True,
-                parameters={
-                    "temperature": {"min": 0, "max": 1, "default": 0.5},
-                    "max_tokens": {"min": 1, "max": 32768, "default": 1000},
-                    "top_p": {"min": 0, "max": 1, "default": 1}
-                }
-            )
-        ]
-        return models
+        return list(model_registry.models(LLMProvider.GROQ.value))
     
     async def chat(
         self,
@@ -8,6 +8,7 @@ from app.schemas.llm import (
     LLMProvider,
     StreamChunk
 )
+from app.services.model_registry import model_registry
 from app.services.llm_providers.base_provider import BaseLLMProvider, LLMResponse
 
 class HuggingFaceProvider(BaseLLMProvider):
@@ -20,45 +21,7 @@ class HuggingFaceProvider(BaseLLMProvider):
     
     def get_available_models(self) -> List[ModelInfo]:
         """Get list of available Hugging Face models."""
-        models = [
-            ModelInfo(
-                name="microsoft/DialoGPT-medium",
-                provider=LLMProvider.HUGGINGFACE,
-                description="DialoGPT Medium - Conversational AI model",
-                max_tokens=1024,
-                supports_streaming=False,
-                parameters={
-                    "temperature": {"min": 0, "max": 1, "default": 0.7},
-                    "max_tokens": {"min": 1, "max": 1024, "default": 100},
-                    "top_p": {"min": 0, "max": 1, "default": 0.9}
-                }
-            ),
-            ModelInfo(
-                name="meta-llama/Llama-2-7b-chat-hf",
-                provider=LLMProvider.HUGGINGFACE,
-                description="Llama 2 7B Chat - Open source conversational model",
-                max_tokens=4096,
-                supports_streaming=False,
-                parameters={
-                    "temperature": {"min": 0, "max": 1, "default": 0.7},
-                    "max_tokens": {"min": 1, "max": 4096, "default": 512},
-                    "top_p": {"min": 0, "max": 1, "default": 0.9}
-                }
-            ),
-            ModelInfo(
-                name="mistralai/Mistral-7B-Instruct-v0.1",
-                provider=LLMProvider.HUGGINGFACE,
-                description="Mistral 7B Instruct - High-performance instruction following",
-                max_tokens=8192,
-                supports_streaming=False,
-                parameters={
-                    "temperature": {"min": 0, "max": 1, "default": 0.7},
-                    "max_tokens": {"min": 1, "max": 8192, "default": 512},
-                    "top_p": {"min": 0, "max": 1, "default": 0.9}
-                }
-            )
-        ]
-        return models
+        return list(model_registry.models(LLMProvider.HUGGINGFACE.value))
     
     async def chat(
         self,
@@ -1,6 +1,4 @@
 from typing import List, Optional, AsyncGenerator
-import openai
-from openai import AsyncOpenAI
 
 from app.core.config import settings
 from app.schemas.llm import (
@@ -10,6 +8,7 @@ from app.schemas.llm import (
     LLMProvider,
     StreamChunk
 )
+from app.services.model_registry import model_registry
 from app.services.llm_providers.base_provider import BaseLLMProvider, LLMResponse
 
 class OpenAIProvider(BaseLLMProvider):
@@ -19,151 +18,19 @@ class OpenAIProvider(BaseLLMProvider):
         super().__init__()
         self.provider_name = "OpenAI"
         self.api_key = settings.OPENAI_API_KEY
-        self.client = None
-        
-        if self.api_key:
-            self.client = AsyncOpenAI(api_key=self.api_key)
+        self._client = None
+    
+    @property
+    def client(self):
+        """The SDK client, created (and the SDK imported) on first use."""
+        if self._client is None and self.api_key:
+            from openai import AsyncOpenAI
+            self._client = AsyncOpenAI(api_key=self.api_key)
+        return self._client
     
     def get_available_models(self) -> List[ModelInfo]:
         """Get list of available OpenAI models."""
-        models = [
-            ModelInfo(
-                name="gpt-4.1",
-                provider=LLMProvider.OPENAI,
-                description="GPT-4.1 - 복잡한 작업을 위한 플래그십 GPT 모델",
-                max_tokens=32768,
-                supports_streaming=True,
-                supports_functions=True,
-                parameters={
-                    "temperature": {"min": 0, "max": 2, "default": 1},
-                    "max_tokens": {"min": 1, "max": 32768, "default": 20000},
-                    "top_p": {"min": 0, "max": 1, "default": 1},
-                    "presence_penalty": {"min": -2, "max": 2, "default": 0},
-                    "frequency_penalty": {"min": -2, "max": 2, "default": 0}
-                }
-            ),
-            ModelInfo(
-                name="gpt-4.1-mini",
-                provider=LLMProvider.OPENAI,
-                description="지능, 속도, 비용 측면에서 균형 잡힌 GPT-4.1의 소형 모델",
-                max_tokens=128000,
-                supports_streaming=True,
-                supports_functions=True,
-                parameters={
-                    "temperature": {"min": 0, "max": 2, "default": 1},
-                    "max_tokens": {"min": 1, "max": 4096, "default": 1000},
-                    "top_p": {"min": 0, "max": 1, "default": 1},
-                    "presence_penalty": {"min": -2, "max": 2, "default": 0},
-                    "frequency_penalty": {"min": -2, "max": 2, "default": 0}
-                }
-            ),
-            ModelInfo(
-                name="gpt-4.1-nano",
-                provider=LLMProvider.OPENAI,
-                description="빠르고 비용 효율적인 GPT-4.1의 소형 모델",
-                max_tokens=32768,
-                supports_streaming=True,
-                supports_functions=True,
-                parameters={
-                    "temperature": {"min": 0, "max": 2, "default": 1},
-                    "max_tokens": {"min": 1, "max": 32768, "default": 20000},
-                    "top_p": {"min": 0, "max": 1, "default": 1},
-                    "presence_penalty": {"min": -2, "max": 2, "default": 0},
-                    "frequency_penalty": {"min": -2, "max": 2, "default": 0}
-                }
-            ),
-            ModelInfo(
-                name="o3",
-                provider=LLMProvider.OPENAI,
-                description="OpenAI의 가장 강력한 추론 모델",
-                max_tokens=100000,
-                supports_streaming=True,
-                supports_functions=True,
-                parameters={
-                    "temperature": {"min": 0, "max": 2, "default": 1},
-                    "max_tokens": {"min": 1, "max": 100000, "default": 50000},
-                    "top_p": {"min": 0, "max": 1, "default": 1},
-                    "presence_penalty": {"min": -2, "max": 2, "default": 0},
-                    "frequency_penalty": {"min": -2, "max": 2, "default": 0}
-                }
-            ),
-            ModelInfo(
-                name="o4-mini",
-                provider=LLMProvider.OPENAI,
-                description="빠르고 저렴한 추론 모델",
-                max_tokens=100000,
-                supports_streaming=True,
-                supports_functions=True,
-                parameters={
-                    "temperature": {"min": 0, "max": 2, "default": 1},
-                    "max_tokens": {"min": 1, "max": 100000, "default": 50000},
-                    "top_p": {"min": 0, "max": 1, "default": 1},
-                    "presence_penalty": {"min": -2, "max": 2, "default": 0},
-                    "frequency_penalty": {"min": -2, "max": 2, "default": 0}
-                }
-            ),
-            ModelInfo(
-                name="o3-mini",
-                provider=LLMProvider.OPENAI,
-                description="o3의 소형 모델",
-                max_tokens=100000,
-                supports_streaming=True,
-                supports_functions=True,
-                parameters={
-                    "temperature": {"min": 0, "max": 2, "default": 1},
-                    "max_tokens": {"min": 1, "max": 100000, "default": 50000},
-                    "top_p": {"min": 0, "max": 1, "default": 1},
-                    "presence_penalty": {"min": -2, "max": 2, "default": 0},
-                    "frequency_penalty": {"min": -2, "max": 2, "default": 0}
-                }
-            ),
-            ModelInfo(
-                name="chatgpt-4o-latest",
-                provider=LLMProvider.OPENAI,
-                description="ChatGPT에서 사용되는 최신 GPT-4o 모델",
-                max_tokens=4096,
-                supports_streaming=True,
-                supports_functions=True,
-                parameters={
-                    "temperature": {"min": 0, "max": 2, "default": 1},
-                    "max_tokens": {"min": 1, "max": 4096, "default": 1000},
-                    "top_p": {"min": 0, "max": 1, "default": 1},
-                    "presence_penalty": {"min": -2, "max": 2, "default": 0},
-                    "frequency_penalty": {"min": -2, "max": 2, "default": 0}
-                }
-            ),
-            ModelInfo(
-                name="gpt-4o",
-                provider=LLMProvider.OPENAI,
-                description="빠르고 지능적이며 유연한 GPT 모델",
-                max_tokens=16384,
-                supports_streaming=True,
-                supports_functions=True,
-                parameters={
-                    "temperature": {"min": 0, "max": 2, "default": 1},
-                    "max_tokens": {"min": 1, "max": 16384, "default": 10000},
-                    "top_p": {"min": 0, "max": 1, "default": 1},
-                    "presence_penalty": {"min": -2, "max": 2, "default": 0},
-                    "frequency_penalty": {"min": -2, "max": 2, "default": 0}
-                }
-            ),
-            ModelInfo(
-                name="gpt-4o-mini",
-                provider=LLMProvider.OPENAI,
-                description="집중적인 작업을 위한 빠르고 저렴한 gpt-4o의 소형 모델",
-                max_tokens=16384,
-                supports_streaming=True,
-                supports_functions=True,
-                parameters={
-                    "temperature": {"min": 0, "max": 2, "default": 1},
-                    "max_tokens": {"min": 1, "max": 16384, "default": 10000},
-                    "top_p": {"min": 0, "max": 1, "default": 1},
-                    "presence_penalty": {"min": -2, "max": 2, "default": 0},
-                    "frequency_penalty": {"min": -2, "max": 2, "default": 0}
-                }
-            )
-        ]
-        return models
+        return list(model_registry.models(LLMProvider.OPENAI.value))
     
     async def chat(
         self,
@@ -213,6 +80,20 @@ class OpenAIProvider(BaseLLMProvider):
         parameters: Optional[LLMParameters] = None
     ) -> AsyncGenerator[StreamChunk, None]:
         """Stream chat responses from OpenAI."""
+        async for content in self.stream_text(model_name, messages, system_prompt, parameters):
+            yield StreamChunk(content=content, finished=False)
+        
+        # Send final chunk
+        yield StreamChunk(content="", finished=True)
+    
+    async def stream_text(
+        self,
+        model_name: str,
+        messages: List[ChatMessage],
+        system_prompt: Optional[str] = None,
+        parameters: Optional[LLMParameters] = None
+    ) -> AsyncGenerator[str, None]:
+        """Stream response text deltas from OpenAI."""
         if not self.client:
             raise Exception("OpenAI client not initialized. Please check your API key.")
         
@@ -229,13 +110,7 @@ class OpenAIProvider(BaseLLMProvider):
             
             async for chunk in stream:
                 if chunk.choices and chunk.choices[0].delta.content:
-                    yield StreamChunk(
-                        content=chunk.choices[0].delta.content,
-                        finished=False
-                    )
-            
-            # Send final chunk
-            yield StreamChunk(content="", finished=True)
+                    yield chunk.choices[0].delta.content
             
         except Exception as e:
             raise Exception(self._handle_error(e))
@@ -246,12 +121,9 @@ class OpenAIProvider(BaseLLMProvider):
             return False
         
         try:
+            # Looking the model up checks the key and the model without spending tokens
             test_model = model_name or "gpt-3.5-turbo"
-            response = await self.client.chat.completions.create(
-                model=test_model,
-                messages=[{"role": "user", "content": "Hello"}],
-                max_tokens=1
-            )
+            response = await self.client.models.retrieve(test_model)
             return response is not None
             
         except Exception:
@@ -259,4 +131,4 @@ class OpenAIProvider(BaseLLMProvider):
     
     def is_available(self) -> bool:
         """Check if OpenAI is properly configured."""
-        return self.api_key is not None and self.client is not None 
\ No newline at end of file
+        return bool(self.api_key) 
\ No newline at end of file
@@ -0,0 +1,312 @@
+from dataclasses import dataclass, fields
+from typing import Any, AsyncGenerator, Dict, List, Optional
+import asyncio
+import hashlib
+import json
+import math
+import random
+import time
+
+from app.core.config import settings
+from app.schemas.llm import (
+    ChatMessage,
+    LLMParameters,
+    ModelInfo,
+    LLMProvider,
+    StreamChunk
+)
+from app.services.model_registry import model_registry
+from app.services.llm_providers.base_provider import BaseLLMProvider, LLMResponse
+
+DISTRIBUTIONS = ("constant", "uniform", "normal", "lognormal", "exponential")
+
+# Text the simulated models "generate"; one word is one token
+_VOCABULARY = (
+    "the model answers with a plausible sentence about retrieval augmented generation "
+    "prompt context document embedding vector search ranking latency token stream "
+    "workflow node output input query response system user assistant data result "
+    "and of to in for with on is are was it this that by from as at be can will"
+).split()
+
+
+@dataclass(frozen=True)
+class Distribution:
+    """
+    A random quantity: milliseconds for latencies, tokens for output lengths.
+
+    `mean` is the median for lognormal and `spread` its sigma (shape);
+    for normal it is the standard deviation and for uniform the half-width.
+    Samples never go below `minimum`, or above `maximum` when set.
+    """
+    kind: str = "constant"
+    mean: float = 0.0
+    spread: float = 0.0
+    minimum: float = 0.0
+    maximum: Optional[float] = None
+
+    def __post_init__(self):
+        if self.kind not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown distribution {self.kind!r}, expected one of {', '.join(DISTRIBUTIONS)}")
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "constant":
+            value = self.mean
+        elif self.kind == "uniform":
+            value = rng.uniform(self.mean - self.spread, self.mean + self.spread)
+        elif self.kind == "normal":
+            value = rng.gauss(self.mean, self.spread)
+        elif self.kind == "lognormal":
+            value = self.mean * math.exp(rng.gauss(0.0, self.spread)) if self.mean > 0 else 0.0
+        else:
+            value = rng.expovariate(1.0 / self.mean) if self.mean > 0 else 0.0
+        value = max(value, self.minimum)
+        return min(value, self.maximum) if self.maximum is not None else value
+
+
+@dataclass(frozen=True)
+class SimulationProfile:
+    """How one simulated model behaves."""
+    time_to_first_token_ms: Distribution = Distribution()
+    inter_token_ms: Distribution = Distribution()
+    output_tokens: Distribution = Distribution("constant", 50, minimum=1)
+    error_rate: float = 0.0  # Share of calls that fail, before or during the response
+    rate_limit_rate: float = 0.0  # Chance per call of starting a burst of 429s
+    rate_limit_burst_seconds: float = 0.0  # How long each burst rejects every call
+    rate_limit_retry_after: float = 1.0  # Seconds, reported with each 429
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SimulationProfile":
+        known = {f.name for f in fields(cls)}
+        unknown = set(data) - known
+        if unknown:
+            raise ValueError(f"Unknown simulation settings: {', '.join(sorted(unknown))}")
+        values = {
+            key: Distribution(**value) if isinstance(value, dict) else value
+            for key, value in data.items()
+        }
+        return cls(**values)
+
+
+# Profiles of the models in data/models/simulated.json; SIMULATED_LLM_PROFILES_PATH
+# can override them or add models
+DEFAULT_PROFILES: Dict[str, SimulationProfile] = {
+    "sim-instant": SimulationProfile(
+        output_tokens=Distribution("uniform", 40, 20, minimum=1)
+    ),
+    "sim-fast": SimulationProfile(
+        time_to_first_token_ms=Distribution("lognormal", 150, 0.3),
+        inter_token_ms=Distribution("lognormal", 6, 0.4),
+        output_tokens=Distribution("lognormal", 200, 0.6, minimum=1)
+    ),
+    "sim-standard": SimulationProfile(
+        time_to_first_token_ms=Distribution("lognormal", 450, 0.5),
+        inter_token_ms=Distribution("lognormal", 25, 0.5),
+        output_tokens=Distribution("lognormal", 300, 0.7, minimum=1),
+        error_rate=0.005,
+        rate_limit_rate=0.002,
+        rate_limit_burst_seconds=2.0
+    ),
+    "sim-slow": SimulationProfile(
+        time_to_first_token_ms=Distribution("lognormal", 1500, 0.6),
+        inter_token_ms=Distribution("lognormal", 60, 0.5),
+        output_tokens=Distribution("lognormal", 600, 0.6, minimum=1),
+        error_rate=0.01
+    ),
+    "sim-flaky": SimulationProfile(
+        time_to_first_token_ms=Distribution("exponential", 600, minimum=50, maximum=10000),
+        inter_token_ms=Distribution("exponential", 30, maximum=2000),
+        output_tokens=Distribution("lognormal", 250, 0.8, minimum=1),
+        error_rate=0.05,
+        rate_limit_rate=0.02,
+        rate_limit_burst_seconds=5.0,
+        rate_limit_retry_after=2.0
+    )
+}
+
+
+class SimulatedProviderError(Exception):
+    """A failure the simulated provider was configured to produce."""
+
+
+class SimulatedRateLimitError(SimulatedProviderError):
+    """A simulated 429."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+@dataclass
+class _Plan:
+    """Everything random about one call, drawn up front."""
+    first_token: float  # seconds
+    gaps: List[float]  # seconds before each later token
+    tokens: List[str]
+    finish_reason: str
+    fail_after: Optional[int] = None  # tokens sent before the call fails
+    prompt_tokens: int = 0
+
+
+@dataclass
+class _RateLimitState:
+    until: float = 0.0
+    retry_after: float = 1.0
+
+
+class SimulatedProvider(BaseLLMProvider):
+    """
+    Offline provider simulating a real LLM API, for load tests.
+
+    Each model has a SimulationProfile: distributions of time to first
+    token, time between tokens and output length, a share of failing calls,
+    and bursts during which every call gets a 429. Latencies are real
+    `asyncio.sleep`s, so the rest of the stack sees realistic concurrency.
+
+    With SIMULATED_LLM_SEED set, latencies and failures follow a fixed
+    random sequence. The text depends only on the model and the prompt, so
+    the same request always produces the same output.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.provider_name = "Simulated"
+        self.profiles = dict(DEFAULT_PROFILES)
+        if settings.SIMULATED_LLM_PROFILES_PATH:
+            self.profiles.update(self._load_profiles(settings.SIMULATED_LLM_PROFILES_PATH))
+        self._rng = random.Random(settings.SIMULATED_LLM_SEED)
+        self._rate_limits: Dict[str, _RateLimitState] = {}
+
+    def get_available_models(self) -> List[ModelInfo]:
+        """Get list of simulated models."""
+        return list(model_registry.models(LLMProvider.SIMULATED.value))
+
+    async def chat(
+        self,
+        model_name: str,
+        messages: List[ChatMessage],
+        system_prompt: Optional[str] = None,
+        parameters: Optional[LLMParameters] = None
+    ) -> LLMResponse:
+        """Wait as long as the whole response would take to generate, then return it."""
+        plan = self._plan(model_name, messages, system_prompt, parameters)
+
+        if plan.fail_after is not None:
+            await self._sleep(plan.first_token + sum(plan.gaps[:plan.fail_after]))
+            raise SimulatedProviderError(f"{self.provider_name} error: simulated failure of {model_name}")
+
+        await self._sleep(plan.first_token + sum(plan.gaps))
+        return LLMResponse(
+            content="".join(plan.tokens),
+            usage={
+                "prompt_tokens": plan.prompt_tokens,
+                "completion_tokens": len(plan.tokens),
+                "total_tokens": plan.prompt_tokens + len(plan.tokens)
+            },
+            model=model_name,
+            finish_reason=plan.finish_reason
+        )
+
+    async def stream_chat(
+        self,
+        model_name: str,
+        messages: List[ChatMessage],
+        system_prompt: Optional[str] = None,
+        parameters: Optional[LLMParameters] = None
+    ) -> AsyncGenerator[StreamChunk, None]:
+        """Stream simulated chat responses."""
+        async for content in self.stream_text(model_name, messages, system_prompt, parameters):
+            yield StreamChunk(content=content, finished=False)
+
+        yield StreamChunk(content="", finished=True)
+
+    async def stream_text(
+        self,
+        model_name: str,
+        messages: List[ChatMessage],
+        system_prompt: Optional[str] = None,
+        parameters: Optional[LLMParameters] = None
+    ) -> AsyncGenerator[str, None]:
+        """Stream the response one token at a time, at the simulated pace."""
+        plan = self._plan(model_name, messages, system_prompt, parameters)
+
+        await self._sleep(plan.first_token)
+        for index, token in enumerate(plan.tokens):
+            if index == plan.fail_after:
+                raise SimulatedProviderError(f"{self.provider_name} error: simulated failure of {model_name} mid-stream")
+            if index:
+                await self._sleep(plan.gaps[index - 1])
+            yield token
+
+    async def test_connection(self, model_name: Optional[str] = None) -> bool:
+        """The simulation is always reachable while enabled."""
+        return self.is_available() and (model_name is None or model_name in self.profiles)
+
+    def is_available(self) -> bool:
+        """Check if the simulated provider is enabled."""
+        return settings.SIMULATED_LLM_ENABLED
+
+    def _plan(
+        self,
+        model_name: str,
+        messages: List[ChatMessage],
+        system_prompt: Optional[str],
+        parameters: Optional[LLMParameters]
+    ) -> _Plan:
+        if not self.is_available():
+            raise Exception("Simulated provider is disabled. Set SIMULATED_LLM_ENABLED to use it.")
+
+        profile = self.profiles.get(model_name)
+        if profile is None:
+            raise Exception(f"Model not found or not available for {self.provider_name}: {model_name}")
+
+        self._check_rate_limit(model_name, profile)
+
+        rng = self._rng
+        length = max(1, int(profile.output_tokens.sample(rng)))
+        finish_reason = "stop"
+        if parameters is not None and length > parameters.max_tokens:
+            length, finish_reason = parameters.max_tokens, "length"
+
+        fail_after = None
+        if profile.error_rate and rng.random() < profile.error_rate:
+            fail_after = rng.randrange(length)
+
+        prompt = "\n".join([system_prompt or ""] + [message.content for message in messages])
+        return _Plan(
+            first_token=profile.time_to_first_token_ms.sample(rng) / 1000,
+            gaps=[profile.inter_token_ms.sample(rng) / 1000 for _ in range(length - 1)],
+            tokens=self._text(model_name, prompt, length),
+            finish_reason=finish_reason,
+            fail_after=fail_after,
+            prompt_tokens=len(prompt.split())
+        )
+
+    def _check_rate_limit(self, model_name: str, profile: SimulationProfile) -> None:
+        state = self._rate_limits.setdefault(model_name, _RateLimitState())
+        now = time.monotonic()
+        if now >= state.until and profile.rate_limit_rate and self._rng.random() < profile.rate_limit_rate:
+            state.until = now + profile.rate_limit_burst_seconds
+            state.retry_after = profile.rate_limit_retry_after
+        if now < state.until:
+            raise SimulatedRateLimitError(
+                f"Rate limit exceeded for {self.provider_name}. Please try again later. (429)",
+                retry_after=state.retry_after
+            )
+
+    @staticmethod
+    def _text(model_name: str, prompt: str, length: int) -> List[str]:
+        digest = hashlib.sha256(f"{model_name}\0{prompt}".encode("utf-8")).digest()
+        rng = random.Random(digest)
+        words = rng.choices(_VOCABULARY, k=length)
+        return [words[0].capitalize()] + [" " + word for word in words[1:]]
+
+    @staticmethod
+    async def _sleep(seconds: float) -> None:
+        # Still yields to the event loop when there is no latency to simulate
+        await asyncio.sleep(max(seconds, 0))
+
+    @staticmethod
+    def _load_profiles(path: str) -> Dict[str, SimulationProfile]:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return {name: SimulationProfile.from_dict(profile) for name, profile in data.items()}
@@ -0,0 +1,156 @@
+# backend/app/services/model_registry.py
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, FrozenSet, List, Mapping, Optional, Tuple
+import asyncio
+import glob
+import json
+import os
+
+from app.core.cache import CachedPayload
+from app.core.config import settings
+from app.schemas.llm import LLMProvider, ModelInfo, ModelListResponse
+
+
+@dataclass(frozen=True)
+class _Catalog:
+    """One loaded version of the model definitions; never modified."""
+    by_provider: Mapping[str, Tuple[ModelInfo, ...]]
+    by_name: Mapping[Tuple[str, str], ModelInfo]
+    all_models: Tuple[ModelInfo, ...]
+    names: FrozenSet[str]
+    payloads: Mapping[Optional[str], CachedPayload]
+    signature: Tuple[Tuple[str, int, int], ...]
+
+
+class ModelRegistry:
+    """
+    Model catalog loaded from the JSON files in MODEL_REGISTRY_PATH.
+
+    Definitions are parsed once into an immutable catalog, indexed by
+    provider and by (provider, name), with the /models responses serialized
+    up front. Lookups read the current catalog without copying. Edited files
+    are picked up by polling every MODEL_REGISTRY_RELOAD_INTERVAL seconds:
+    a new catalog is built aside and swapped in whole, and one that fails
+    to load leaves the current catalog in place. The simulated provider's
+    models are left out unless SIMULATED_LLM_ENABLED is set.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or settings.MODEL_REGISTRY_PATH
+        self._catalog: Optional[_Catalog] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def catalog(self) -> _Catalog:
+        if self._catalog is None:
+            self._catalog = self._load(self._signature())
+        return self._catalog
+
+    def models(self, provider: Optional[str] = None) -> Tuple[ModelInfo, ...]:
+        """Models of one provider, or of all of them."""
+        catalog = self.catalog
+        if provider is None:
+            return catalog.all_models
+        return catalog.by_provider.get(provider, ())
+
+    def get(self, provider: str, name: str) -> Optional[ModelInfo]:
+        return self.catalog.by_name.get((provider, name))
+
+    def knows(self, name: str) -> bool:
+        """Whether any provider defines a model of this name."""
+        return name in self.catalog.names
+
+    def payload(self, provider: Optional[str] = None) -> CachedPayload:
+        """The serialized model list, of all providers or one."""
+        payload = self.catalog.payloads.get(provider)
+        if payload is None:
+            raise ValueError(f"Unsupported LLM provider: {provider}")
+        return payload
+
+    def reload(self) -> bool:
+        """Reload the definitions if their files changed; True if reloaded."""
+        signature = self._signature()
+        if self._catalog is not None and signature == self._catalog.signature:
+            return False
+        try:
+            self._catalog = self._load(signature)
+        except Exception as e:
+            if self._catalog is None:
+                raise
+            print(f"Error reloading model registry, keeping the loaded models: {e}")
+            return False
+        print(f"🧩 Loaded {len(self._catalog.all_models)} model definitions")
+        return True
+
+    def start(self) -> None:
+        """Load the definitions and start watching them for changes."""
+        self.reload()
+        if settings.MODEL_REGISTRY_RELOAD_INTERVAL and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(settings.MODEL_REGISTRY_RELOAD_INTERVAL)
+            try:
+                await asyncio.to_thread(self.reload)
+            except Exception as e:
+                print(f"Error watching model registry: {e}")
+
+    def _files(self) -> List[str]:
+        return sorted(glob.glob(os.path.join(self.path, "*.json")))
+
+    def _signature(self) -> Tuple[Tuple[str, int, int], ...]:
+        signature = []
+        for path in self._files():
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            signature.append((path, stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    def _load(self, signature: Tuple[Tuple[str, int, int], ...]) -> _Catalog:
+        supported = [provider.value for provider in LLMProvider]
+        by_provider: Dict[str, List[ModelInfo]] = {provider: [] for provider in supported}
+        by_name: Dict[Tuple[str, str], ModelInfo] = {}
+
+        for path, _, _ in signature:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            provider = data.get("provider")
+            if provider not in by_provider:
+                raise ValueError(f"{path}: unsupported provider {provider!r}")
+            if provider == LLMProvider.SIMULATED.value and not settings.SIMULATED_LLM_ENABLED:
+                continue
+            for definition in data.get("models", []):
+                model = ModelInfo(**{**definition, "provider": provider})
+                if (provider, model.name) in by_name:
+                    raise ValueError(f"{path}: duplicate model {provider}/{model.name}")
+                by_name[(provider, model.name)] = model
+                by_provider[provider].append(model)
+
+        frozen = {provider: tuple(models) for provider, models in by_provider.items()}
+        all_models = tuple(model for provider in supported for model in frozen[provider])
+        payloads: Dict[Optional[str], CachedPayload] = {
+            provider: CachedPayload.of(ModelListResponse(models=list(models), total=len(models)))
+            for provider, models in frozen.items()
+        }
+        payloads[None] = CachedPayload.of(ModelListResponse(models=list(all_models), total=len(all_models)))
+
+        return _Catalog(
+            by_provider=MappingProxyType(frozen),
+            by_name=MappingProxyType(by_name),
+            all_models=all_models,
+            names=frozenset(model.name for model in all_models),
+            payloads=MappingProxyType(payloads),
+            signature=signature
+        )
+
+
+model_registry = ModelRegistry()
@@ -0,0 +1,195 @@
+# backend/app/services/profiling.py
+from collections import Counter
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+import asyncio
+import cProfile
+import io
+import marshal
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+
+PROFILE_KINDS = ("cpu", "memory")
+
+
+class ProfilerBusy(Exception):
+    """Another profile is being captured in this worker."""
+
+
+class Profiler:
+    """
+    Captures profiles from the running worker.
+
+    CPU profiles come in two kinds. cProfile records every call on the
+    event loop thread, where all request handling runs, as pstats; stack
+    sampling records what all threads are doing every few milliseconds as
+    collapsed stacks for flame graphs (flamegraph.pl, speedscope). Memory
+    profiles compare tracemalloc snapshots taken at both ends of the window.
+
+    Only one profile is captured at a time, since the profilers are
+    process-wide. Profiles of single requests or workflow runs cover the
+    event loop thread for their duration, so concurrent work shows up too.
+    """
+
+    def __init__(self):
+        self._busy = False
+        self._reserved: Optional[str] = None  # Profile id holding the profiler before it starts
+        self.results = LRUCache(max_size=settings.PROFILE_RESULTS_KEPT)
+
+    @property
+    def busy(self) -> bool:
+        return self._busy
+
+    @asynccontextmanager
+    async def profile(self, profile_id: str, kind: str = "cpu", limit: int = 50) -> AsyncIterator[None]:
+        """Profile a block of work, keeping the result under `profile_id`."""
+        if kind not in PROFILE_KINDS:
+            raise ValueError(f"Unsupported profile kind: {kind}")
+        if self._reserved == profile_id:
+            self._reserved = None
+        else:
+            self._acquire()
+        started = time.perf_counter()
+        try:
+            if kind == "cpu":
+                profile = cProfile.Profile()
+                profile.enable()
+                try:
+                    yield
+                finally:
+                    profile.disable()
+                    self.results.set(profile_id, {"kind": "cpu", "stats": _stats_of(profile)})
+            else:
+                tracing = _start_tracemalloc()
+                before = tracemalloc.take_snapshot()
+                try:
+                    yield
+                finally:
+                    result = _memory_diff(before, tracemalloc.take_snapshot(), limit)
+                    if not tracing:
+                        tracemalloc.stop()
+                    self.results.set(profile_id, {"kind": "memory", **result})
+        finally:
+            self._busy = False
+            print(f"Captured {kind} profile {profile_id} over {time.perf_counter() - started:.1f}s")
+
+    async def capture(self, profile_id: str, kind: str, seconds: float, limit: int = 50) -> Dict[str, Any]:
+        """Profile whatever the worker does for `seconds`."""
+        async with self.profile(profile_id, kind, limit):
+            await asyncio.sleep(seconds)
+        return self.results.get(profile_id)
+
+    async def sample_stacks(self, seconds: float, interval: float = 0.005) -> str:
+        """
+        Sample the stacks of all threads every `interval` seconds and return
+        them collapsed: one "thread;outer;...;inner count" line per stack.
+        """
+        self._acquire()
+        try:
+            return await asyncio.to_thread(_sample_stacks, seconds, interval)
+        finally:
+            self._busy = False
+
+    def reserve(self, profile_id: str) -> None:
+        """
+        Hold the profiler for a profile that starts later, e.g. in a
+        background task, so its id can be handed out now.
+        """
+        self._acquire()
+        self._reserved = profile_id
+
+    def release(self, profile_id: str) -> None:
+        """Give up a reservation whose profile never started."""
+        if self._reserved == profile_id:
+            self._reserved = None
+            self._busy = False
+
+    def _acquire(self) -> None:
+        if self._busy:
+            raise ProfilerBusy("A profile is already being captured in this worker")
+        self._busy = True
+
+
+def format_cpu_profile(result: Dict[str, Any], output: str = "pstats", sort: str = "cumulative", limit: int = 50):
+    """A captured CPU profile as pstats data (bytes) or a printed report (str)."""
+    if output == "pstats":
+        # The format pstats.Stats(filename) and snakeviz read
+        return marshal.dumps(result["stats"])
+    stream = io.StringIO()
+    stats = pstats.Stats(_StatsHolder(result["stats"]), stream=stream)
+    stats.sort_stats(sort).print_stats(limit)
+    return stream.getvalue()
+
+
+class _StatsHolder:
+    """Feeds raw stats to pstats.Stats, which expects a profiler object."""
+
+    def __init__(self, stats: Dict):
+        self.stats = stats
+
+    def create_stats(self) -> None:
+        pass
+
+
+def _stats_of(profile: cProfile.Profile) -> Dict:
+    profile.create_stats()
+    return profile.stats
+
+
+def _start_tracemalloc() -> bool:
+    """Start tracemalloc unless it runs already; returns whether it did."""
+    if tracemalloc.is_tracing():
+        return True
+    tracemalloc.start(settings.PROFILE_TRACEMALLOC_FRAMES)
+    return False
+
+
+def _memory_diff(before, after, limit: int) -> Dict[str, Any]:
+    current, peak = tracemalloc.get_traced_memory()
+    ignored = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    differences = after.filter_traces(ignored).compare_to(before.filter_traces(ignored), "traceback")
+    return {
+        "traced_bytes": current,
+        "peak_bytes": peak,
+        "top": [
+            {
+                "size_diff": difference.size_diff,
+                "size": difference.size,
+                "count_diff": difference.count_diff,
+                "count": difference.count,
+                "traceback": [f"{frame.filename}:{frame.lineno}" for frame in difference.traceback]
+            }
+            for difference in differences[:limit]
+        ]
+    }
+
+
+def _sample_stacks(seconds: float, interval: float) -> str:
+    names = {thread.ident: thread.name for thread in threading.enumerate()}
+    own = threading.get_ident()
+    samples: Counter = Counter()
+    deadline = time.monotonic() + seconds
+
+    while time.monotonic() < deadline:
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            stack: List[str] = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+                frame = frame.f_back
+            stack.append(names.get(ident) or f"thread-{ident}")
+            samples[";".join(reversed(stack))] += 1
+        time.sleep(interval)
+
+    return "".join(f"{stack} {count}\n" for stack, count in samples.most_common())
+
+
+profiler = Profiler()
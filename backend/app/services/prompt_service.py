@@ -1,10 +1,12 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
-from typing import List, Optional
+from sqlalchemy.orm import Session, defer
+from sqlalchemy import and_, or_, func, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+from typing import AsyncIterator, Iterator, List, Optional, Tuple
 import json
 import os
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 
 from app.db.models import Prompt
 from app.schemas.prompt import (
@@ -12,21 +14,43 @@ from app.schemas.prompt import (
     PromptUpdate,
     PromptResponse,
     PromptListResponse,
+    PromptVersionInfo,
+    PromptImportRow,
+    PromptImportError,
+    PromptImportResponse,
     PromptSearchRequest,
     StorageConfigUpdate
 )
 from app.core.config import settings
+from app.services.prompt_version_store import PromptVersionStore
+
+def _aware(value: datetime) -> datetime:
+    """Timestamps without a time zone are taken as UTC."""
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+def _import_clock() -> Iterator[datetime]:
+    """Strictly increasing timestamps from now on, for imported rows without created_at."""
+    last = datetime.now(timezone.utc)
+    while True:
+        last = max(datetime.now(timezone.utc), last + timedelta(microseconds=1))
+        yield last
 
 class PromptService:
     """Service class for prompt management operations."""
     
     def __init__(self, db: Session):
         self.db = db
+        self.version_store = PromptVersionStore(db)
     
     async def get_prompt(self, prompt_id: uuid.UUID) -> Optional[PromptResponse]:
         """Get a prompt by ID."""
         prompt = self.db.query(Prompt).filter(Prompt.id == prompt_id).first()
-        return PromptResponse.from_orm(prompt) if prompt else None
+        return self._to_response(prompt) if prompt else None
+    
+    async def get_prompt_name(self, prompt_id: uuid.UUID) -> Optional[str]:
+        """Get the name of a prompt without loading its content."""
+        row = self.db.query(Prompt.name).filter(Prompt.id == prompt_id).first()
+        return row[0] if row else None
     
     async def get_prompt_by_name_version(
         self, 
@@ -37,13 +61,18 @@ class PromptService:
         prompt = self.db.query(Prompt).filter(
             and_(Prompt.name == name, Prompt.version == version)
         ).first()
-        return PromptResponse.from_orm(prompt) if prompt else None
+        return self._to_response(prompt) if prompt else None
     
     async def search_prompts(
         self, 
         search_request: PromptSearchRequest
     ) -> PromptListResponse:
-        """Search prompts with filtering and pagination."""
+        """
+        Search prompts with filtering and pagination. The query matches
+        name, description and content; for a name stored with deltas, only
+        the text of its newest version is searched, so older versions match
+        by name and description alone.
+        """
         query = self.db.query(Prompt)
         
         # Apply filters
@@ -53,6 +82,7 @@ class PromptService:
                 or_(
                     Prompt.name.ilike(search_term),
                     Prompt.content.ilike(search_term),
+                    Prompt.search_content.ilike(search_term),
                     Prompt.description.ilike(search_term)
                 )
             )
@@ -74,7 +104,7 @@ class PromptService:
         prompts = query.offset(offset).limit(search_request.page_size).all()
         
         return PromptListResponse(
-            prompts=[PromptResponse.from_orm(prompt) for prompt in prompts],
+            prompts=[self._to_response(prompt) for prompt in prompts],
             total=total,
             page=search_request.page,
             page_size=search_request.page_size
@@ -86,11 +116,11 @@ class PromptService:
         db_prompt = Prompt(
             name=prompt_data.name,
             version=prompt_data.version,
-            content=prompt_data.content,
             description=prompt_data.description,
             author=prompt_data.author,
             tags=prompt_data.tags or []
         )
+        self.version_store.assign_content(db_prompt, prompt_data.content)
         
         self.db.add(db_prompt)
         self.db.commit()
@@ -98,9 +128,9 @@ class PromptService:
         
         # Save to JSON if enabled
         if settings.ENABLE_JSON_STORAGE:
-            await self._save_to_json(db_prompt)
+            await self._save_to_json(db_prompt, prompt_data.content)
         
-        return PromptResponse.from_orm(db_prompt)
+        return self._to_response(db_prompt, prompt_data.content)
     
     async def update_prompt(
         self, 
@@ -115,17 +145,23 @@ class PromptService:
         
         # Update fields
         update_data = prompt_update.dict(exclude_unset=True)
+        content = update_data.pop("content", None)
         for field, value in update_data.items():
             setattr(db_prompt, field, value)
         
+        if content is not None:
+            self.version_store.replace_content(db_prompt, content)
+        else:
+            content = self.version_store.get_content(db_prompt)
+        
         self.db.commit()
         self.db.refresh(db_prompt)
         
         # Update JSON if enabled
         if settings.ENABLE_JSON_STORAGE:
-            await self._save_to_json(db_prompt)
+            await self._save_to_json(db_prompt, content)
         
-        return PromptResponse.from_orm(db_prompt)
+        return self._to_response(db_prompt, content)
     
     async def delete_prompt(self, prompt_id: uuid.UUID) -> bool:
         """Delete a prompt."""
@@ -138,18 +174,232 @@ class PromptService:
         if settings.ENABLE_JSON_STORAGE:
             await self._delete_from_json(db_prompt)
         
+        # Keep versions stored as deltas against this row readable
+        self.version_store.detach(db_prompt)
+        self.db.flush()
+        
         self.db.delete(db_prompt)
+        self.db.flush()
+        
+        # The version before it may now be the newest one
+        self.version_store.index_latest(db_prompt.name)
         self.db.commit()
         
         return True
     
-    async def get_prompt_versions(self, name: str) -> List[PromptResponse]:
-        """Get all versions of a prompt by name."""
-        prompts = self.db.query(Prompt).filter(
-            Prompt.name == name
-        ).order_by(Prompt.created_at.desc()).all()
+    async def get_prompt_versions(
+        self,
+        name: str,
+        include_content: bool = False
+    ) -> List[PromptVersionInfo]:
+        """Get all versions of a prompt by name, with content only if requested."""
+        query = self.db.query(Prompt).filter(Prompt.name == name)
+        if not include_content:
+            query = query.options(defer(Prompt.content), defer(Prompt.content_delta), defer(Prompt.search_content))
+        prompts = query.order_by(Prompt.created_at.desc()).all()
         
-        return [PromptResponse.from_orm(prompt) for prompt in prompts]
+        return [
+            PromptVersionInfo(
+                id=prompt.id,
+                name=prompt.name,
+                version=prompt.version,
+                description=prompt.description,
+                author=prompt.author,
+                tags=prompt.tags,
+                is_active=prompt.is_active,
+                is_snapshot=prompt.base_prompt_id is None,
+                content=self.version_store.get_content(prompt) if include_content else None,
+                created_at=prompt.created_at,
+                updated_at=prompt.updated_at
+            )
+            for prompt in prompts
+        ]
+    
+    async def import_prompts(
+        self,
+        body: AsyncIterator[bytes],
+        chunk_size: int = settings.PROMPT_IMPORT_CHUNK_SIZE
+    ) -> PromptImportResponse:
+        """
+        Import prompts from an NDJSON byte stream.
+        Rows are upserted on (name, version) in chunks of `chunk_size`.
+        """
+        total = 0
+        imported = 0
+        errors: List[PromptImportError] = []
+        chunk: List[Tuple[int, PromptImportRow]] = []
+        clock = _import_clock()
+        
+        async for line_number, line in self._iter_lines(body):
+            total += 1
+            try:
+                # UnicodeDecodeError is a ValueError: a bad line fails alone
+                chunk.append((line_number, PromptImportRow(**json.loads(line.decode("utf-8")))))
+            except (ValueError, TypeError) as e:
+                errors.append(PromptImportError(line=line_number, error=str(e)))
+            
+            if len(chunk) >= chunk_size:
+                imported += await self._upsert_chunk(chunk, errors, clock)
+                chunk = []
+        
+        if chunk:
+            imported += await self._upsert_chunk(chunk, errors, clock)
+        
+        return PromptImportResponse(
+            total=total,
+            imported=imported,
+            failed=len(errors),
+            errors=errors[:settings.PROMPT_IMPORT_MAX_ERRORS]
+        )
+    
+    def export_prompts(
+        self,
+        name: Optional[str] = None,
+        is_active: Optional[bool] = None,
+        batch_size: int = 1000
+    ) -> Iterator[bytes]:
+        """
+        Export prompts as NDJSON lines.
+        Rows are read through a server-side cursor in batches of `batch_size`.
+        """
+        query = self.db.query(Prompt)
+        if name:
+            query = query.filter(Prompt.name == name)
+        if is_active is not None:
+            query = query.filter(Prompt.is_active == is_active)
+        
+        query = query.order_by(Prompt.name, Prompt.created_at).execution_options(yield_per=batch_size)
+        for prompt in query:
+            row = {
+                "id": str(prompt.id),
+                "name": prompt.name,
+                "version": prompt.version,
+                "content": self.version_store.get_content(prompt),
+                "description": prompt.description,
+                "author": prompt.author,
+                "tags": prompt.tags or [],
+                "is_active": prompt.is_active,
+                "created_at": prompt.created_at.isoformat() if prompt.created_at else None,
+                "updated_at": prompt.updated_at.isoformat() if prompt.updated_at else None
+            }
+            yield (json.dumps(row, ensure_ascii=False) + "\n").encode("utf-8")
+    
+    async def _iter_lines(self, body: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, bytes]]:
+        """Split a byte stream into numbered, non-empty lines, left undecoded."""
+        buffer = b""
+        line_number = 0
+        async for data in body:
+            buffer += data
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                line_number += 1
+                if line.strip():
+                    yield line_number, line
+        if buffer.strip():
+            yield line_number + 1, buffer
+    
+    async def _upsert_chunk(
+        self,
+        chunk: List[Tuple[int, PromptImportRow]],
+        errors: List[PromptImportError],
+        clock: Iterator[datetime]
+    ) -> int:
+        """Upsert a chunk of rows, falling back to row-by-row on failure."""
+        # The last occurrence of a (name, version) pair within a chunk wins
+        rows = list({(row.name, row.version): (line, row) for line, row in chunk}.values())
+        
+        try:
+            self._upsert_rows([row for _, row in rows], clock)
+            return len(rows)
+        except SQLAlchemyError:
+            self.db.rollback()
+        
+        imported = 0
+        for line, row in rows:
+            try:
+                self._upsert_rows([row], clock)
+                imported += 1
+            except SQLAlchemyError as e:
+                self.db.rollback()
+                errors.append(PromptImportError(
+                    line=line,
+                    name=row.name,
+                    version=row.version,
+                    error=str(e.orig) if getattr(e, "orig", None) else str(e)
+                ))
+        return imported
+    
+    def _upsert_rows(self, rows: List[PromptImportRow], clock: Iterator[datetime]) -> None:
+        """
+        Upsert rows with a single INSERT ... ON CONFLICT statement.
+        New versions are delta-encoded like created ones, worked out for
+        the whole chunk at once; overwritten versions become snapshots.
+        Rows keep an exported created_at, others get increasing ones in
+        import order, so the order of versions is the import order.
+        """
+        keys = [(row.name, row.version) for row in rows]
+        existing = {
+            tuple(key)
+            for key in self.db.query(Prompt.name, Prompt.version).filter(tuple_(Prompt.name, Prompt.version).in_(keys))
+        }
+        
+        # Overwritten snapshots must hand their delta dependents over first
+        snapshots = self.db.query(Prompt).filter(
+            tuple_(Prompt.name, Prompt.version).in_(keys),
+            Prompt.base_prompt_id.is_(None),
+            Prompt.id.in_(
+                self.db.query(Prompt.base_prompt_id).filter(Prompt.base_prompt_id.isnot(None))
+            )
+        ).all()
+        for snapshot in snapshots:
+            self.version_store.detach(snapshot)
+        self.db.flush()
+        
+        values = [
+            {
+                "id": uuid.uuid4(),
+                "name": row.name,
+                "version": row.version,
+                "content": row.content,
+                "content_delta": None,
+                "base_prompt_id": None,
+                "search_content": None,
+                "description": row.description,
+                "author": row.author,
+                "tags": row.tags or [],
+                "is_active": row.is_active,
+                "created_at": _aware(row.created_at) if row.created_at else next(clock)
+            }
+            for row in rows
+        ]
+        self.version_store.assign_imported(
+            [value for value in values if (value["name"], value["version"]) not in existing],
+            existing
+        )
+        
+        stmt = insert(Prompt).values(values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Prompt.name, Prompt.version],
+            set_={
+                "content": stmt.excluded.content,
+                "content_delta": stmt.excluded.content_delta,
+                "base_prompt_id": stmt.excluded.base_prompt_id,
+                "search_content": stmt.excluded.search_content,
+                "description": stmt.excluded.description,
+                "author": stmt.excluded.author,
+                "tags": stmt.excluded.tags,
+                "is_active": stmt.excluded.is_active,
+                "updated_at": func.now()
+            }
+        ).returning(Prompt)
+        
+        prompts = self.db.scalars(stmt, execution_options={"populate_existing": True}).all()
+        self.db.commit()
+        
+        if settings.ENABLE_JSON_STORAGE:
+            contents = {(row.name, row.version): row.content for row in rows}
+            for prompt in prompts:
+                self._write_json(prompt, contents[(prompt.name, prompt.version)])
     
     async def get_search_suggestions(self, query: str) -> List[str]:
         """Get search suggestions based on query."""
@@ -190,8 +440,27 @@ class PromptService:
             "json_storage_path": config.json_storage_path or settings.JSON_STORAGE_PATH
         }
     
-    async def _save_to_json(self, prompt: Prompt) -> None:
+    def _to_response(self, prompt: Prompt, content: Optional[str] = None) -> PromptResponse:
+        """Build a response, reconstructing delta-stored content if needed."""
+        return PromptResponse(
+            id=prompt.id,
+            name=prompt.name,
+            version=prompt.version,
+            content=content if content is not None else self.version_store.get_content(prompt),
+            description=prompt.description,
+            author=prompt.author,
+            tags=prompt.tags,
+            is_active=prompt.is_active,
+            created_at=prompt.created_at,
+            updated_at=prompt.updated_at
+        )
+    
+    async def _save_to_json(self, prompt: Prompt, content: str) -> None:
         """Save prompt to JSON file."""
+        self._write_json(prompt, content)
+    
+    def _write_json(self, prompt: Prompt, content: str) -> None:
+        """Write prompt JSON file."""
         try:
             os.makedirs(settings.JSON_STORAGE_PATH, exist_ok=True)
             
@@ -202,7 +471,7 @@ class PromptService:
                 "id": str(prompt.id),
                 "name": prompt.name,
                 "version": prompt.version,
-                "content": prompt.content,
+                "content": content,
                 "description": prompt.description,
                 "author": prompt.author,
                 "tags": prompt.tags,
@@ -213,7 +482,7 @@ class PromptService:
             
             with open(filepath, 'w', encoding='utf-8') as f:
                 json.dump(prompt_data, f, indent=2, ensure_ascii=False)
-                
+        
         except Exception as e:
             print(f"Error saving prompt to JSON: {e}")
     
@@ -225,6 +494,6 @@ class PromptService:
             
             if os.path.exists(filepath):
                 os.remove(filepath)
-                
+        
         except Exception as e:
             print(f"Error deleting prompt JSON file: {e}") 
\ No newline at end of file
@@ -0,0 +1,278 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, tuple_
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+from difflib import SequenceMatcher
+import json
+import sys
+
+from app.db.models import Prompt
+from app.core.cache import LRUCache
+from app.core.config import settings
+
+# Delta operations are either [start, end] (copy base lines start:end)
+# or a string (insert literal text).
+DeltaOp = Union[List[int], str]
+
+# Reconstructed prompt texts, keyed by (prompt id, updated_at) so that any
+# rewrite of a row naturally invalidates its entry.
+_content_cache = LRUCache(max_size=settings.PROMPT_CONTENT_CACHE_SIZE, name="prompt_content")
+
+
+def compute_delta(base: str, target: str) -> List[DeltaOp]:
+    """Compute a line-based delta that turns `base` into `target`."""
+    base_lines = base.splitlines(keepends=True)
+    target_lines = target.splitlines(keepends=True)
+    matcher = SequenceMatcher(None, base_lines, target_lines, autojunk=False)
+
+    delta: List[DeltaOp] = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            delta.append([i1, i2])
+        elif tag in ("replace", "insert"):
+            delta.append("".join(target_lines[j1:j2]))
+        # "delete" needs no operation: the base lines are simply not copied
+    return delta
+
+
+def apply_delta(base: str, delta: List[DeltaOp]) -> str:
+    """Rebuild a text from its base and a delta produced by compute_delta."""
+    base_lines = base.splitlines(keepends=True)
+    parts = []
+    for op in delta:
+        if isinstance(op, str):
+            parts.append(op)
+        else:
+            parts.extend(base_lines[op[0]:op[1]])
+    return "".join(parts)
+
+
+class PromptVersionStore:
+    """
+    Delta-compressed storage for prompt versions.
+
+    Each prompt name is stored as a chain of full snapshots, where every
+    other version only keeps a compact line delta against its snapshot.
+    Reconstruction is therefore a single delta application, and a new
+    snapshot is started every PROMPT_SNAPSHOT_INTERVAL versions or as soon
+    as a delta stops being meaningfully smaller than the full text.
+
+    So that content search finds the current text of every prompt, the
+    newest version of a name also keeps its full text in search_content
+    while it is stored as a delta. Older delta versions are only found by
+    name and description.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_content(self, prompt: Prompt) -> str:
+        """Get the full content of a prompt, reconstructing it if needed."""
+        if prompt.content is not None:
+            return prompt.content
+
+        cache_key = (prompt.id, prompt.updated_at)
+        content = _content_cache.get(cache_key)
+        if content is None:
+            base = self.db.get(Prompt, prompt.base_prompt_id)
+            if base is None:
+                raise ValueError(f"Missing base snapshot for prompt '{prompt.name}' version '{prompt.version}'")
+            content = apply_delta(self.get_content(base), prompt.content_delta)
+            _content_cache.set(cache_key, content)
+        return content
+
+    def assign_content(self, prompt: Prompt, content: str) -> None:
+        """
+        Store `content` on a new prompt row, either as a delta against the
+        latest snapshot of the same name or as a new snapshot.
+        """
+        snapshot = self.db.query(Prompt).filter(
+            Prompt.name == prompt.name,
+            Prompt.base_prompt_id.is_(None)
+        ).order_by(Prompt.created_at.desc()).first()
+
+        # The new row becomes the newest version of its name
+        self._clear_search_content(prompt.name, keep=prompt)
+
+        if snapshot is not None and snapshot is not prompt:
+            dependents = self.db.query(func.count(Prompt.id)).filter(
+                Prompt.base_prompt_id == snapshot.id
+            ).scalar()
+            if dependents < settings.PROMPT_SNAPSHOT_INTERVAL - 1:
+                delta = self._encode(self.get_content(snapshot), content)
+                if delta is not None:
+                    prompt.content = None
+                    prompt.content_delta = delta
+                    prompt.base_prompt_id = snapshot.id
+                    prompt.search_content = content
+                    return
+
+        self._make_snapshot(prompt, content)
+
+    def assign_imported(self, rows: List[Dict[str, Any]], overwritten: Set[Tuple[str, str]]) -> None:
+        """
+        Fill in the content columns of new rows about to be inserted in one
+        statement: dicts with "id", "name", "content" and "created_at", in
+        import order. Snapshots and deltas are worked out in memory, as
+        assign_content would for each row in turn, with a fixed number of
+        queries for the whole batch. Rows of the (name, version) pairs in
+        `overwritten` are being replaced, so they can't serve as a base.
+        """
+        names = {row["name"] for row in rows}
+        if not names:
+            return
+
+        query = self.db.query(Prompt).filter(Prompt.name.in_(names), Prompt.base_prompt_id.is_(None))
+        if overwritten:
+            query = query.filter(tuple_(Prompt.name, Prompt.version).notin_(overwritten))
+        snapshots = query.order_by(Prompt.name, Prompt.created_at.desc()).distinct(Prompt.name).all()
+        dependents = dict(
+            self.db.query(Prompt.base_prompt_id, func.count(Prompt.id)).filter(
+                Prompt.base_prompt_id.in_([snapshot.id for snapshot in snapshots])
+            ).group_by(Prompt.base_prompt_id).all()
+        ) if snapshots else {}
+        newest = dict(
+            self.db.query(Prompt.name, func.max(Prompt.created_at)).filter(
+                Prompt.name.in_(names)
+            ).group_by(Prompt.name).all()
+        )
+
+        # Per name: (base id, base text, versions already stored against it)
+        bases = {
+            snapshot.name: (snapshot.id, self.get_content(snapshot), dependents.get(snapshot.id, 0))
+            for snapshot in snapshots
+        }
+        latest: Dict[str, Dict[str, Any]] = {}
+        texts = {}
+        for row in rows:
+            name, content = row["name"], row["content"]
+            texts[row["id"]] = content
+            base = bases.get(name)
+            delta = None
+            if base is not None and base[2] < settings.PROMPT_SNAPSHOT_INTERVAL - 1:
+                delta = self._encode(base[1], content)
+            if delta is None:
+                row.update(content=content, content_delta=None, base_prompt_id=None)
+                bases[name] = (row["id"], content, 0)
+            else:
+                row.update(content=None, content_delta=delta, base_prompt_id=base[0])
+                bases[name] = (base[0], base[1], base[2] + 1)
+            row["search_content"] = None
+            if name not in latest or row["created_at"] >= latest[name]["created_at"]:
+                latest[name] = row
+
+        # Names whose newest version is now an imported row
+        renewed = [name for name, row in latest.items() if newest.get(name) is None or row["created_at"] > newest[name]]
+        if renewed:
+            self.db.query(Prompt).filter(
+                Prompt.name.in_(renewed),
+                Prompt.search_content.isnot(None)
+            ).update({Prompt.search_content: None}, synchronize_session="fetch")
+            for name in renewed:
+                if latest[name]["base_prompt_id"] is not None:
+                    latest[name]["search_content"] = texts[latest[name]["id"]]
+
+    def replace_content(self, prompt: Prompt, content: str) -> None:
+        """Replace the content of an existing prompt row."""
+        if prompt.base_prompt_id is not None:
+            base = self.db.get(Prompt, prompt.base_prompt_id)
+            delta = self._encode(self.get_content(base), content)
+            if delta is not None:
+                prompt.content_delta = delta
+                if prompt.search_content is not None:
+                    prompt.search_content = content
+                return
+            self._make_snapshot(prompt, content)
+            return
+
+        # The row is a snapshot: its dependents must be re-encoded against
+        # the new text before the old text is lost.
+        old_content = prompt.content
+        for dependent in self._dependents(prompt):
+            text = apply_delta(old_content, dependent.content_delta)
+            delta = self._encode(content, text)
+            if delta is None:
+                self._make_snapshot(dependent, text)
+            else:
+                dependent.content_delta = delta
+        prompt.content = content
+
+    def detach(self, prompt: Prompt) -> None:
+        """
+        Prepare a snapshot row for deletion by promoting its newest
+        dependent to a snapshot and rebasing the remaining ones onto it.
+        """
+        if prompt.base_prompt_id is not None:
+            return
+
+        dependents = self._dependents(prompt)
+        if not dependents:
+            return
+
+        texts = [apply_delta(prompt.content, d.content_delta) for d in dependents]
+        new_snapshot, new_content = dependents[0], texts[0]
+        self._make_snapshot(new_snapshot, new_content)
+
+        for dependent, text in zip(dependents[1:], texts[1:]):
+            delta = self._encode(new_content, text)
+            if delta is None:
+                self._make_snapshot(dependent, text)
+            else:
+                dependent.content_delta = delta
+                dependent.base_prompt_id = new_snapshot.id
+
+    def index_latest(self, name: str) -> None:
+        """
+        Give the newest version of a name its search_content if it is a
+        delta row, e.g. after the previous newest version was deleted.
+        """
+        latest = self.db.query(Prompt).filter(Prompt.name == name).order_by(Prompt.created_at.desc()).first()
+        if latest is None:
+            return
+        self._clear_search_content(name, keep=latest)
+        if latest.base_prompt_id is not None and latest.search_content is None:
+            latest.search_content = self.get_content(latest)
+
+    def _clear_search_content(self, name: str, keep: Prompt) -> None:
+        query = self.db.query(Prompt).filter(Prompt.name == name, Prompt.search_content.isnot(None))
+        if keep.id is not None:
+            query = query.filter(Prompt.id != keep.id)
+        query.update({Prompt.search_content: None}, synchronize_session="fetch")
+
+    def _dependents(self, snapshot: Prompt) -> List[Prompt]:
+        """Get delta rows based on a snapshot, newest first."""
+        return self.db.query(Prompt).filter(
+            Prompt.base_prompt_id == snapshot.id
+        ).order_by(Prompt.created_at.desc()).all()
+
+    def _make_snapshot(self, prompt: Prompt, content: str) -> None:
+        prompt.content = content
+        prompt.content_delta = None
+        prompt.base_prompt_id = None
+        prompt.search_content = None
+
+    def _encode(self, base: str, content: str) -> Optional[List[DeltaOp]]:
+        """Encode a delta, or return None if it is not worth storing."""
+        delta = compute_delta(base, content)
+        encoded_size = len(json.dumps(delta, ensure_ascii=False))
+        if encoded_size > len(content) * settings.PROMPT_DELTA_MAX_RATIO:
+            return None
+        return delta
+
+
+if __name__ == "__main__":
+    from app.db.session import SessionLocal
+
+    if "--index-latest" not in sys.argv[1:]:
+        print("usage: python -m app.services.prompt_version_store --index-latest")
+        sys.exit(2)
+
+    db = SessionLocal()
+    try:
+        store = PromptVersionStore(db)
+        names = [row[0] for row in db.query(Prompt.name).distinct()]
+        for name in names:
+            store.index_latest(name)
+        db.commit()
+        print(f"Indexed the newest version of {len(names)} prompts")
+    finally:
+        db.close()
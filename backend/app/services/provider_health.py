@@ -0,0 +1,168 @@
+# backend/app/services/provider_health.py
+from typing import Dict, Optional, Tuple
+from dataclasses import dataclass, field
+from datetime import datetime
+import asyncio
+import time
+
+from app.core.cache import CachedPayload
+from app.core.config import settings
+from app.schemas.llm import ProviderInfo, ProviderListResponse
+from app.services.llm_factory import LLMFactory
+
+PROVIDER_NAMES = {
+    "openai": "OpenAI",
+    "anthropic": "Anthropic",
+    "google": "Google",
+    "groq": "Groq",
+    "huggingface": "Hugging Face",
+    "simulated": "Simulated"
+}
+
+PROVIDER_DESCRIPTIONS = {
+    "openai": "OpenAI's GPT models including GPT-4 and GPT-3.5",
+    "anthropic": "Anthropic's Claude models for conversational AI",
+    "google": "Google's Gemini models for advanced reasoning",
+    "groq": "Groq's high-speed inference with open source models",
+    "huggingface": "Hugging Face's open source language models",
+    "simulated": "Offline models with realistic latency and failures, for load testing"
+}
+
+
+@dataclass
+class ProviderProbe:
+    """Outcome of checking one provider (and optionally one of its models)."""
+    provider: str
+    configured: bool
+    healthy: Optional[bool] = None  # None until probed
+    latency_ms: Optional[float] = None
+    error: Optional[str] = None
+    checked_at: datetime = field(default_factory=datetime.now)
+    monotonic: float = field(default_factory=time.monotonic)
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.monotonic
+
+
+class ProviderHealthService:
+    """
+    Provider status, served from memory.
+
+    Configured providers are probed concurrently in the background every
+    PROVIDER_PROBE_INTERVAL seconds. Connection tests reuse a probe younger
+    than PROVIDER_STATUS_TTL, and concurrent tests of the same provider
+    share one in-flight probe, so probing cost is bounded by the schedule
+    rather than by traffic. The provider listing is serialized once per
+    provider probe and carries an ETag.
+    """
+
+    def __init__(self):
+        self._status: Dict[str, ProviderProbe] = {}
+        self._checks: Dict[Tuple[str, Optional[str]], ProviderProbe] = {}
+        self._inflight: Dict[Tuple[str, Optional[str]], asyncio.Task] = {}
+        self._providers_payload: Optional[CachedPayload] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start background probing, if enabled."""
+        if settings.PROVIDER_PROBE_INTERVAL and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for task in list(self._inflight.values()):
+            task.cancel()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.probe_all()
+            except Exception as e:
+                print(f"Error probing LLM providers: {e}")
+            await asyncio.sleep(settings.PROVIDER_PROBE_INTERVAL)
+
+    async def probe_all(self) -> None:
+        """Probe every provider at once."""
+        await asyncio.gather(
+            *(self.check(provider, max_age=0) for provider in LLMFactory.get_supported_providers())
+        )
+
+    async def check(
+        self,
+        provider: str,
+        model_name: Optional[str] = None,
+        max_age: Optional[float] = None
+    ) -> ProviderProbe:
+        """
+        Connection status of a provider (or one of its models), probing only
+        if the last result is older than `max_age` (default: the status TTL).
+        """
+        key = (provider, model_name)
+        max_age = settings.PROVIDER_STATUS_TTL if max_age is None else max_age
+        cached = self._checks.get(key)
+        if cached is not None and cached.age <= max_age:
+            return cached
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._inflight[key] = asyncio.create_task(self._probe(provider, model_name))
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _probe(self, provider: str, model_name: Optional[str]) -> ProviderProbe:
+        service = LLMFactory.get_service(provider)
+        try:
+            configured = service.is_available()
+        except Exception as e:
+            probe = ProviderProbe(provider, configured=False, healthy=False, error=str(e))
+        else:
+            probe = await self._test(provider, service, model_name) if configured else ProviderProbe(provider, configured=False)
+
+        self._checks[(provider, model_name)] = probe
+        if model_name is None:
+            self._status[provider] = probe
+            # The listing shows every probe's latency and time, not only status changes
+            self._providers_payload = None
+        return probe
+
+    async def _test(self, provider: str, service, model_name: Optional[str]) -> ProviderProbe:
+        started = time.perf_counter()
+        try:
+            healthy = await asyncio.wait_for(service.test_connection(model_name), settings.PROVIDER_PROBE_TIMEOUT)
+            error = None if healthy else "Connection failed"
+        except asyncio.TimeoutError:
+            healthy, error = False, f"No response within {settings.PROVIDER_PROBE_TIMEOUT}s"
+        except Exception as e:
+            healthy, error = False, str(e)
+        latency_ms = (time.perf_counter() - started) * 1000
+        return ProviderProbe(provider, configured=True, healthy=healthy, latency_ms=latency_ms, error=error)
+
+    def providers_payload(self) -> CachedPayload:
+        """Provider list with the latest probe results, serialized."""
+        if self._providers_payload is None:
+            providers = []
+            for provider_id in LLMFactory.get_supported_providers():
+                probe = self._status.get(provider_id)
+                if probe is None:
+                    # Not probed yet: report the configuration only
+                    configured = LLMFactory.is_provider_available(provider_id)
+                    probe = ProviderProbe(provider_id, configured=configured)
+                providers.append(ProviderInfo(
+                    id=provider_id,
+                    name=PROVIDER_NAMES.get(provider_id, provider_id.title()),
+                    description=PROVIDER_DESCRIPTIONS.get(provider_id, f"{provider_id.title()} LLM provider"),
+                    available=probe.configured and probe.healthy is not False,
+                    configured=probe.configured,
+                    error=probe.error,
+                    healthy=probe.healthy,
+                    latency_ms=probe.latency_ms,
+                    checked_at=probe.checked_at if probe.healthy is not None else None
+                ))
+            self._providers_payload = CachedPayload.of(ProviderListResponse(providers=providers, total=len(providers)))
+        return self._providers_payload
+
+
+provider_health = ProviderHealthService()
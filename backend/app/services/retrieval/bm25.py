@@ -0,0 +1,139 @@
+from typing import Dict, List, Optional, Tuple
+from array import array
+from collections import Counter
+import math
+import re
+
+import numpy as np
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens."""
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first."""
+    if k <= 0 or scores.size == 0:
+        return np.empty(0, dtype=np.int64)
+    if k < scores.size:
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(scores.size)
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+class BM25Index:
+    """
+    In-memory inverted index with Okapi BM25 scoring.
+
+    Postings are kept per term as two parallel typed arrays (document ids and
+    term frequencies), appended to in place as documents are added. Searches
+    work on numpy copies of the postings of the query terms, cached until the
+    term receives new postings, and accumulate scores into one dense array.
+    Removed documents keep their postings, as callers mask them out of
+    searches, but no longer count towards document frequencies, the
+    document count or the average length.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Tuple[array, array]] = {}
+        self._doc_lengths = array("I")
+        self._total_length = 0
+        self._removed = set()
+        self._removed_frequencies: Counter = Counter()  # Removed documents per term
+        self._term_arrays: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._length_norm: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self._doc_lengths) - len(self._removed)
+
+    def add(self, text: str) -> int:
+        """Index a document and return its id (ids are dense and sequential)."""
+        doc_id = len(self._doc_lengths)
+        tokens = tokenize(text)
+
+        for term, frequency in Counter(tokens).items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = (array("I"), array("I"))
+            postings[0].append(doc_id)
+            postings[1].append(frequency)
+            self._term_arrays.pop(term, None)
+
+        self._doc_lengths.append(len(tokens))
+        self._total_length += len(tokens)
+        self._length_norm = None
+        return doc_id
+
+    def remove(self, doc_id: int, text: str) -> None:
+        """Leave a document out of the statistics; `text` is the text it was added with."""
+        if doc_id in self._removed:
+            return
+        self._removed.add(doc_id)
+        self._removed_frequencies.update(set(tokenize(text)))
+        self._total_length -= self._doc_lengths[doc_id]
+        self._length_norm = None
+
+    def document_frequency(self, term: str) -> int:
+        postings = self._postings.get(term)
+        return len(postings[0]) - self._removed_frequencies[term] if postings else 0
+
+    def scores(self, query: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score all documents against a query.
+        Returns the dense score array and the ids of documents matching any term.
+        """
+        scores = np.zeros(len(self._doc_lengths), dtype=np.float32)
+        matched: List[np.ndarray] = []
+        count = len(self)
+        if count == 0:
+            return scores, np.empty(0, dtype=np.int64)
+
+        norm = self._norm()
+        for term in set(tokenize(query)):
+            frequency = self.document_frequency(term)
+            if frequency == 0:
+                continue
+            ids, frequencies = self._arrays(term)
+            idf = math.log(1 + (count - frequency + 0.5) / (frequency + 0.5))
+            scores[ids] += idf * frequencies * (self.k1 + 1) / (frequencies + norm[ids])
+            matched.append(ids)
+
+        if not matched:
+            return scores, np.empty(0, dtype=np.int64)
+        return scores, np.unique(np.concatenate(matched))
+
+    def search(self, query: str, top_k: int, mask: Optional[np.ndarray] = None) -> List[Tuple[int, float]]:
+        """Top-k documents for a query, optionally restricted by a boolean mask."""
+        scores, matched = self.scores(query)
+        if mask is not None:
+            matched = matched[mask[matched]]
+        if matched.size == 0:
+            return []
+
+        best = top_k_indices(scores[matched], top_k)
+        return [(int(matched[i]), float(scores[matched[i]])) for i in best]
+
+    def _arrays(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        arrays = self._term_arrays.get(term)
+        if arrays is None:
+            ids, frequencies = self._postings[term]
+            arrays = (
+                np.array(ids, dtype=np.int64),
+                np.array(frequencies, dtype=np.float32)
+            )
+            self._term_arrays[term] = arrays
+        return arrays
+
+    def _norm(self) -> np.ndarray:
+        """Per-document k1 * (1 - b + b * length / average length)."""
+        if self._length_norm is None:
+            lengths = np.array(self._doc_lengths, dtype=np.float32)
+            average = max(self._total_length / max(len(self), 1), 1.0)
+            self._length_norm = self.k1 * (1 - self.b + self.b * lengths / average)
+        return self._length_norm
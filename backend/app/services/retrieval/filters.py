@@ -0,0 +1,94 @@
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+
+def _values(value: Any) -> List[Hashable]:
+    """Indexable values of a metadata field; list fields match any element."""
+    items = value if isinstance(value, (list, tuple, set)) else [value]
+    return [item for item in items if isinstance(item, (str, int, float, bool))]
+
+
+def _set_bit(bits: bytearray, doc_id: int) -> None:
+    index = doc_id >> 3
+    if index >= len(bits):
+        bits.extend(bytes(index + 1 - len(bits)))
+    bits[index] |= 1 << (doc_id & 7)
+
+
+class MetadataBitsetIndex:
+    """
+    Metadata pre-filters evaluated as bitsets.
+
+    Every (field, value) pair owns a little-endian bitset with one bit per
+    document. A filter such as {"source": "a.pdf", "lang": ["en", "de"]}
+    ORs the bitsets of the listed values of each field, ANDs the fields and
+    expands the result into a boolean mask the indexes score against.
+    """
+
+    def __init__(self):
+        self._bitsets: Dict[Tuple[str, Hashable], bytearray] = {}
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, doc_id: int, metadata: Optional[Dict[str, Any]]) -> None:
+        """Set the bits of a document; ids must be added in order."""
+        self._size = max(self._size, doc_id + 1)
+        for field, value in (metadata or {}).items():
+            for item in _values(value):
+                _set_bit(self._bitsets.setdefault((field, item), bytearray()), doc_id)
+
+    def bitset(self, filters: Dict[str, Any]) -> np.ndarray:
+        """Packed bitset of the documents matching all filters."""
+        nbytes = (self._size + 7) // 8
+        result: Optional[np.ndarray] = None
+
+        for field, wanted in filters.items():
+            field_bits = np.zeros(nbytes, dtype=np.uint8)
+            for item in _values(wanted):
+                bits = self._bitsets.get((field, item))
+                if bits:
+                    field_bits[:len(bits)] |= np.frombuffer(bytes(bits), dtype=np.uint8)
+            result = field_bits if result is None else result & field_bits
+
+        if result is None:
+            result = np.full(nbytes, 0xFF, dtype=np.uint8)
+        return result
+
+    def mask(self, filters: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        """Boolean mask of the documents matching all filters, None without filters."""
+        if not filters:
+            return None
+        return self.unpack(self.bitset(filters))
+
+    def unpack(self, bits: np.ndarray) -> np.ndarray:
+        return np.unpackbits(bits, count=self._size, bitorder="little").astype(bool)
+
+
+class Bitset:
+    """Growable bitset for flags such as deleted documents."""
+
+    def __init__(self):
+        self._bits = bytearray()
+        self._mask: Optional[np.ndarray] = None
+        self.count = 0
+
+    def __contains__(self, doc_id: int) -> bool:
+        index = doc_id >> 3
+        return index < len(self._bits) and bool(self._bits[index] & (1 << (doc_id & 7)))
+
+    def set(self, doc_id: int) -> None:
+        if doc_id not in self:
+            _set_bit(self._bits, doc_id)
+            self.count += 1
+            self._mask = None
+
+    def mask(self, size: int) -> np.ndarray:
+        """Boolean mask of the first `size` bits."""
+        if self._mask is None or len(self._mask) != size:
+            packed = np.zeros((size + 7) // 8, dtype=np.uint8)
+            packed[:len(self._bits)] = np.frombuffer(bytes(self._bits), dtype=np.uint8)[:len(packed)]
+            self._mask = np.unpackbits(packed, count=size, bitorder="little").astype(bool)
+        return self._mask
@@ -0,0 +1,19 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[int]],
+    k: int = 60,
+    weights: Optional[Sequence[float]] = None
+) -> List[Tuple[int, float]]:
+    """
+    Combine ranked lists of document ids with reciprocal-rank fusion.
+    Each list contributes weight / (k + rank) for every document it ranks
+    (rank starting at 1). Returns (id, score) pairs, best first.
+    """
+    weights = weights or [1.0] * len(rankings)
+    scores: Dict[int, float] = {}
+    for ranking, weight in zip(rankings, weights):
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + weight / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
@@ -0,0 +1,241 @@
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from dataclasses import asdict, dataclass
+import uuid
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.retrieval.bm25 import BM25Index
+from app.services.retrieval.filters import Bitset, MetadataBitsetIndex
+from app.services.retrieval.fusion import reciprocal_rank_fusion
+from app.services.retrieval.vector import VectorIndex
+
+STRATEGIES = ("hybrid", "similarity", "mmr", "keyword")
+
+
+@dataclass
+class RetrievalHit:
+    """A retrieved chunk. Scores are normalized to [0, 1]."""
+    id: str
+    text: str
+    metadata: Dict[str, Any]
+    score: float
+    keyword_rank: Optional[int] = None
+    vector_rank: Optional[int] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class HybridIndex:
+    """
+    Chunk store searchable by keywords (BM25), by embedding and by both.
+
+    Chunks get dense positions shared by the BM25 index, the vector index and
+    the metadata bitsets. Re-adding a chunk id appends the new version and
+    flags the old position as deleted. Hybrid queries fuse the keyword and
+    vector rankings with reciprocal-rank fusion; metadata filters become a
+    mask both searches are restricted by.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.generation = uuid.uuid4().hex  # Identifies this instance, e.g. to ingestion manifests
+        self.bm25 = BM25Index()
+        self.vectors: Optional[VectorIndex] = None
+        self.filters = MetadataBitsetIndex()
+        self.deleted = Bitset()
+        self._ids: List[str] = []
+        self._texts: List[str] = []
+        self._metadata: List[Dict[str, Any]] = []
+        self._positions: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._ids) - self.deleted.count
+
+    @property
+    def dimensions(self) -> Optional[int]:
+        return self.vectors.dimensions if self.vectors else None
+
+    def add(self, chunks: Iterable[Dict[str, Any]]) -> int:
+        """
+        Index chunks of the form {"id", "text", "metadata", "embedding"};
+        only "text" is required. Returns the number of chunks added.
+        """
+        embeddings: List[Tuple[int, Sequence[float]]] = []
+        first_position = len(self._ids)
+
+        for chunk in chunks:
+            position = len(self._ids)
+            chunk_id = str(chunk.get("id") or f"{self.name}:{position}")
+            text = str(chunk.get("text") or "")
+            metadata = dict(chunk.get("metadata") or {})
+
+            previous = self._positions.get(chunk_id)
+            if previous is not None:
+                self._tombstone(previous)
+
+            self.bm25.add(text)
+            self.filters.add(position, metadata)
+            self._ids.append(chunk_id)
+            self._texts.append(text)
+            self._metadata.append(metadata)
+            self._positions[chunk_id] = position
+
+            if chunk.get("embedding") is not None:
+                embeddings.append((position, chunk["embedding"]))
+
+        added = len(self._ids) - first_position
+        if embeddings or self.vectors is not None:
+            self._add_vectors(first_position, added, embeddings)
+        return added
+
+    def delete(self, chunk_ids: Iterable[str]) -> int:
+        """Remove chunks by id. Returns the number of chunks removed."""
+        removed = 0
+        for chunk_id in chunk_ids:
+            position = self._positions.pop(str(chunk_id), None)
+            if position is not None:
+                self._tombstone(position)
+                removed += 1
+        return removed
+
+    def _tombstone(self, position: int) -> None:
+        """Flag a position deleted; it stays in place but leaves the BM25 statistics."""
+        self.deleted.set(position)
+        self.bm25.remove(position, self._texts[position])
+
+    def search(
+        self,
+        query: str,
+        query_vector: Optional[Sequence[float]] = None,
+        top_k: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        strategy: str = "hybrid",
+        candidates: Optional[int] = None
+    ) -> List[RetrievalHit]:
+        """
+        Search the index. "hybrid" fuses keyword and vector results, falling
+        back to whichever is available; "similarity" and "mmr" need a query
+        vector and fall back to keywords without one.
+        """
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unsupported retrieval strategy: {strategy}")
+
+        mask = self._mask(filters)
+        pool = candidates or max(top_k * settings.RETRIEVAL_CANDIDATE_FACTOR, top_k)
+        use_vectors = query_vector is not None and self.vectors is not None and strategy != "keyword"
+        use_keywords = bool(query) and (strategy in ("hybrid", "keyword") or not use_vectors)
+
+        keyword = self.bm25.search(query, pool, mask) if use_keywords else []
+        vector = self.vectors.search(np.asarray(query_vector), pool, mask) if use_vectors else []
+        keyword_ranks = {position: rank for rank, (position, _) in enumerate(keyword, start=1)}
+        vector_ranks = {position: rank for rank, (position, _) in enumerate(vector, start=1)}
+
+        if keyword and vector:
+            fused = reciprocal_rank_fusion(
+                [list(keyword_ranks), list(vector_ranks)],
+                k=settings.RETRIEVAL_RRF_K
+            )
+            best = 2 / (settings.RETRIEVAL_RRF_K + 1)
+            ranked = [(position, score / best) for position, score in fused[:top_k]]
+        elif vector:
+            if strategy == "mmr":
+                ranked = self._mmr(np.asarray(query_vector, dtype=np.float32), vector, top_k)
+            else:
+                ranked = [(position, max(score, 0.0)) for position, score in vector[:top_k]]
+        elif keyword:
+            top_score = keyword[0][1] or 1.0
+            ranked = [(position, score / top_score) for position, score in keyword[:top_k]]
+        else:
+            ranked = []
+
+        return [
+            RetrievalHit(
+                id=self._ids[position],
+                text=self._texts[position],
+                metadata=self._metadata[position],
+                score=float(score),
+                keyword_rank=keyword_ranks.get(position),
+                vector_rank=vector_ranks.get(position)
+            )
+            for position, score in ranked
+        ]
+
+    def _mask(self, filters: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        mask = self.filters.mask(filters)
+        if self.deleted.count:
+            live = ~self.deleted.mask(len(self._ids))
+            mask = live if mask is None else mask & live
+        return mask
+
+    def _add_vectors(self, first_position: int, count: int, embeddings: List[Tuple[int, Sequence[float]]]) -> None:
+        """Append one vector per new position, zeros for chunks without an embedding."""
+        if self.vectors is None:
+            dimensions = len(embeddings[0][1])
+            self.vectors = VectorIndex(
+                dimensions,
+                ivf_min_size=settings.RETRIEVAL_IVF_MIN_SIZE,
+                nprobe=settings.RETRIEVAL_IVF_NPROBE
+            )
+            # Chunks indexed before the first embedding get zero vectors
+            count += first_position
+            first_position = 0
+
+        matrix = np.zeros((count, self.vectors.dimensions), dtype=np.float32)
+        for position, embedding in embeddings:
+            if len(embedding) != self.vectors.dimensions:
+                raise ValueError(
+                    f"Embedding has {len(embedding)} dimensions, index {self.name} expects {self.vectors.dimensions}"
+                )
+            matrix[position - first_position] = embedding
+        self.vectors.add(matrix)
+
+    def _mmr(
+        self,
+        query_vector: np.ndarray,
+        candidates: List[Tuple[int, float]],
+        top_k: int,
+        diversity: float = 0.5
+    ) -> List[Tuple[int, float]]:
+        """Re-rank vector candidates by maximal marginal relevance."""
+        positions = np.array([position for position, _ in candidates])
+        relevance = np.array([score for _, score in candidates], dtype=np.float32)
+        vectors = self.vectors.vectors[positions]
+        selected: List[int] = []
+        redundancy = np.full(len(positions), -np.inf, dtype=np.float32)
+
+        while len(selected) < min(top_k, len(positions)):
+            penalty = np.where(np.isinf(redundancy), 0.0, redundancy)
+            marginal = (1 - diversity) * relevance - diversity * penalty
+            marginal[selected] = -np.inf
+            choice = int(np.argmax(marginal))
+            selected.append(choice)
+            redundancy = np.maximum(redundancy, vectors @ vectors[choice])
+
+        return [(int(positions[i]), max(float(relevance[i]), 0.0)) for i in selected]
+
+
+class IndexRegistry:
+    """Named retrieval indexes held in this process."""
+
+    def __init__(self):
+        self._indexes: Dict[str, HybridIndex] = {}
+
+    def get(self, name: str) -> Optional[HybridIndex]:
+        return self._indexes.get(name)
+
+    def get_or_create(self, name: str) -> HybridIndex:
+        index = self._indexes.get(name)
+        if index is None:
+            index = self._indexes[name] = HybridIndex(name)
+        return index
+
+    def drop(self, name: str) -> None:
+        self._indexes.pop(name, None)
+
+    def names(self) -> List[str]:
+        return list(self._indexes)
+
+
+retrieval_indexes = IndexRegistry()
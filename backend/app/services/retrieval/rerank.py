@@ -0,0 +1,206 @@
+from typing import Any, Dict, List, Optional, Tuple
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+import asyncio
+import hashlib
+import json
+import math
+import re
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.schemas.llm import ChatMessage, LLMParameters, MessageRole
+from app.services.llm_factory import LLMFactory
+
+_RERANK_SYSTEM_PROMPT = (
+    "You judge how relevant passages are to a search query. "
+    "Reply with only a JSON array of numbers from 0 to 10, one per passage, in the given order."
+)
+
+# Scores by (query hash, chunk id, model), shared by all rerankers
+_score_cache = LRUCache(max_size=settings.RERANK_CACHE_SIZE, name="rerank_scores")
+
+# Loaded cross-encoder models by name
+_cross_encoders: Dict[str, Tuple[Any, Any]] = {}
+
+
+class PairScorer(ABC):
+    """Scores (query, passage) pairs in one batch; scores are in [0, 1]."""
+
+    model_key = ""
+
+    @abstractmethod
+    async def score(self, query: str, passages: List[str]) -> Tuple[List[float], int]:
+        """Return one score per passage and the tokens the call consumed."""
+        pass
+
+
+class LLMPairScorer(PairScorer):
+    """Listwise scoring: all passages of a batch are judged in one chat call."""
+
+    def __init__(self, provider: str, model_name: str, max_passage_chars: int = 1000):
+        self.provider = LLMFactory.get_service(provider)
+        self.model_name = model_name
+        self.max_passage_chars = max_passage_chars
+        self.model_key = f"{provider}:{model_name}"
+
+    async def score(self, query: str, passages: List[str]) -> Tuple[List[float], int]:
+        numbered = "\n\n".join(
+            f"[{number}] {passage[:self.max_passage_chars]}"
+            for number, passage in enumerate(passages, start=1)
+        )
+        response = await self.provider.chat(
+            model_name=self.model_name,
+            messages=[ChatMessage(role=MessageRole.USER, content=f"Query: {query}\n\nPassages:\n{numbered}")],
+            system_prompt=_RERANK_SYSTEM_PROMPT,
+            parameters=LLMParameters(temperature=0.0, max_tokens=8 * len(passages) + 16)
+        )
+
+        match = re.search(r"\[[^\[\]]*\]", response.content or "")
+        scores = json.loads(match.group(0)) if match else None
+        if not isinstance(scores, list) or len(scores) != len(passages):
+            raise ValueError(f"Reranker model returned {len(scores or [])} scores for {len(passages)} passages")
+
+        usage = response.usage or {}
+        return [min(max(float(score) / 10, 0.0), 1.0) for score in scores], usage.get("total_tokens", 0)
+
+
+class CrossEncoderScorer(PairScorer):
+    """Local cross-encoder (transformers), run in a thread in fixed-size batches."""
+
+    def __init__(self, model_name: str, batch_size: int = 32):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.model_key = f"local:{model_name}"
+
+    async def score(self, query: str, passages: List[str]) -> Tuple[List[float], int]:
+        loop = asyncio.get_running_loop()
+        scores = await loop.run_in_executor(None, self._score_sync, query, passages)
+        return scores, 0
+
+    def _score_sync(self, query: str, passages: List[str]) -> List[float]:
+        import torch
+
+        tokenizer, model = self._load()
+        scores: List[float] = []
+        with torch.no_grad():
+            for start in range(0, len(passages), self.batch_size):
+                batch = passages[start:start + self.batch_size]
+                inputs = tokenizer(
+                    [query] * len(batch),
+                    batch,
+                    padding=True,
+                    truncation=True,
+                    return_tensors="pt"
+                )
+                logits = model(**inputs).logits.view(-1).tolist()
+                scores.extend(1 / (1 + math.exp(-logit)) for logit in logits)
+        return scores
+
+    def _load(self) -> Tuple[Any, Any]:
+        if self.model_name not in _cross_encoders:
+            from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+            tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+            model = AutoModelForSequenceClassification.from_pretrained(self.model_name)
+            model.eval()
+            _cross_encoders[self.model_name] = (tokenizer, model)
+        return _cross_encoders[self.model_name]
+
+
+@dataclass
+class RerankResult:
+    documents: List[Dict[str, Any]]  # Reranked documents with a "rerank_score"
+    scored: int = 0  # Pairs sent to the scorer
+    cache_hits: int = 0
+    round_trips: int = 0
+    tokens: int = 0
+    early_exit: bool = False
+    errors: List[str] = field(default_factory=list)
+
+
+class Reranker:
+    """
+    Reranks retrieved documents with a PairScorer.
+
+    Candidates are scored in retrieval order, skipping pairs whose score is
+    cached. Without `threshold`, all other pairs go to the scorer in one
+    call. With `threshold`, they are scored `batch_size` pairs per call and
+    scoring stops as soon as `top_k` documents reach it, checked after the
+    cache lookup and after every batch; documents left unscored keep their
+    retrieval order behind the scored ones.
+    """
+
+    def __init__(self, scorer: PairScorer, batch_size: int = settings.RERANK_BATCH_SIZE):
+        self.scorer = scorer
+        self.batch_size = max(1, batch_size)
+
+    async def rerank(
+        self,
+        query: str,
+        documents: List[Dict[str, Any]],
+        top_k: int,
+        threshold: Optional[float] = None
+    ) -> RerankResult:
+        result = RerankResult(documents=[])
+        query_hash = hashlib.sha256(query.encode("utf-8")).hexdigest()
+        scores: Dict[int, float] = {}
+
+        def cache_key(index: int) -> Tuple[str, str, str]:
+            document = documents[index]
+            chunk_id = str(document.get("id") or hashlib.sha256(str(document.get("text", "")).encode("utf-8")).hexdigest())
+            return query_hash, chunk_id, self.scorer.model_key
+
+        def confident() -> bool:
+            return threshold is not None and sum(score >= threshold for score in scores.values()) >= top_k
+
+        pending: List[int] = []
+        for index in range(len(documents)):
+            cached = _score_cache.get(cache_key(index))
+            if cached is not None:
+                scores[index] = cached
+                result.cache_hits += 1
+            else:
+                pending.append(index)
+
+        # Small batches only pay off when scoring can stop early
+        batch_size = self.batch_size if threshold is not None else max(len(pending), 1)
+        # Checked once cached scores are in and again after every batch
+        while pending and not confident():
+            batch, pending = pending[:batch_size], pending[batch_size:]
+            try:
+                batch_scores, tokens = await self.scorer.score(
+                    query,
+                    [str(documents[index].get("text", "")) for index in batch]
+                )
+            except Exception as e:
+                # Keep the retrieval order for this batch rather than failing the stage
+                result.errors.append(str(e))
+                continue
+
+            result.round_trips += 1
+            result.scored += len(batch)
+            result.tokens += tokens
+            for index, score in zip(batch, batch_scores):
+                scores[index] = score
+                _score_cache.set(cache_key(index), score)
+        result.early_exit = bool(pending)
+
+        ranked = sorted(scores, key=lambda index: scores[index], reverse=True)
+        ranked += [index for index in range(len(documents)) if index not in scores]
+        result.documents = [
+            {**documents[index], "rerank_score": scores.get(index)}
+            for index in ranked[:top_k]
+        ]
+        return result
+
+
+def create_scorer(config: Dict[str, Any]) -> PairScorer:
+    """Build the scorer a reranker node config asks for."""
+    provider = config.get("provider") or "openai"
+    if provider == "local":
+        return CrossEncoderScorer(
+            config.get("model") or settings.RERANK_LOCAL_MODEL,
+            batch_size=int(config.get("modelBatchSize", 32))
+        )
+    return LLMPairScorer(provider, config.get("model") or "gpt-4o-mini")
@@ -0,0 +1,124 @@
+from typing import List, Optional, Tuple
+from array import array
+
+import numpy as np
+
+from app.services.retrieval.bm25 import top_k_indices
+
+
+class VectorIndex:
+    """
+    Dense vector index with cosine similarity.
+
+    Vectors are normalized and stored in one contiguous float32 matrix that
+    grows by doubling. Small indexes are searched exhaustively. Once an index
+    reaches `ivf_min_size` vectors, an inverted-file (IVF) layer is trained:
+    vectors are clustered with k-means and a query only scores the vectors
+    in its `nprobe` nearest clusters.
+    """
+
+    def __init__(self, dimensions: int, ivf_min_size: int = 50000, nprobe: int = 8):
+        self.dimensions = dimensions
+        self.ivf_min_size = ivf_min_size
+        self.nprobe = nprobe
+        self._matrix = np.zeros((0, dimensions), dtype=np.float32)
+        self._size = 0
+        self._centroids: Optional[np.ndarray] = None
+        self._lists: List[array] = []
+        self._list_arrays: List[Optional[np.ndarray]] = []
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def vectors(self) -> np.ndarray:
+        return self._matrix[:self._size]
+
+    def add(self, vectors: np.ndarray) -> int:
+        """Append vectors (one per row) and return the id of the first one."""
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dimensions)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1, norms)
+
+        first_id = self._size
+        needed = self._size + len(vectors)
+        if needed > len(self._matrix):
+            grown = np.zeros((max(needed, 2 * len(self._matrix), 1024), self.dimensions), dtype=np.float32)
+            grown[:self._size] = self.vectors
+            self._matrix = grown
+        self._matrix[self._size:needed] = vectors
+        self._size = needed
+
+        if self._centroids is not None:
+            self._assign(np.arange(first_id, needed), vectors)
+        return first_id
+
+    def search(
+        self,
+        query: np.ndarray,
+        top_k: int,
+        mask: Optional[np.ndarray] = None
+    ) -> List[Tuple[int, float]]:
+        """Top-k vectors by cosine similarity, optionally restricted by a boolean mask."""
+        if self._size == 0:
+            return []
+        query = np.asarray(query, dtype=np.float32).reshape(self.dimensions)
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return []
+        query = query / norm
+
+        if self._centroids is None and self._size >= self.ivf_min_size:
+            self.train()
+
+        if self._centroids is None:
+            candidates = np.arange(self._size) if mask is None else np.flatnonzero(mask[:self._size])
+        else:
+            candidates = self._probe(query)
+            if mask is not None:
+                candidates = candidates[mask[candidates]]
+        if candidates.size == 0:
+            return []
+
+        if candidates.size == self._size:
+            similarities = self.vectors @ query
+        else:
+            similarities = self._matrix[candidates] @ query
+        best = top_k_indices(similarities, top_k)
+        return [(int(candidates[i]), float(similarities[i])) for i in best]
+
+    def train(self, n_lists: Optional[int] = None, iterations: int = 10, sample_size: int = 100000) -> None:
+        """Cluster the stored vectors into inverted lists (spherical k-means)."""
+        n_lists = n_lists or max(1, int(np.sqrt(self._size)))
+        rng = np.random.default_rng(0)
+        sample = self.vectors[rng.choice(self._size, size=min(sample_size, self._size), replace=False)]
+        centroids = sample[rng.choice(len(sample), size=min(n_lists, len(sample)), replace=False)].copy()
+
+        for _ in range(iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            for list_id in range(len(centroids)):
+                members = sample[assignment == list_id]
+                if len(members):
+                    centroid = members.mean(axis=0)
+                    centroids[list_id] = centroid / max(np.linalg.norm(centroid), 1e-12)
+
+        self._centroids = centroids
+        self._lists = [array("I") for _ in range(len(centroids))]
+        self._list_arrays = [None] * len(centroids)
+        self._assign(np.arange(self._size), self.vectors)
+
+    def _assign(self, ids: np.ndarray, vectors: np.ndarray, chunk_size: int = 65536) -> None:
+        for start in range(0, len(ids), chunk_size):
+            assignment = np.argmax(vectors[start:start + chunk_size] @ self._centroids.T, axis=1)
+            for vector_id, list_id in zip(ids[start:start + chunk_size].tolist(), assignment.tolist()):
+                self._lists[list_id].append(vector_id)
+                self._list_arrays[list_id] = None
+
+    def _probe(self, query: np.ndarray) -> np.ndarray:
+        nearest = top_k_indices(self._centroids @ query, self.nprobe)
+        arrays = []
+        for list_id in nearest:
+            if self._list_arrays[list_id] is None:
+                self._list_arrays[list_id] = np.array(self._lists[list_id], dtype=np.int64)
+            arrays.append(self._list_arrays[list_id])
+        return np.concatenate(arrays) if arrays else np.empty(0, dtype=np.int64)
@@ -0,0 +1,101 @@
+# backend/app/services/streaming.py
+from typing import AsyncIterator, List, Optional
+import asyncio
+import json
+
+from app.core.config import settings
+
+
+class SSEFrameEncoder:
+    """
+    Encodes StreamChunk-shaped server-sent events from pre-encoded parts.
+
+    Everything but the content is fixed for a stream, so a frame is the
+    JSON-escaped content between a constant prefix and suffix; the output is
+    byte-for-byte what `StreamChunk(...).json()` would produce.
+    """
+
+    _PREFIX = b'data: {"content":'
+
+    def __init__(self, session_id: Optional[str] = None):
+        session = json.dumps(session_id, ensure_ascii=False).encode("utf-8")
+        self._suffix = b',"finished":false,"session_id":' + session + b"}\n\n"
+        self._final_suffix = b',"finished":true,"session_id":' + session + b"}\n\n"
+        self.final_frame = self._PREFIX + b'""' + self._final_suffix
+
+    def frame(self, content: str) -> bytes:
+        return self._PREFIX + json.dumps(content, ensure_ascii=False).encode("utf-8") + self._suffix
+
+    def error_frame(self, message: str) -> bytes:
+        return self._PREFIX + json.dumps(message, ensure_ascii=False).encode("utf-8") + self._final_suffix
+
+
+async def coalesce_tokens(
+    tokens: AsyncIterator[str],
+    max_chars: Optional[int] = None,
+    max_wait_ms: Optional[int] = None
+) -> AsyncIterator[str]:
+    """
+    Group streamed tokens into larger pieces.
+
+    Tokens are pulled by a separate task into a buffer; a piece is released
+    once it reaches `max_chars` or `max_wait_ms` after its first token, or
+    when the stream ends. While the consumer is blocked (e.g. writing to a
+    slow client) tokens keep accumulating, so slow readers get fewer, larger
+    frames instead of a growing backlog of small ones.
+    """
+    max_chars = max_chars or settings.STREAM_FRAME_MAX_CHARS
+    max_wait = (settings.STREAM_FRAME_MAX_WAIT_MS if max_wait_ms is None else max_wait_ms) / 1000
+
+    buffer: List[str] = []
+    size = 0
+    finished = False
+    failure: Optional[BaseException] = None
+    has_data = asyncio.Event()
+    full = asyncio.Event()
+
+    async def pump() -> None:
+        nonlocal size, finished, failure
+        try:
+            async for token in tokens:
+                if not token:
+                    continue
+                buffer.append(token)
+                size += len(token)
+                has_data.set()
+                if size >= max_chars:
+                    full.set()
+        except Exception as e:
+            failure = e
+        finally:
+            finished = True
+            has_data.set()
+            full.set()
+
+    pump_task = asyncio.create_task(pump())
+    try:
+        while True:
+            await has_data.wait()
+            if max_wait > 0 and not full.is_set():
+                try:
+                    await asyncio.wait_for(full.wait(), max_wait)
+                except asyncio.TimeoutError:
+                    pass
+
+            piece = "".join(buffer)
+            buffer.clear()
+            size = 0
+            if not finished:
+                has_data.clear()
+                full.clear()
+
+            if piece:
+                yield piece
+            if finished and not buffer:
+                break
+
+        if failure is not None:
+            raise failure
+    finally:
+        if not pump_task.done():
+            pump_task.cancel()
@@ -0,0 +1,277 @@
+# backend/app/services/upload_service.py
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import Session
+from typing import AsyncIterator, Dict, List, Optional
+from contextlib import asynccontextmanager
+import asyncio
+import hashlib
+import os
+import re
+import uuid
+from datetime import datetime
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.db.models import FileUpload
+from app.schemas.upload import FileUploadCreate
+
+# Running sha256 of in-progress uploads with the offset it covers, so
+# chunks are hashed as they arrive; rebuilt from the partial file on a miss
+_hashers = LRUCache(max_size=256, name="upload_hashers")
+
+
+class _UploadLock:
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.users = 0
+
+
+# Serializes requests per upload within this process; entries exist only
+# while a request holds or awaits them
+_upload_locks: Dict[str, _UploadLock] = {}
+
+
+@asynccontextmanager
+async def _locked(upload_id: str):
+    entry = _upload_locks.get(upload_id)
+    if entry is None:
+        entry = _upload_locks[upload_id] = _UploadLock()
+    entry.users += 1
+    try:
+        async with entry.lock:
+            yield
+    finally:
+        entry.users -= 1
+        if entry.users == 0:
+            _upload_locks.pop(upload_id, None)
+
+_SAFE_EXTENSION = re.compile(r"^\.[a-z0-9]{1,16}$")
+
+
+class UploadOffsetMismatch(Exception):
+    """A chunk did not start where the upload currently ends."""
+
+    def __init__(self, offset: int):
+        super().__init__(f"Upload is at offset {offset}")
+        self.offset = offset
+
+
+class UploadTooLarge(ValueError):
+    """An upload would exceed its declared size or the size limit."""
+
+
+class UploadService:
+    """
+    Chunked, resumable file uploads.
+
+    Chunks are streamed into a partial file through a fixed-size buffer,
+    hashed on the way, and may be resent from the last acknowledged
+    offset. Completed uploads are moved into content-addressed storage;
+    identical content is stored once and shared. Every upload sends its
+    bytes, even for content already stored: knowing a hash must not be
+    enough to obtain a file.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create_upload(self, upload_data: FileUploadCreate) -> FileUpload:
+        """Start an upload; a declared sha256 is checked against the bytes received."""
+        if settings.UPLOAD_MAX_FILE_SIZE is not None and (upload_data.size or 0) > settings.UPLOAD_MAX_FILE_SIZE:
+            raise UploadTooLarge(f"Uploads are limited to {settings.UPLOAD_MAX_FILE_SIZE} bytes")
+
+        upload = FileUpload(
+            filename=os.path.basename(upload_data.filename),
+            content_type=upload_data.content_type,
+            size=upload_data.size,
+            received_bytes=0,
+            status="uploading",
+            sha256=upload_data.sha256.lower() if upload_data.sha256 else None
+        )
+
+        self.db.add(upload)
+        self.db.commit()
+        self.db.refresh(upload)
+
+        path = self._partial_path(str(upload.id))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        open(path, "wb").close()
+        return upload
+
+    def get_upload(self, upload_id: uuid.UUID) -> Optional[FileUpload]:
+        return self.db.query(FileUpload).filter(FileUpload.id == upload_id).first()
+
+    def get_completed(self, upload_ids: List[str]) -> List[FileUpload]:
+        """Completed uploads by id, in the given order."""
+        try:
+            upload_ids = [str(uuid.UUID(str(upload_id))) for upload_id in upload_ids]
+        except ValueError:
+            raise ValueError(f"Invalid upload ids: {upload_ids}")
+
+        uploads = {
+            str(upload.id): upload
+            for upload in self.db.query(FileUpload).filter(
+                FileUpload.id.in_([uuid.UUID(upload_id) for upload_id in upload_ids]),
+                FileUpload.status == "complete"
+            )
+        }
+        missing = [upload_id for upload_id in upload_ids if upload_id not in uploads]
+        if missing:
+            raise ValueError(f"Uploads not found or not complete: {', '.join(missing)}")
+        return [uploads[upload_id] for upload_id in upload_ids]
+
+    async def append_chunk(self, upload: FileUpload, offset: int, chunks: AsyncIterator[bytes]) -> FileUpload:
+        """
+        Append streamed bytes at `offset`. Bytes received before the stream
+        breaks off are kept, so the client can resume from the new offset.
+        """
+        upload_id = str(upload.id)
+        async with _locked(upload_id):
+            self._reload(upload)
+            if upload.status != "uploading":
+                raise ValueError(f"Upload is already {upload.status}")
+            if offset != upload.received_bytes:
+                raise UploadOffsetMismatch(upload.received_bytes)
+
+            limit = upload.size if upload.size is not None else settings.UPLOAD_MAX_FILE_SIZE
+            path = self._partial_path(upload_id)
+            hasher = await self._hasher(upload_id, path, offset)
+            buffer = bytearray()
+            written = offset
+
+            with open(path, "r+b") as f:
+                # Drop bytes past the offset left by an interrupted request
+                f.seek(offset)
+                f.truncate()
+                try:
+                    async for chunk in chunks:
+                        if limit is not None and written + len(buffer) + len(chunk) > limit:
+                            raise UploadTooLarge(f"Upload exceeds its size of {limit} bytes")
+                        buffer += chunk
+                        if len(buffer) >= settings.UPLOAD_WRITE_BUFFER_SIZE:
+                            await asyncio.to_thread(_write, f, hasher, bytes(buffer))
+                            written += len(buffer)
+                            buffer.clear()
+                finally:
+                    if buffer:
+                        await asyncio.to_thread(_write, f, hasher, bytes(buffer))
+                        written += len(buffer)
+                    _hashers.set(upload_id, (hasher, written))
+                    upload.received_bytes = written
+                    self.db.commit()
+
+            if upload.size is not None and written == upload.size:
+                return await self._complete(upload, hasher)
+            return upload
+
+    async def complete_upload(self, upload: FileUpload) -> FileUpload:
+        """Finish an upload of undeclared size with the bytes received so far."""
+        upload_id = str(upload.id)
+        async with _locked(upload_id):
+            self._reload(upload)
+            if upload.status == "complete":
+                return upload
+            if upload.size is not None and upload.received_bytes != upload.size:
+                raise ValueError(f"Upload is incomplete: {upload.received_bytes} of {upload.size} bytes received")
+            hasher = await self._hasher(upload_id, self._partial_path(upload_id), upload.received_bytes)
+            return await self._complete(upload, hasher)
+
+    async def delete_upload(self, upload: FileUpload) -> None:
+        """Remove an upload, and its stored file unless other uploads share it."""
+        upload_id = str(upload.id)
+        async with _locked(upload_id):
+            self._reload(upload)
+            if upload.status == "uploading":
+                _remove(self._partial_path(upload_id))
+            elif upload.storage_path:
+                shared = self.db.query(FileUpload).filter(
+                    FileUpload.storage_path == upload.storage_path,
+                    FileUpload.id != upload.id
+                ).first()
+                if shared is None:
+                    _remove(upload.storage_path)
+
+            self.db.delete(upload)
+            self.db.commit()
+            _hashers.pop(upload_id)
+
+    async def _complete(self, upload: FileUpload, hasher) -> FileUpload:
+        upload_id = str(upload.id)
+        digest = hasher.hexdigest()
+        partial_path = self._partial_path(upload_id)
+
+        if upload.sha256 and upload.sha256 != digest:
+            # Start over rather than keep bytes that can't be what was meant
+            open(partial_path, "wb").close()
+            _hashers.pop(upload_id)
+            upload.received_bytes = 0
+            self.db.commit()
+            raise ValueError(f"Received content has sha256 {digest}, not the declared {upload.sha256}; upload restarted at offset 0")
+        storage_path = self._object_path(digest, upload.filename)
+
+        def store() -> None:
+            if os.path.exists(storage_path):
+                os.remove(partial_path)  # Identical content is already stored
+            else:
+                os.makedirs(os.path.dirname(storage_path), exist_ok=True)
+                os.replace(partial_path, storage_path)
+
+        await asyncio.to_thread(store)
+        upload.sha256 = digest
+        upload.size = upload.received_bytes
+        upload.storage_path = storage_path
+        upload.status = "complete"
+        upload.completed_at = datetime.now()
+        self.db.commit()
+        _hashers.pop(upload_id)
+        return upload
+
+    def _reload(self, upload: FileUpload) -> None:
+        try:
+            self.db.refresh(upload)
+        except InvalidRequestError:
+            raise ValueError("Upload was deleted")
+
+    async def _hasher(self, upload_id: str, path: str, offset: int):
+        cached = _hashers.get(upload_id)
+        if cached is not None and cached[1] == offset:
+            return cached[0]
+        # Another worker received earlier chunks, or this one restarted
+        return await asyncio.to_thread(_hash_prefix, path, offset)
+
+    @staticmethod
+    def _partial_path(upload_id: str) -> str:
+        return os.path.join(settings.UPLOAD_STORAGE_PATH, "partial", upload_id)
+
+    @staticmethod
+    def _object_path(sha256: str, filename: str) -> str:
+        # Keep the extension: document loaders pick parsers by it
+        extension = os.path.splitext(filename)[1].lower()
+        if not _SAFE_EXTENSION.match(extension):
+            extension = ""
+        return os.path.join(settings.UPLOAD_STORAGE_PATH, "objects", sha256[:2], sha256 + extension)
+
+
+def _write(f, hasher, data: bytes) -> None:
+    f.write(data)
+    hasher.update(data)
+
+
+def _hash_prefix(path: str, length: int, block_size: int = 1024 * 1024):
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        remaining = length
+        while remaining > 0:
+            block = f.read(min(block_size, remaining))
+            if not block:
+                raise ValueError(f"Upload file is shorter than its offset {length}")
+            hasher.update(block)
+            remaining -= len(block)
+    return hasher
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,240 @@
+from sqlalchemy.orm import Session
+from typing import IO, Any, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+import asyncio
+import codecs
+import csv
+import json
+
+from app.core.config import settings
+from app.services.workflow.compiler import ExecutionPlan
+from app.services.workflow.engine import WorkflowEngine
+from app.services.workflow.node_handlers import NodeContext, NodeHandler
+from app.services.workflow.run_control import (
+    ExecutionCancelled,
+    ExecutionLimitExceeded,
+    NodeTimeout,
+    RowControl,
+    RowLimitExceeded,
+    RunControl,
+    RunLimits
+)
+
+# A batch row: its inputs, or the reason it could not be parsed
+BatchRow = Tuple[Optional[Dict[str, Any]], Optional[str]]
+
+# Receives one result message per row
+RowEmitter = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+def iter_list_rows(inputs: Iterable[Any]) -> Iterator[BatchRow]:
+    """Rows given inline as a list of input dicts."""
+    for item in inputs:
+        if isinstance(item, dict):
+            yield item, None
+        else:
+            yield None, "Row must be a JSON object"
+
+
+def iter_ndjson_rows(file: IO[bytes]) -> Iterator[BatchRow]:
+    """Rows of an uploaded JSONL file, one input object per line."""
+    for line in file:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            item = json.loads(line)
+        except ValueError as e:
+            yield None, f"Invalid JSON: {e}"
+            continue
+        yield from iter_list_rows([item])
+
+
+def iter_csv_rows(file: IO[bytes]) -> Iterator[BatchRow]:
+    """Rows of an uploaded CSV file; the header row names the input keys."""
+    reader = csv.DictReader(codecs.iterdecode(file, "utf-8-sig"))
+    for record in reader:
+        yield {key: value for key, value in record.items() if key is not None}, None
+
+
+class MicroBatcher:
+    """
+    Node dispatcher that groups concurrent calls to the same node across
+    batch rows.
+
+    Calls to handlers with an `execute_batch` implementation are held for up
+    to `max_wait` seconds or until `max_size` calls are pending, then served
+    by a single execute_batch call. Other handlers are called directly.
+    """
+
+    def __init__(self, max_size: int, max_wait: float):
+        self.max_size = max_size
+        self.max_wait = max_wait
+        self._pending: Dict[str, List[Tuple[NodeContext, asyncio.Future]]] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def dispatch(self, handler: NodeHandler, context: NodeContext) -> Dict[str, Any]:
+        if handler.execute_batch is None:
+            return await handler.execute(context)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        pending = self._pending.setdefault(context.node_id, [])
+        pending.append((context, future))
+
+        if len(pending) >= self.max_size:
+            self._flush(context.node_id, handler)
+        elif len(pending) == 1:
+            self._timers[context.node_id] = loop.call_later(
+                self.max_wait, self._flush, context.node_id, handler
+            )
+        return await future
+
+    def close(self) -> None:
+        """Cancel pending timers and in-flight batches."""
+        for timer in self._timers.values():
+            timer.cancel()
+        for task in self._tasks:
+            task.cancel()
+        for calls in self._pending.values():
+            for _, future in calls:
+                future.cancel()
+        self._timers.clear()
+        self._pending.clear()
+
+    def _flush(self, node_id: str, handler: NodeHandler) -> None:
+        timer = self._timers.pop(node_id, None)
+        if timer is not None:
+            timer.cancel()
+
+        # Skip callers that gave up in the meantime, e.g. on a node timeout
+        calls = [(context, future) for context, future in self._pending.pop(node_id, []) if not future.done()]
+        if calls:
+            task = asyncio.create_task(self._execute(handler, calls))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _execute(self, handler: NodeHandler, calls: List[Tuple[NodeContext, asyncio.Future]]) -> None:
+        try:
+            results = await handler.execute_batch([context for context, _ in calls])
+        except asyncio.CancelledError:
+            for _, future in calls:
+                future.cancel()
+            raise
+        except Exception as e:
+            results = [e] * len(calls)
+
+        for (_, future), result in zip(calls, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+class WorkflowBatchRunner:
+    """
+    Runs one compiled workflow plan over many input rows.
+
+    Rows are pipelined through the graph by a fixed pool of workers, so at
+    most `concurrency` rows are in flight. No NodeExecution rows are written
+    per row, and node calls are micro-batched across rows where the node
+    supports it. Each row has its own token and cost budgets; a row failing,
+    also on those, doesn't stop the batch. Cancellation and exhausted budgets
+    of the batch as a whole do.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        execution_id: str,
+        plan: ExecutionPlan,
+        control: RunControl,
+        config: Optional[Dict[str, Any]] = None
+    ):
+        config = config or {}
+        self.execution_id = execution_id
+        self.plan = plan
+        self.control = control
+        self.use_cache = config.get("use_cache", True)
+        self.row_limits = RunLimits.for_batch_row(config)
+        self.concurrency = max(1, int(config.get("concurrency", settings.WORKFLOW_BATCH_CONCURRENCY)))
+        self.batcher = MicroBatcher(
+            max_size=int(config.get("micro_batch_size", settings.WORKFLOW_BATCH_MICRO_BATCH_SIZE)),
+            max_wait=config.get("micro_batch_wait_ms", settings.WORKFLOW_BATCH_MICRO_BATCH_WAIT_MS) / 1000
+        )
+        self.engine = WorkflowEngine(db, record_nodes=False, dispatch=self.batcher.dispatch)
+        self.completed = 0
+        self.failed = 0
+
+    async def run(self, rows: Iterable[BatchRow], emit: RowEmitter) -> Dict[str, Any]:
+        """Execute all rows, emitting each result as soon as it is ready."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        tasks = [asyncio.create_task(self._feed(rows, queue, emit))]
+        tasks += [asyncio.create_task(self._work(queue, emit)) for _ in range(self.concurrency)]
+
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            self.batcher.close()
+
+        return self.summary()
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "rows": self.completed + self.failed,
+            "completed": self.completed,
+            "failed": self.failed,
+            "tokens_used": self.control.tokens_used
+        }
+
+    async def _feed(self, rows: Iterable[BatchRow], queue: asyncio.Queue, emit: RowEmitter) -> None:
+        for index, (inputs, error) in enumerate(rows):
+            await self.control.checkpoint()
+            if error is not None:
+                self.failed += 1
+                await emit({"type": "row", "row": index, "status": "failed", "error": error})
+            else:
+                await queue.put((index, inputs))
+
+        for _ in range(self.concurrency):
+            await queue.put(None)
+
+    async def _work(self, queue: asyncio.Queue, emit: RowEmitter) -> None:
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+
+            index, inputs = item
+            try:
+                outputs = await self.engine.run(
+                    self.execution_id,
+                    self.plan,
+                    inputs=inputs,
+                    use_cache=self.use_cache,
+                    control=RowControl(self.control, self.row_limits)
+                )
+            except (NodeTimeout, RowLimitExceeded) as e:
+                error = str(e)
+            except (ExecutionCancelled, ExecutionLimitExceeded):
+                # Cancellation and exhausted batch budgets end the whole batch
+                raise
+            except Exception as e:
+                error = str(e)
+            else:
+                self.completed += 1
+                await emit({
+                    "type": "row",
+                    "row": index,
+                    "status": "completed",
+                    "cache_hits": outputs["cache_hits"],
+                    "results": outputs["results"]
+                })
+                continue
+
+            self.failed += 1
+            await emit({"type": "row", "row": index, "status": "failed", "error": error})
@@ -0,0 +1,146 @@
+from typing import Any, Dict, List, Optional, Tuple
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.db.models import Workflow
+from app.services.workflow.node_cache import stable_hash
+from app.services.workflow.node_handlers import NodeHandler, get_node_handler
+
+
+class WorkflowCompileError(ValueError):
+    """Raised when a workflow graph cannot be turned into an execution plan."""
+    pass
+
+
+@dataclass(frozen=True)
+class CompiledNode:
+    """A node with its handler resolved and its config validated."""
+    id: str
+    type: str
+    config: Dict[str, Any]  # Shared by all runs of the plan, never mutated
+    config_hash: str
+    handler: NodeHandler
+    upstream: Tuple[str, ...]
+    downstream: Tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class ExecutionPlan:
+    """
+    Immutable, run-independent form of a workflow graph.
+    Built once per workflow version and shared by every run of it.
+    """
+    nodes: Dict[str, CompiledNode]
+    order: Tuple[str, ...]  # Every node comes after its upstream nodes
+    dependency_counts: Dict[str, int]
+    sinks: frozenset  # Nodes nothing else depends on; their outputs are the results
+
+
+def topological_order(graph_data: Dict[str, Any]) -> Tuple[List[str], Dict[str, List[str]]]:
+    """
+    Order workflow nodes so that every node comes after its upstream nodes.
+    Returns the order and the upstream node ids of every node.
+    """
+    node_ids = [node["id"] for node in graph_data.get("nodes", [])]
+    upstream: Dict[str, List[str]] = {node_id: [] for node_id in node_ids}
+    downstream: Dict[str, List[str]] = {node_id: [] for node_id in node_ids}
+
+    for edge in graph_data.get("edges", []):
+        source, target = edge.get("source"), edge.get("target")
+        if source in upstream and target in upstream:
+            upstream[target].append(source)
+            downstream[source].append(target)
+
+    pending = {node_id: len(upstream[node_id]) for node_id in node_ids}
+    ready = deque(node_id for node_id in node_ids if pending[node_id] == 0)
+    order = []
+    while ready:
+        node_id = ready.popleft()
+        order.append(node_id)
+        for target in downstream[node_id]:
+            pending[target] -= 1
+            if pending[target] == 0:
+                ready.append(target)
+
+    if len(order) != len(node_ids):
+        raise WorkflowCompileError("Workflow graph contains a cycle")
+
+    return order, upstream
+
+
+def compile_graph(graph_data: Dict[str, Any]) -> ExecutionPlan:
+    """Validate a workflow graph and build its execution plan."""
+    seen = set()
+    for node in graph_data.get("nodes", []):
+        if not node.get("id"):
+            raise WorkflowCompileError("Workflow node without an id")
+        if node["id"] in seen:
+            raise WorkflowCompileError(f"Duplicate node id: {node['id']}")
+        seen.add(node["id"])
+
+    order, upstream = topological_order(graph_data)
+    downstream: Dict[str, List[str]] = {node_id: [] for node_id in order}
+    for node_id in order:
+        for source in upstream[node_id]:
+            downstream[source].append(node_id)
+
+    nodes: Dict[str, CompiledNode] = {}
+    for node in graph_data.get("nodes", []):
+        node_id = node["id"]
+        node_type = node.get("type")
+        handler = get_node_handler(node_type)
+        config = dict((node.get("data") or {}).get("config") or {})
+
+        if handler.validate_config is not None:
+            try:
+                config = handler.validate_config(config)
+            except (TypeError, ValueError) as e:
+                raise WorkflowCompileError(f"Invalid config for node {node_id}: {e}")
+
+        nodes[node_id] = CompiledNode(
+            id=node_id,
+            type=node_type,
+            config=config,
+            config_hash=stable_hash(config),
+            handler=handler,
+            upstream=tuple(upstream[node_id]),
+            downstream=tuple(downstream[node_id])
+        )
+
+    return ExecutionPlan(
+        nodes=nodes,
+        order=tuple(order),
+        dependency_counts={node_id: len(upstream[node_id]) for node_id in order},
+        sinks=frozenset(node_id for node_id in order if not downstream[node_id])
+    )
+
+
+class PlanCache:
+    """
+    Execution plans of recently run workflows, keyed by workflow id and
+    checked against the workflow's updated_at so stale plans are never used.
+    """
+
+    def __init__(self, max_size: int = settings.WORKFLOW_PLAN_CACHE_SIZE):
+        self._plans = LRUCache(max_size=max_size, name="workflow_plans")
+
+    def get(self, workflow: Workflow) -> ExecutionPlan:
+        """Get the plan of a workflow, compiling it on a miss."""
+        workflow_id = str(workflow.id)
+        cached: Optional[Tuple[datetime, ExecutionPlan]] = self._plans.get(workflow_id)
+        if cached is not None and cached[0] == workflow.updated_at:
+            return cached[1]
+
+        plan = compile_graph(workflow.graph_data or {"nodes": [], "edges": []})
+        self._plans.set(workflow_id, (workflow.updated_at, plan))
+        return plan
+
+    def invalidate(self, workflow_id: Any) -> None:
+        """Drop the plan of an updated or deleted workflow."""
+        self._plans.pop(str(workflow_id))
+
+
+plan_cache = PlanCache()
@@ -0,0 +1,253 @@
+from sqlalchemy.orm import Session
+from typing import Any, Awaitable, Callable, Dict, Optional, Union
+from datetime import datetime
+import asyncio
+import time
+
+from app.core.metrics import metrics
+from app.core.tracing import current_span, tracer
+from app.db.models import NodeExecution
+from app.services.ingestion.spool import chunk_spools
+from app.services.workflow.compiler import ExecutionPlan, compile_graph
+from app.services.workflow.node_cache import NodeOutputCache, node_cache_key, node_output_cache, stable_hash
+from app.services.workflow.node_handlers import NodeContext, NodeHandler
+from app.services.workflow.run_control import ExecutionCancelled, NodeTimeout, RunControl
+
+# Receives execution update messages, e.g. to fan them out over WebSockets
+EventPublisher = Callable[[Dict[str, Any]], Awaitable[None]]
+
+# Invokes a node handler, e.g. directly or through a micro-batcher
+NodeDispatcher = Callable[[NodeHandler, NodeContext], Awaitable[Dict[str, Any]]]
+
+_node_duration = metrics.histogram(
+    "road_workflow_node_duration_seconds",
+    "Duration of workflow node executions (cache hits excluded)",
+    ["node_type", "status"]
+)
+
+
+async def invoke_handler(handler: NodeHandler, context: NodeContext) -> Dict[str, Any]:
+    """Default dispatcher: call the handler directly."""
+    return await handler.execute(context)
+
+
+class WorkflowEngine:
+    """
+    Executes workflow graphs node by node in dependency order.
+
+    Node outputs are memoized on (node type, config, upstream output hashes),
+    so re-running an edited workflow only recomputes the changed nodes and
+    everything downstream of them.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        cache: Optional[NodeOutputCache] = None,
+        publish: Optional[EventPublisher] = None,
+        record_nodes: bool = True,
+        dispatch: Optional[NodeDispatcher] = None
+    ):
+        self.db = db
+        self.cache = cache or node_output_cache
+        self.publish = publish
+        self.record_nodes = record_nodes  # Write a NodeExecution row per node
+        self.dispatch = dispatch or invoke_handler
+
+    async def run(
+        self,
+        execution_id: str,
+        plan: Union[Dict[str, Any], ExecutionPlan],
+        inputs: Optional[Dict[str, Any]] = None,
+        use_cache: bool = True,
+        control: Optional[RunControl] = None,
+        stream_outputs: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Execute a compiled workflow plan (or raw graph_data) and return its outputs.
+        With `stream_outputs`, nodes publish partial output (e.g. LLM tokens)
+        as they produce it; `control` allows pausing and cancelling the run
+        and enforces its deadlines and budgets.
+        """
+        inputs = inputs or {}
+        control = control or RunControl()
+        if not isinstance(plan, ExecutionPlan):
+            plan = compile_graph(plan)
+
+        outputs: Dict[str, Dict[str, Any]] = {}
+        output_hashes: Dict[str, str] = {}
+        cache_hits = 0
+
+        try:
+            for node_id in plan.order:
+                await control.checkpoint()
+
+                node = plan.nodes[node_id]
+                handler = node.handler
+
+                key = node_cache_key(
+                    node.type,
+                    node.config_hash,
+                    [output_hashes[source] for source in node.upstream],
+                    inputs if handler.uses_run_inputs else None
+                )
+                use_node_cache = use_cache and handler.cacheable and node.config.get("cache", True)
+
+                output = self.cache.get(key) if use_node_cache else None
+                if output is not None:
+                    cache_hits += 1
+                    self._record_cache_hit(execution_id, node_id, node.type, key, output)
+                    await self._emit_node_update(execution_id, node_id, "success", cached=True)
+                else:
+                    control.start_node()
+                    context = NodeContext(
+                        execution_id=execution_id,
+                        node_id=node_id,
+                        node_type=node.type,
+                        config=node.config,
+                        upstream={source: outputs[source] for source in node.upstream},
+                        run_inputs=inputs,
+                        emit=self._partial_emitter(execution_id, node_id) if stream_outputs and self.publish else None,
+                        control=control
+                    )
+                    output = await self._execute_node(context, handler, key)
+                    if use_node_cache:
+                        self.cache.set(key, node.type, output)
+
+                outputs[node_id] = output
+                output_hashes[node_id] = stable_hash(output)
+        finally:
+            # Chunks spooled by this run's loaders are read by now, or never will be
+            for output in outputs.values():
+                if output.get("chunk_spool"):
+                    chunk_spools.release(str(output["chunk_spool"]))
+
+        return {
+            "status": "completed",
+            "nodes_processed": len(plan.order),
+            "cache_hits": cache_hits,
+            "results": {node_id: outputs[node_id] for node_id in plan.order if node_id in plan.sinks}
+        }
+
+    async def _execute_node(self, context: NodeContext, handler, cache_key: str) -> Dict[str, Any]:
+        """Run a node handler and record its NodeExecution row, in a span of its own."""
+        with tracer.span(f"workflow.node {context.node_type}") as span:
+            span.set_attribute("road.execution_id", context.execution_id)
+            span.set_attribute("road.node_id", context.node_id)
+            span.set_attribute("road.node_type", context.node_type)
+            return await self._run_node(context, handler, cache_key)
+
+    async def _run_node(self, context: NodeContext, handler, cache_key: str) -> Dict[str, Any]:
+        if not self.record_nodes:
+            return await self._invoke(handler, context)
+
+        node_start = datetime.now()
+        node_execution = NodeExecution(
+            execution_id=context.execution_id,
+            node_id=context.node_id,
+            node_type=context.node_type,
+            status="running",
+            input_data={"upstream": list(context.upstream.keys()), "cache_key": cache_key}
+        )
+        self.db.add(node_execution)
+        self.db.commit()
+        current_span().set_attribute("road.node_execution_id", str(node_execution.id))
+        await self._emit_node_update(context.execution_id, context.node_id, "running")
+
+        try:
+            output = await self._invoke(handler, context)
+        except (ExecutionCancelled, asyncio.CancelledError):
+            node_execution.status = "cancelled"
+            node_execution.execution_time_ms = int((datetime.now() - node_start).total_seconds() * 1000)
+            self.db.commit()
+            await self._emit_node_update(context.execution_id, context.node_id, "cancelled")
+            raise
+        except Exception as e:
+            node_execution.status = "error"
+            node_execution.error_message = str(e)
+            node_execution.execution_time_ms = int((datetime.now() - node_start).total_seconds() * 1000)
+            self.db.commit()
+            await self._emit_node_update(context.execution_id, context.node_id, "error", error=str(e))
+            raise
+
+        node_execution.status = "success"
+        node_execution.output_data = output
+        node_execution.execution_time_ms = int((datetime.now() - node_start).total_seconds() * 1000)
+        self.db.commit()
+        await self._emit_node_update(
+            context.execution_id,
+            context.node_id,
+            "success",
+            execution_time_ms=node_execution.execution_time_ms
+        )
+        return output
+
+    async def _invoke(self, handler, context: NodeContext) -> Dict[str, Any]:
+        """Run a handler within the node's deadline, cancelling it on expiry."""
+        started = time.perf_counter()
+        status = "error"
+        timeout = context.control.node_timeout(context.config) if context.control else None
+        try:
+            if timeout is None:
+                output = await self.dispatch(handler, context)
+            else:
+                try:
+                    output = await asyncio.wait_for(self.dispatch(handler, context), timeout=max(timeout, 0))
+                except asyncio.TimeoutError:
+                    status = "timeout"
+                    raise NodeTimeout(f"Node {context.node_id} exceeded its deadline of {timeout:.1f}s")
+            status = "success"
+            return output
+        except (ExecutionCancelled, asyncio.CancelledError):
+            status = "cancelled"
+            raise
+        finally:
+            _node_duration.labels(context.node_type, status).observe(time.perf_counter() - started)
+
+    async def _emit_node_update(self, execution_id: str, node_id: str, status: str, **extra) -> None:
+        """Publish a node state transition if a publisher is attached."""
+        if self.publish is None:
+            return
+        with tracer.span("workflow.publish") as span:
+            span.set_attribute("road.node_status", status)
+            await self.publish({
+                "type": "node_update",
+                "execution_id": execution_id,
+                "node_id": node_id,
+                "status": status,
+                "timestamp": datetime.now().isoformat(),
+                **extra
+            })
+
+    def _partial_emitter(self, execution_id: str, node_id: str):
+        """Create the emitter a node uses to publish partial output."""
+        async def emit(message: Dict[str, Any]) -> None:
+            await self.publish({
+                "execution_id": execution_id,
+                "node_id": node_id,
+                "timestamp": datetime.now().isoformat(),
+                **message
+            })
+        return emit
+
+    def _record_cache_hit(
+        self,
+        execution_id: str,
+        node_id: str,
+        node_type: str,
+        cache_key: str,
+        output: Dict[str, Any]
+    ) -> None:
+        """Record a node that was served from the output cache."""
+        if not self.record_nodes:
+            return
+        self.db.add(NodeExecution(
+            execution_id=execution_id,
+            node_id=node_id,
+            node_type=node_type,
+            status="success",
+            input_data={"cache_key": cache_key, "cache_hit": True},
+            output_data=output,
+            execution_time_ms=0
+        ))
+        self.db.commit()
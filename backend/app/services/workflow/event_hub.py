@@ -0,0 +1,296 @@
+from fastapi import WebSocket
+from typing import Any, Dict, List, Optional, Set
+from collections import OrderedDict
+import asyncio
+import itertools
+import json
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.services.workflow.run_control import active_runs
+
+# Message types that must always reach a subscriber
+_TERMINAL_TYPES = {"execution_start", "execution_complete", "execution_error"}
+
+_sequence = itertools.count()
+
+
+class Subscriber:
+    """
+    A WebSocket subscribed to execution updates.
+
+    Messages are queued in a bounded, ordered buffer and sent by a dedicated
+    task, so a slow browser only ever delays itself. Messages sharing a
+    coalesce key either replace the queued one (successive states of one
+    node) or, with `append`, have their "delta" appended to it (streamed
+    tokens), and when the buffer is full the oldest droppable message is
+    discarded to make room. Appended messages are kept as they arrived and
+    merged once, when they are sent.
+
+    A subscriber that can't keep up even so, or whose socket fails, is
+    disconnected with a close frame, so the browser knows to resubscribe.
+    """
+
+    # Close codes: try again later (too far behind), internal error (send failed)
+    CLOSE_BEHIND = 1013
+    CLOSE_SEND_FAILED = 1011
+
+    def __init__(self, websocket: WebSocket, max_queue: int):
+        self.websocket = websocket
+        self.max_queue = max_queue
+        self.dropped = 0
+        self.closed = False
+        # Key -> (messages to merge, droppable)
+        self._buffer: "OrderedDict[Any, tuple]" = OrderedDict()
+        self._ready = asyncio.Event()
+        self._task = asyncio.create_task(self._send_loop())
+        self._closing: Optional[asyncio.Task] = None
+
+    def offer(
+        self,
+        text: str,
+        coalesce_key: Optional[str] = None,
+        droppable: bool = True,
+        append: bool = False
+    ) -> None:
+        """Queue a serialized message without blocking."""
+        if self.closed:
+            return
+
+        key = ("coalesce", coalesce_key) if coalesce_key else ("seq", next(_sequence))
+        if key in self._buffer:
+            if append:
+                # Merged into the queued message when sent, keeping its position
+                self._buffer[key][0].append(text)
+            else:
+                # The newer state supersedes the queued one and moves behind
+                # everything published in between
+                del self._buffer[key]
+                self._buffer[key] = ([text], droppable)
+            return
+
+        if len(self._buffer) >= self.max_queue and not self._drop_oldest():
+            if not droppable:
+                # Nothing left to drop and the message must be delivered:
+                # the client is hopelessly behind, so disconnect it.
+                self.disconnect(self.CLOSE_BEHIND)
+                return
+            self.dropped += 1
+            return
+
+        self._buffer[key] = ([text], droppable)
+        self._ready.set()
+
+    def close(self) -> None:
+        """Stop sending and release the send task."""
+        self.closed = True
+        self._buffer.clear()
+        self._task.cancel()
+
+    def disconnect(self, code: int) -> None:
+        """Unsubscribe from everything and close the socket with `code`."""
+        execution_hub.remove(self)
+        if self._closing is None:
+            self._closing = asyncio.create_task(self._close_socket(code))
+
+    async def _close_socket(self, code: int) -> None:
+        try:
+            await asyncio.wait_for(self.websocket.close(code=code), timeout=settings.EXECUTION_EVENTS_SEND_TIMEOUT)
+        except Exception:
+            pass  # Already closed or unreachable
+
+    def _drop_oldest(self) -> bool:
+        for key, (_, droppable) in self._buffer.items():
+            if droppable:
+                del self._buffer[key]
+                self.dropped += 1
+                return True
+        return False
+
+    async def _send_loop(self) -> None:
+        try:
+            while not self.closed:
+                await self._ready.wait()
+                while self._buffer:
+                    _, (texts, _) = self._buffer.popitem(last=False)
+                    await asyncio.wait_for(
+                        self.websocket.send_text(_merge(texts)),
+                        timeout=settings.EXECUTION_EVENTS_SEND_TIMEOUT
+                    )
+                self._ready.clear()
+        except asyncio.CancelledError:
+            pass
+        except Exception:
+            # Send failed or timed out: the socket is gone or stalled
+            self.disconnect(self.CLOSE_SEND_FAILED)
+
+
+def _merge(texts: List[str]) -> str:
+    """One message from appended ones: the first, with all their deltas."""
+    if len(texts) == 1:
+        return texts[0]
+    merged = json.loads(texts[0])
+    merged["delta"] = "".join(json.loads(text)["delta"] for text in texts)
+    return json.dumps(merged)
+
+
+class ExecutionEventHub:
+    """
+    Pub/sub hub that fans execution updates out to WebSocket subscribers.
+
+    Subscribers are kept in sets keyed by execution id. Publishing serializes
+    a message once and hands it to every subscriber's queue without awaiting
+    any socket. With EXECUTION_EVENTS_BACKPLANE set to "redis", messages are
+    relayed through Redis pub/sub so subscribers connected to other workers
+    receive them too, and cancellation requests reach the worker that owns
+    the run.
+    """
+
+    CHANNEL_PREFIX = "road:executions:"
+    CONTROL_CHANNEL = "road:execution-control"
+
+    def __init__(self):
+        self.subscriptions: Dict[str, Set[Subscriber]] = {}
+        self._redis = None
+        self._listener: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Connect the Redis backplane if enabled."""
+        if settings.EXECUTION_EVENTS_BACKPLANE != "redis" or self._redis is not None:
+            return
+
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(settings.REDIS_URL)
+        pubsub = self._redis.pubsub()
+        await pubsub.psubscribe(f"{self.CHANNEL_PREFIX}*")
+        await pubsub.subscribe(self.CONTROL_CHANNEL)
+        self._listener = asyncio.create_task(self._listen(pubsub))
+
+    async def stop(self) -> None:
+        """Close all subscribers and the Redis backplane."""
+        for subscribers in list(self.subscriptions.values()):
+            for subscriber in list(subscribers):
+                subscriber.close()
+        self.subscriptions.clear()
+
+        if self._listener:
+            self._listener.cancel()
+            self._listener = None
+        if self._redis is not None:
+            await self._redis.close()
+            self._redis = None
+
+    @property
+    def queued(self) -> int:
+        """Messages waiting to be sent to subscribers."""
+        return sum(len(subscriber._buffer) for subscribers in list(self.subscriptions.values()) for subscriber in subscribers)
+
+    def subscribe(self, execution_id: str, websocket: WebSocket) -> Subscriber:
+        """Subscribe an accepted WebSocket to updates of one execution."""
+        subscriber = Subscriber(websocket, settings.EXECUTION_EVENTS_QUEUE_SIZE)
+        self.subscriptions.setdefault(execution_id, set()).add(subscriber)
+        return subscriber
+
+    def remove(self, subscriber: Subscriber) -> None:
+        """Remove a subscriber from every execution it listens to."""
+        subscriber.close()
+        for execution_id in [e for e, subs in self.subscriptions.items() if subscriber in subs]:
+            self._discard(execution_id, subscriber)
+
+    def unsubscribe(self, execution_id: str, subscriber: Subscriber) -> None:
+        """Remove a subscriber from one execution."""
+        subscriber.close()
+        self._discard(execution_id, subscriber)
+
+    async def publish(
+        self,
+        execution_id: str,
+        message: Dict[str, Any],
+        coalesce_key: Optional[str] = None,
+        droppable: Optional[bool] = None,
+        append: bool = False
+    ) -> None:
+        """
+        Publish an update to all subscribers of an execution.
+        Appended messages must carry a "delta" string and are never dropped.
+        """
+        if droppable is None:
+            droppable = not append and message.get("type") not in _TERMINAL_TYPES
+        text = json.dumps(message, default=str)
+
+        if self._redis is not None:
+            envelope = json.dumps({
+                "text": text,
+                "coalesce_key": coalesce_key,
+                "droppable": droppable,
+                "append": append
+            })
+            await self._redis.publish(f"{self.CHANNEL_PREFIX}{execution_id}", envelope)
+        else:
+            self._deliver(execution_id, text, coalesce_key, droppable, append)
+
+    async def request_cancel(self, execution_id: str, reason: str = "Cancelled by user") -> bool:
+        """
+        Ask every worker to cancel a run; the one running it does. Returns
+        False without a backplane, when other workers can't be reached.
+        """
+        if self._redis is None:
+            return False
+        command = json.dumps({"action": "cancel", "execution_id": execution_id, "reason": reason})
+        await self._redis.publish(self.CONTROL_CHANNEL, command)
+        return True
+
+    def _deliver(
+        self,
+        execution_id: str,
+        text: str,
+        coalesce_key: Optional[str],
+        droppable: bool,
+        append: bool = False
+    ) -> None:
+        for subscriber in list(self.subscriptions.get(execution_id, ())):
+            subscriber.offer(text, coalesce_key, droppable, append)
+
+    def _discard(self, execution_id: str, subscriber: Subscriber) -> None:
+        subscribers = self.subscriptions.get(execution_id)
+        if subscribers is not None:
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self.subscriptions[execution_id]
+
+    async def _listen(self, pubsub) -> None:
+        """Deliver messages relayed by Redis to local subscribers, and run control commands."""
+        try:
+            async for item in pubsub.listen():
+                if item.get("type") not in ("pmessage", "message"):
+                    continue
+                channel = item["channel"].decode() if isinstance(item["channel"], bytes) else item["channel"]
+                if channel == self.CONTROL_CHANNEL:
+                    command = json.loads(item["data"])
+                    if command.get("action") == "cancel":
+                        # A no-op on workers that don't own the run
+                        active_runs.cancel(command["execution_id"], command.get("reason", "Cancelled by user"))
+                    continue
+                envelope = json.loads(item["data"])
+                self._deliver(
+                    channel[len(self.CHANNEL_PREFIX):],
+                    envelope["text"],
+                    envelope.get("coalesce_key"),
+                    envelope.get("droppable", True),
+                    envelope.get("append", False)
+                )
+        except asyncio.CancelledError:
+            await pubsub.close()
+        except Exception as e:
+            print(f"Execution event backplane stopped: {e}")
+
+
+execution_hub = ExecutionEventHub()
+
+metrics.gauge("road_queue_depth", "Items waiting in in-process queues", ["queue"]).labels(
+    "execution_updates"
+).set_function(lambda: execution_hub.queued)
+metrics.gauge("road_execution_subscribers", "WebSockets subscribed to execution updates").set_function(
+    lambda: sum(len(subscribers) for subscribers in list(execution_hub.subscriptions.values()))
+)
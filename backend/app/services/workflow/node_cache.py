@@ -0,0 +1,171 @@
+from sqlalchemy.orm import Session
+from typing import Any, Dict, Iterable, Optional
+from datetime import datetime, timedelta
+import hashlib
+import json
+import os
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.db.models import NodeOutputCacheEntry
+from app.db.session import SessionLocal
+
+
+def stable_hash(value: Any) -> str:
+    """Hash a JSON-compatible value independently of key order."""
+    encoded = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def node_cache_key(
+    node_type: str,
+    config_hash: str,
+    upstream_hashes: Iterable[str],
+    run_inputs: Optional[Dict[str, Any]] = None
+) -> str:
+    """
+    Build the memoization key of a node execution.
+    The key covers the node type, the stable_hash of its config and the hashes
+    of all upstream outputs, so any change upstream also changes every
+    downstream key.
+    """
+    return stable_hash({
+        "type": node_type,
+        "config": config_hash,
+        "upstream": sorted(upstream_hashes),
+        "inputs": run_inputs
+    })
+
+
+class NodeOutputCache:
+    """
+    Bounded cache of node outputs keyed by node_cache_key.
+
+    Entries always live in an in-memory LRU. Depending on NODE_CACHE_BACKEND
+    they are also written through to a directory of JSON files ("disk") or
+    to the node_output_cache table ("postgres"), so that cached outputs
+    survive restarts and are shared between workers.
+    """
+
+    def __init__(
+        self,
+        backend: str = settings.NODE_CACHE_BACKEND,
+        max_size: int = settings.NODE_CACHE_SIZE
+    ):
+        if backend not in ("memory", "disk", "postgres"):
+            raise ValueError(f"Unsupported node cache backend: {backend}")
+
+        self.backend = backend
+        self.memory = LRUCache(max_size=max_size, name="node_outputs")
+        self._writes = 0
+
+        if backend == "disk":
+            os.makedirs(settings.NODE_CACHE_PATH, exist_ok=True)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get a cached output, falling back to the persistent backend."""
+        output = self.memory.get(key)
+        if output is not None:
+            return output
+
+        try:
+            if self.backend == "disk":
+                output = self._disk_get(key)
+            elif self.backend == "postgres":
+                output = self._db_get(key)
+        except Exception as e:
+            print(f"Error reading node cache entry {key}: {e}")
+            output = None
+
+        if output is not None:
+            self.memory.set(key, output)
+        return output
+
+    def set(self, key: str, node_type: str, output: Dict[str, Any]) -> None:
+        """Store a node output."""
+        self.memory.set(key, output)
+
+        try:
+            if self.backend == "disk":
+                self._disk_set(key, output)
+            elif self.backend == "postgres":
+                self._db_set(key, node_type, output)
+        except Exception as e:
+            print(f"Error writing node cache entry {key}: {e}")
+
+    def clear(self) -> None:
+        """Clear the in-memory layer."""
+        self.memory.clear()
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(settings.NODE_CACHE_PATH, f"{key}.json")
+
+    def _disk_get(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._disk_path(key)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _disk_set(self, key: str, output: Dict[str, Any]) -> None:
+        # Write to a temporary file first so readers never see partial JSON
+        path = self._disk_path(key)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(output, f, ensure_ascii=False, default=str)
+        os.replace(tmp_path, path)
+
+        self._writes += 1
+        if self._writes % 100 == 0:
+            self._disk_prune()
+
+    def _disk_prune(self) -> None:
+        """Remove the oldest entries once the directory exceeds its bound."""
+        entries = [
+            os.path.join(settings.NODE_CACHE_PATH, name)
+            for name in os.listdir(settings.NODE_CACHE_PATH)
+            if name.endswith(".json")
+        ]
+        excess = len(entries) - settings.NODE_CACHE_MAX_ENTRIES
+        if excess <= 0:
+            return
+        entries.sort(key=os.path.getmtime)
+        for path in entries[:excess]:
+            os.remove(path)
+
+    def _db_get(self, key: str) -> Optional[Dict[str, Any]]:
+        cutoff = datetime.now() - timedelta(seconds=settings.NODE_CACHE_TTL_SECONDS)
+        db: Session = SessionLocal()
+        try:
+            entry = db.query(NodeOutputCacheEntry).filter(
+                NodeOutputCacheEntry.cache_key == key,
+                NodeOutputCacheEntry.created_at >= cutoff
+            ).first()
+            return entry.output_data if entry else None
+        finally:
+            db.close()
+
+    def _db_set(self, key: str, node_type: str, output: Dict[str, Any]) -> None:
+        db: Session = SessionLocal()
+        try:
+            db.merge(NodeOutputCacheEntry(
+                cache_key=key,
+                node_type=node_type,
+                output_data=output,
+                created_at=datetime.now()
+            ))
+
+            self._writes += 1
+            if self._writes % 100 == 0:
+                cutoff = datetime.now() - timedelta(seconds=settings.NODE_CACHE_TTL_SECONDS)
+                db.query(NodeOutputCacheEntry).filter(
+                    NodeOutputCacheEntry.created_at < cutoff
+                ).delete(synchronize_session=False)
+
+            db.commit()
+        finally:
+            db.close()
+
+
+# Shared by all executions in this process
+node_output_cache = NodeOutputCache()
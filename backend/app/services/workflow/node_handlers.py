@@ -0,0 +1,502 @@
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from dataclasses import dataclass, field
+import asyncio
+import itertools
+import os
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.schemas.llm import ChatMessage, LLMParameters, MessageRole
+from app.services.ingestion.loaders import discover_sources, file_digest
+from app.services.ingestion.manifest import IngestionManifest, SourceState, split_signature
+from app.services.ingestion.parsing import document_parsers
+from app.services.ingestion.spool import chunk_spools
+from app.services.llm_factory import LLMFactory
+from app.services.retrieval.index import STRATEGIES, retrieval_indexes
+from app.services.retrieval.rerank import Reranker, create_scorer
+from app.services.upload_service import UploadService
+from app.services.workflow.node_cache import stable_hash
+from app.services.workflow.run_control import RunControl, estimate_tokens
+
+# Publishes partial node output, e.g. streamed tokens
+PartialEmitter = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+@dataclass
+class NodeContext:
+    """Everything a node handler needs to produce its output."""
+    execution_id: str
+    node_id: str
+    node_type: str
+    config: Dict[str, Any]
+    upstream: Dict[str, Dict[str, Any]]  # Outputs of upstream nodes by node id
+    run_inputs: Dict[str, Any] = field(default_factory=dict)
+    emit: Optional[PartialEmitter] = None  # Set when partial outputs are streamed
+    control: Optional[RunControl] = None
+
+    @property
+    def streaming(self) -> bool:
+        return self.emit is not None
+
+    async def checkpoint(self) -> None:
+        """Honor cancellation and pause requests of the run."""
+        if self.control is not None:
+            await self.control.checkpoint()
+
+    def charge(self, tokens: int) -> None:
+        """Charge consumed tokens, priced by the node's costPer1kTokens."""
+        if self.control is not None:
+            cost = tokens / 1000 * float(self.config.get("costPer1kTokens", 0.0))
+            self.control.charge(tokens, cost)
+
+    def upstream_text(self) -> str:
+        """Join the text outputs of all upstream nodes."""
+        texts = [str(output["text"]) for output in self.upstream.values() if output.get("text")]
+        return "\n\n".join(texts)
+
+    def merged_upstream(self) -> Dict[str, Any]:
+        """Merge upstream outputs into one dict, later nodes winning."""
+        merged: Dict[str, Any] = {}
+        for output in self.upstream.values():
+            merged.update(output)
+        text = self.upstream_text()
+        if text:
+            merged["text"] = text
+        return merged
+
+
+NodeHandlerFunc = Callable[[NodeContext], Awaitable[Dict[str, Any]]]
+
+# Serves one node for several batch rows; returns an output or exception per row
+NodeBatchFunc = Callable[[List[NodeContext]], Awaitable[List[Any]]]
+
+# Validates a node config when a workflow is compiled; returns it normalized
+ConfigValidator = Callable[[Dict[str, Any]], Dict[str, Any]]
+
+
+@dataclass(frozen=True)
+class NodeHandler:
+    """A node implementation and how its outputs may be memoized."""
+    execute: NodeHandlerFunc
+    cacheable: bool = True  # Worth storing in the node output cache
+    uses_run_inputs: bool = False  # Output depends on the execution inputs
+    execute_batch: Optional[NodeBatchFunc] = None  # Cross-row batching in batch runs
+    validate_config: Optional[ConfigValidator] = None
+
+
+def validate_prompt_template_config(config: Dict[str, Any]) -> Dict[str, Any]:
+    template = config.get("template") or "{text}"
+    if not isinstance(template, str):
+        raise ValueError("template must be a string")
+    return {**config, "template": template}
+
+
+def validate_llm_config(config: Dict[str, Any]) -> Dict[str, Any]:
+    temperature = float(config.get("temperature", 0.7))
+    if not 0 <= temperature <= 2:
+        raise ValueError("temperature must be between 0 and 2")
+    max_tokens = int(config.get("maxTokens", 1000))
+    if max_tokens < 1:
+        raise ValueError("maxTokens must be positive")
+    return {
+        **config,
+        "provider": config.get("provider") or "openai",
+        "model": config.get("model") or "gpt-4o-mini",
+        "temperature": temperature,
+        "maxTokens": max_tokens
+    }
+
+
+def validate_retriever_config(config: Dict[str, Any]) -> Dict[str, Any]:
+    strategy = config.get("strategy") or "similarity"
+    if strategy not in STRATEGIES:
+        raise ValueError(f"strategy must be one of {', '.join(STRATEGIES)}")
+    top_k = int(config.get("topK", 5))
+    if top_k < 1:
+        raise ValueError("topK must be positive")
+    threshold = float(config.get("scoreThreshold") or 0.0)
+    if not 0 <= threshold <= 1:
+        raise ValueError("scoreThreshold must be between 0 and 1")
+    if not isinstance(config.get("filters") or {}, dict):
+        raise ValueError("filters must be an object")
+    return {**config, "strategy": strategy, "topK": top_k, "scoreThreshold": threshold}
+
+
+def validate_reranker_config(config: Dict[str, Any]) -> Dict[str, Any]:
+    top_k = int(config.get("topK", 5))
+    batch_size = int(config.get("batchSize", settings.RERANK_BATCH_SIZE))
+    if top_k < 1 or batch_size < 1:
+        raise ValueError("topK and batchSize must be positive")
+    threshold = config.get("earlyExitThreshold")
+    if threshold is not None and not 0 <= float(threshold) <= 1:
+        raise ValueError("earlyExitThreshold must be between 0 and 1")
+    return {**config, "topK": top_k, "batchSize": batch_size}
+
+
+async def user_input_node(ctx: NodeContext) -> Dict[str, Any]:
+    """Expose the execution input addressed to this node."""
+    input_key = ctx.config.get("inputKey", ctx.node_id)
+    value = ctx.run_inputs.get(input_key, ctx.run_inputs.get("input", ""))
+    return {"text": value}
+
+
+async def prompt_template_node(ctx: NodeContext) -> Dict[str, Any]:
+    """Render a prompt template with upstream outputs as variables."""
+    template = ctx.config["template"]
+    variables = {**ctx.run_inputs, **ctx.merged_upstream()}
+    return {"text": template.format_map(_DefaultDict(variables))}
+
+
+async def llm_node(ctx: NodeContext) -> Dict[str, Any]:
+    """Send upstream text to an LLM provider, streaming tokens if requested."""
+    provider = LLMFactory.get_service(ctx.config["provider"])
+    model_name = ctx.config["model"]
+    messages = [ChatMessage(role=MessageRole.USER, content=ctx.upstream_text() or " ")]
+    parameters = LLMParameters(
+        temperature=ctx.config["temperature"],
+        max_tokens=ctx.config["maxTokens"]
+    )
+
+    if not ctx.streaming:
+        response = await provider.chat(
+            model_name=model_name,
+            messages=messages,
+            system_prompt=ctx.config.get("systemPrompt"),
+            parameters=parameters
+        )
+        usage = response.usage or {}
+        ctx.charge(usage.get("total_tokens") or estimate_tokens(messages[0].content) + estimate_tokens(response.content))
+        return {"text": response.content, "usage": response.usage, "model": response.model}
+
+    ctx.charge(estimate_tokens(messages[0].content))
+    parts: List[str] = []
+    async for delta in provider.stream_text(
+        model_name=model_name,
+        messages=messages,
+        system_prompt=ctx.config.get("systemPrompt"),
+        parameters=parameters
+    ):
+        parts.append(delta)
+        ctx.charge(estimate_tokens(delta))
+        await ctx.emit({"type": "node_output", "delta": delta})
+        await ctx.checkpoint()
+    return {"text": "".join(parts), "usage": None, "model": model_name}
+
+
+async def llm_node_batch(contexts: List[NodeContext]) -> List[Any]:
+    """Serve the LLM calls of several rows, calling the provider once per distinct request."""
+    groups: Dict[str, List[int]] = {}
+    for index, ctx in enumerate(contexts):
+        key = stable_hash({"config": ctx.config, "text": ctx.upstream_text()})
+        groups.setdefault(key, []).append(index)
+
+    responses = await asyncio.gather(
+        *(llm_node(contexts[indexes[0]]) for indexes in groups.values()),
+        return_exceptions=True
+    )
+
+    results: List[Any] = [None] * len(contexts)
+    for indexes, response in zip(groups.values(), responses):
+        for index in indexes:
+            results[index] = response if isinstance(response, BaseException) else dict(response)
+    return results
+
+
+async def file_upload_node(ctx: NodeContext) -> Dict[str, Any]:
+    """
+    Resolve completed uploads (config uploadIds, or the execution input
+    upload_ids / upload_id) to their stored files, for document loaders.
+    """
+    upload_ids = ctx.config.get("uploadIds") or ctx.run_inputs.get("upload_ids")
+    if not upload_ids and ctx.run_inputs.get("upload_id"):
+        upload_ids = [ctx.run_inputs["upload_id"]]
+    if not upload_ids:
+        raise ValueError("File upload node needs upload ids")
+
+    db = SessionLocal()
+    try:
+        uploads = UploadService(db).get_completed([str(upload_id) for upload_id in upload_ids])
+    finally:
+        db.close()
+
+    files = [
+        {
+            "id": str(upload.id),
+            "filename": upload.filename,
+            "path": os.path.abspath(upload.storage_path),
+            "size": upload.size,
+            "sha256": upload.sha256
+        }
+        for upload in uploads
+    ]
+    return {"files": files, "paths": [file["path"] for file in files]}
+
+
+async def document_loader_node(ctx: NodeContext) -> Dict[str, Any]:
+    """
+    Load and split the documents at a path, or at the paths of upstream
+    files (e.g. uploads). With `incremental` (the default)
+    only sources added or changed since the last ingestion into the target
+    index are loaded, and chunks of changed or removed sources are reported
+    for deletion. Documents are parsed in the parser process pool; ones that
+    fail are reported and left out of the manifest, so they are retried.
+    Chunks are written to a chunk spool as they arrive; the output carries
+    the spool's id, not the chunks.
+    """
+    upstream = ctx.merged_upstream()
+    path = ctx.config.get("path") or upstream.get("path") or ctx.run_inputs.get("path")
+    roots = [path] if path else [str(upstream_path) for upstream_path in upstream.get("paths") or []]
+    if not roots:
+        raise ValueError("Document loader needs a path")
+    index = retrieval_indexes.get_or_create(ctx.config.get("indexName") or "default")
+    sources: List[str] = []
+    for root in roots:
+        sources.extend(await asyncio.to_thread(discover_sources, root, ctx.config.get("pattern")))
+    sources = list(dict.fromkeys(sources))
+    # Uploads were hashed on arrival; don't read them again for it
+    hashes = {file["path"]: file["sha256"] for file in upstream.get("files") or [] if file.get("sha256")}
+    chunk_size = int(ctx.config.get("chunkSize", 1000))
+    chunk_overlap = int(ctx.config.get("chunkOverlap", 200))
+    split_hash = split_signature(chunk_size, chunk_overlap)
+
+    if ctx.config.get("incremental", True):
+        db = SessionLocal()
+        try:
+            diff = await asyncio.to_thread(
+                IngestionManifest(db).diff,
+                index.name,
+                index.generation,
+                sources,
+                roots,
+                hashes,
+                split_hash
+            )
+        finally:
+            db.close()
+        to_process, removed, stale_chunk_ids = diff.to_process, diff.removed, diff.stale_chunk_ids
+        unchanged = len(diff.unchanged)
+    else:
+        to_process = [await asyncio.to_thread(_source_state, source, hashes.get(source)) for source in sources]
+        removed, stale_chunk_ids, unchanged = [], [], 0
+
+    timeout = ctx.config.get("parseTimeoutSeconds")
+    states = {state.path: state for state in to_process}
+    spool = chunk_spools.create()
+    documents = {}  # Documents being parsed, by path
+    chunk_ids: Dict[str, List[str]] = {}
+    ingested: List[Dict[str, Any]] = []
+    errors: List[Dict[str, str]] = []
+    try:
+        async for batch in document_parsers.parse(
+            list(states),
+            chunk_size,
+            chunk_overlap,
+            float(timeout) if timeout else None
+        ):
+            await ctx.checkpoint()
+            if batch.path not in documents:
+                documents[batch.path] = spool.document(batch.path)
+                chunk_ids[batch.path] = []
+            document = documents[batch.path]
+            ids = chunk_ids[batch.path]
+            chunks = list(batch.iter_chunks())
+            for chunk in chunks:
+                chunk["id"] = f"{batch.path}#{chunk['metadata']['chunk']}"
+                ids.append(chunk["id"])
+            document.write(chunks)
+            if not batch.done:
+                continue
+            del documents[batch.path]
+            ids = chunk_ids.pop(batch.path)
+            if batch.error:
+                # Chunks sent before the failure are dropped with the document
+                document.discard()
+                errors.append({"path": batch.path, "error": batch.error})
+                continue
+            document.commit()
+            ingested.append({**states[batch.path].to_dict(), "chunk_ids": ids})
+    except BaseException:
+        chunk_spools.release(spool.id)
+        raise
+    finally:
+        for document in documents.values():
+            document.discard()
+
+    return {
+        "indexName": index.name,
+        "chunk_spool": spool.id,
+        "chunk_count": spool.chunk_count,
+        "chunks_sha256": spool.sha256,
+        "removed_chunk_ids": stale_chunk_ids,
+        "errors": errors,
+        "ingestion": {
+            "generation": index.generation,
+            "split_hash": split_hash,
+            "sources": ingested,
+            "removed_sources": removed,
+            "unchanged": unchanged
+        }
+    }
+
+
+def _source_state(path: str, content_hash: Optional[str] = None) -> SourceState:
+    stat = os.stat(path)
+    return SourceState(path, stat.st_mtime_ns, stat.st_size, content_hash or file_digest(path))
+
+
+async def vector_store_node(ctx: NodeContext) -> Dict[str, Any]:
+    """
+    Add upstream chunks (or texts) with their embeddings to a retrieval index,
+    delete chunks reported stale and record ingested sources in the manifest.
+    Chunks of a document loader are read from its chunk spool as they are indexed.
+    """
+    index_name = ctx.config.get("indexName") or ctx.merged_upstream().get("indexName") or "default"
+    index = retrieval_indexes.get_or_create(index_name)
+    chunks: List[Dict[str, Any]] = []
+    spooled = []
+    stale_chunk_ids: List[str] = []
+    ingestions: List[Dict[str, Any]] = []
+    for output in ctx.upstream.values():
+        stale_chunk_ids.extend(output.get("removed_chunk_ids") or [])
+        if output.get("ingestion"):
+            ingestions.append(output["ingestion"])
+        if output.get("chunk_spool"):
+            spool = chunk_spools.get(str(output["chunk_spool"]))
+            if spool is None:
+                raise ValueError(f"Chunk spool not found: {output['chunk_spool']}")
+            spooled.append(spool.iter_chunks())
+        elif isinstance(output.get("chunks"), list):
+            chunks.extend(chunk if isinstance(chunk, dict) else {"text": str(chunk)} for chunk in output["chunks"])
+        elif output.get("text"):
+            chunks.append({
+                "text": str(output["text"]),
+                "embedding": output.get("embedding"),
+                "metadata": output.get("metadata")
+            })
+
+    deleted = index.delete(stale_chunk_ids)
+    added = index.add(itertools.chain(chunks, *spooled))
+
+    # Only the index the chunks were loaded against may be recorded as up to date
+    ingestions = [ingestion for ingestion in ingestions if ingestion.get("generation") == index.generation]
+    if ingestions:
+        db = SessionLocal()
+        try:
+            manifest = IngestionManifest(db)
+            for ingestion in ingestions:
+                manifest.record(
+                    index.name,
+                    index.generation,
+                    ingestion["sources"],
+                    ingestion["removed_sources"],
+                    ingestion.get("split_hash")
+                )
+        finally:
+            db.close()
+
+    return {"indexName": index.name, "added": added, "deleted": deleted, "size": len(index)}
+
+
+async def retriever_node(ctx: NodeContext) -> Dict[str, Any]:
+    """Retrieve the chunks most relevant to the upstream text (and embedding)."""
+    upstream = ctx.merged_upstream()
+    index_name = ctx.config.get("indexName") or upstream.get("indexName") or "default"
+    index = retrieval_indexes.get(index_name)
+    if index is None:
+        raise ValueError(f"Retrieval index not found: {index_name}")
+
+    query = str(ctx.run_inputs.get("query") or ctx.upstream_text())
+    query_vector = upstream.get("embedding")
+    strategy = ctx.config["strategy"]
+    filters = ctx.config.get("filters") or None
+
+    if ctx.streaming and strategy == "hybrid" and query_vector is not None:
+        # Keyword hits are ready before fusion; show them right away
+        keyword_hits = index.search(query, top_k=ctx.config["topK"], filters=filters, strategy="keyword")
+        await ctx.emit({"type": "node_partial", "documents": [hit.to_dict() for hit in keyword_hits]})
+
+    hits = index.search(
+        query,
+        query_vector=query_vector,
+        top_k=ctx.config["topK"],
+        filters=filters,
+        strategy=strategy
+    )
+    if strategy in ("similarity", "mmr") and query_vector is not None:
+        # The threshold applies to cosine similarity; fused ranks have no absolute scale
+        hits = [hit for hit in hits if hit.score >= ctx.config["scoreThreshold"]]
+
+    return {
+        "text": "\n\n".join(hit.text for hit in hits),
+        "query": query,
+        "documents": [hit.to_dict() for hit in hits]
+    }
+
+
+async def reranker_node(ctx: NodeContext) -> Dict[str, Any]:
+    """Rerank upstream retrieved documents against the query."""
+    upstream = ctx.merged_upstream()
+    documents = upstream.get("documents") or []
+    query = str(upstream.get("query") or ctx.run_inputs.get("query") or "")
+
+    reranker = Reranker(create_scorer(ctx.config), batch_size=ctx.config["batchSize"])
+    result = await reranker.rerank(
+        query,
+        documents,
+        top_k=ctx.config["topK"],
+        threshold=ctx.config.get("earlyExitThreshold")
+    )
+    ctx.charge(result.tokens)
+
+    return {
+        "text": "\n\n".join(str(document.get("text", "")) for document in result.documents),
+        "query": query,
+        "documents": result.documents,
+        "rerank": {
+            "scored": result.scored,
+            "cache_hits": result.cache_hits,
+            "round_trips": result.round_trips,
+            "early_exit": result.early_exit,
+            "errors": result.errors
+        }
+    }
+
+
+async def output_node(ctx: NodeContext) -> Dict[str, Any]:
+    """Collect the final result of the workflow."""
+    return {"text": ctx.upstream_text(), "result": ctx.merged_upstream()}
+
+
+async def passthrough_node(ctx: NodeContext) -> Dict[str, Any]:
+    """Forward upstream outputs unchanged (for nodes without a backend yet)."""
+    return ctx.merged_upstream()
+
+
+class _DefaultDict(dict):
+    """format_map helper that leaves unknown placeholders untouched."""
+    def __missing__(self, key):
+        return "{" + key + "}"
+
+
+NODE_HANDLERS: Dict[str, NodeHandler] = {
+    "userInput": NodeHandler(user_input_node, cacheable=False, uses_run_inputs=True),
+    "promptTemplate": NodeHandler(
+        prompt_template_node,
+        cacheable=False,
+        validate_config=validate_prompt_template_config
+    ),
+    "llm": NodeHandler(llm_node, execute_batch=llm_node_batch, validate_config=validate_llm_config),
+    "fileUpload": NodeHandler(file_upload_node, cacheable=False, uses_run_inputs=True),
+    "documentLoader": NodeHandler(document_loader_node, cacheable=False),
+    "vectorStore": NodeHandler(vector_store_node, cacheable=False),
+    "retriever": NodeHandler(retriever_node, cacheable=False, validate_config=validate_retriever_config),
+    "reranker": NodeHandler(reranker_node, validate_config=validate_reranker_config),
+    "output": NodeHandler(output_node, cacheable=False),
+}
+
+DEFAULT_HANDLER = NodeHandler(passthrough_node, cacheable=False)
+
+
+def get_node_handler(node_type: str) -> NodeHandler:
+    """Get the handler for a node type."""
+    return NODE_HANDLERS.get(node_type, DEFAULT_HANDLER)
@@ -0,0 +1,259 @@
+from typing import Any, Dict, Optional, Tuple
+from dataclasses import dataclass, replace
+import asyncio
+import time
+
+from app.core.config import settings
+
+
+class ExecutionCancelled(Exception):
+    """Raised inside a workflow run once it has been cancelled."""
+    pass
+
+
+class ExecutionLimitExceeded(Exception):
+    """Raised when a workflow run exceeds a deadline or resource budget."""
+    pass
+
+
+class NodeTimeout(ExecutionLimitExceeded):
+    """Raised when a single node exceeds its deadline."""
+    pass
+
+
+class RowLimitExceeded(ExecutionLimitExceeded):
+    """Raised when one row of a batch run exceeds its own budget."""
+    pass
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for providers that don't report usage."""
+    return max(1, len(text) // 4) if text else 0
+
+
+@dataclass(frozen=True)
+class RunLimits:
+    """Deadlines and budgets of one workflow run. None means unlimited."""
+    run_timeout: Optional[float] = None  # seconds for the whole run
+    node_timeout: Optional[float] = None  # seconds per node
+    max_nodes: Optional[int] = None
+    max_tokens: Optional[int] = None
+    max_cost: Optional[float] = None
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]] = None) -> "RunLimits":
+        """Build limits from an execution config, falling back to settings."""
+        config = config or {}
+        return cls(
+            run_timeout=config.get("timeout_seconds", settings.WORKFLOW_RUN_TIMEOUT_SECONDS),
+            node_timeout=config.get("node_timeout_seconds", settings.WORKFLOW_NODE_TIMEOUT_SECONDS),
+            max_nodes=config.get("max_nodes", settings.WORKFLOW_MAX_NODES),
+            max_tokens=config.get("max_tokens", settings.WORKFLOW_MAX_TOKENS),
+            max_cost=config.get("max_cost", settings.WORKFLOW_MAX_COST)
+        )
+
+    @classmethod
+    def for_batch(cls, config: Optional[Dict[str, Any]] = None) -> "RunLimits":
+        """
+        Limits of a batch run as a whole. The run deadline and the node,
+        token and cost budgets scale with the number of rows, so they only
+        apply when set explicitly; rows have budgets of their own.
+        """
+        config = config or {}
+        return replace(
+            cls.from_config(config),
+            run_timeout=config.get("timeout_seconds"),
+            max_nodes=config.get("max_nodes"),
+            max_tokens=config.get("max_tokens"),
+            max_cost=config.get("max_cost")
+        )
+
+    @classmethod
+    def for_batch_row(cls, config: Optional[Dict[str, Any]] = None) -> "RunLimits":
+        """Token and cost budgets of each row of a batch run."""
+        config = config or {}
+        return cls(
+            max_tokens=config.get("row_max_tokens", settings.WORKFLOW_MAX_TOKENS),
+            max_cost=config.get("row_max_cost", settings.WORKFLOW_MAX_COST)
+        )
+
+
+class RunControl:
+    """
+    Cooperative control of a running workflow execution.
+
+    The engine and node handlers call checkpoint() between units of work
+    (nodes, streamed tokens); it raises once the run is cancelled or past its
+    deadline and blocks while the run is paused. Nodes report the tokens and
+    cost they consume through charge(), which enforces the run's budgets.
+    """
+
+    # Raised by charge(), with `label` in its message
+    budget_error = ExecutionLimitExceeded
+    label = "Run"
+
+    def __init__(self, limits: Optional[RunLimits] = None):
+        self.limits = limits or RunLimits()
+        self.reason = None
+        self.nodes_started = 0
+        self.tokens_used = 0
+        self.cost = 0.0
+        self._started = time.monotonic()
+        self._cancelled = asyncio.Event()
+        self._resumed = asyncio.Event()
+        self._resumed.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    @property
+    def paused(self) -> bool:
+        return not self._resumed.is_set()
+
+    def cancel(self, reason: str = "Execution cancelled") -> None:
+        """Request cancellation of the run."""
+        if not self.cancelled:
+            self.reason = reason
+            self._cancelled.set()
+
+    def pause(self) -> None:
+        """Hold the run at its next checkpoint."""
+        self._resumed.clear()
+
+    def resume(self) -> None:
+        """Continue a paused run."""
+        self._resumed.set()
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the run deadline, None without a deadline."""
+        if self.limits.run_timeout is None:
+            return None
+        return self.limits.run_timeout - (time.monotonic() - self._started)
+
+    def node_timeout(self, node_config: Optional[Dict[str, Any]] = None) -> Optional[float]:
+        """Wall-clock budget of the next node, bounded by the run deadline."""
+        timeout = (node_config or {}).get("timeout", self.limits.node_timeout)
+        remaining = self.remaining()
+        if remaining is None:
+            return timeout
+        return remaining if timeout is None else min(timeout, remaining)
+
+    def start_node(self) -> None:
+        """Count a node execution against the node budget."""
+        self.nodes_started += 1
+        if self.limits.max_nodes is not None and self.nodes_started > self.limits.max_nodes:
+            raise ExecutionLimitExceeded(f"Run exceeded its budget of {self.limits.max_nodes} nodes")
+
+    def charge(self, tokens: int, cost: float = 0.0) -> None:
+        """Record consumed tokens and cost, raising once a budget is exceeded."""
+        self.tokens_used += tokens
+        self.cost += cost
+        if self.limits.max_tokens is not None and self.tokens_used > self.limits.max_tokens:
+            raise self.budget_error(f"{self.label} exceeded its budget of {self.limits.max_tokens} tokens")
+        if self.limits.max_cost is not None and self.cost > self.limits.max_cost:
+            raise self.budget_error(f"{self.label} exceeded its cost budget of {self.limits.max_cost}")
+
+    async def checkpoint(self) -> None:
+        """Raise if cancelled or past the deadline, wait while paused."""
+        if self.paused and not self.cancelled:
+            resumed = asyncio.ensure_future(self._resumed.wait())
+            cancelled = asyncio.ensure_future(self._cancelled.wait())
+            try:
+                await asyncio.wait(
+                    {resumed, cancelled},
+                    timeout=self.remaining(),
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+            finally:
+                resumed.cancel()
+                cancelled.cancel()
+
+        if self.cancelled:
+            raise ExecutionCancelled(self.reason)
+
+        remaining = self.remaining()
+        if remaining is not None and remaining <= 0:
+            raise ExecutionLimitExceeded(f"Run exceeded its deadline of {self.limits.run_timeout}s")
+
+
+class RowControl(RunControl):
+    """
+    Control of one row of a batch run. Tokens and cost are charged against
+    the row's budgets and the batch totals; cancellation, pausing, the
+    deadline and the node budget are the batch's.
+    """
+
+    budget_error = RowLimitExceeded
+    label = "Row"
+
+    def __init__(self, batch: RunControl, limits: RunLimits):
+        super().__init__(limits)
+        self.batch = batch
+
+    @property
+    def cancelled(self) -> bool:
+        return self.batch.cancelled
+
+    @property
+    def paused(self) -> bool:
+        return self.batch.paused
+
+    def cancel(self, reason: str = "Execution cancelled") -> None:
+        self.batch.cancel(reason)
+
+    def pause(self) -> None:
+        self.batch.pause()
+
+    def resume(self) -> None:
+        self.batch.resume()
+
+    def remaining(self) -> Optional[float]:
+        return self.batch.remaining()
+
+    def node_timeout(self, node_config: Optional[Dict[str, Any]] = None) -> Optional[float]:
+        return self.batch.node_timeout(node_config)
+
+    def start_node(self) -> None:
+        self.batch.start_node()
+
+    def charge(self, tokens: int, cost: float = 0.0) -> None:
+        self.batch.charge(tokens, cost)
+        super().charge(tokens, cost)
+
+    async def checkpoint(self) -> None:
+        await self.batch.checkpoint()
+
+
+class RunRegistry:
+    """Runs in progress in this process, so they can be cancelled by id."""
+
+    def __init__(self):
+        self._runs: Dict[str, Tuple[asyncio.Task, RunControl]] = {}
+
+    def register(self, execution_id: str, task: asyncio.Task, control: RunControl) -> None:
+        self._runs[execution_id] = (task, control)
+        task.add_done_callback(lambda _: self._runs.pop(execution_id, None))
+
+    def get(self, execution_id: str) -> Optional[RunControl]:
+        run = self._runs.get(execution_id)
+        return run[1] if run else None
+
+    def cancel(self, execution_id: str, reason: str = "Cancelled by user") -> bool:
+        """
+        Cancel a run and interrupt whatever it is awaiting, e.g. a provider
+        call. Returns False if the run is not in progress here.
+        """
+        run = self._runs.get(execution_id)
+        if run is None:
+            return False
+        task, control = run
+        control.cancel(reason)
+        # Scheduled rather than immediate so a task that hasn't started yet
+        # still enters its handlers and records the cancellation
+        asyncio.get_running_loop().call_soon(task.cancel)
+        return True
+
+
+# Runs started by this worker
+active_runs = RunRegistry()
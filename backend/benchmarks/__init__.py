@@ -0,0 +1,8 @@
+"""
+End-to-end benchmarks of the backend.
+
+Runs a real server (uvicorn, in a subprocess) against a dedicated Postgres
+database and the simulated LLM provider, drives it over HTTP and writes
+the results as JSON. Results can be compared against a baseline with the
+thresholds in thresholds.json. See README.md for usage.
+"""
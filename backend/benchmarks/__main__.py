@@ -0,0 +1,137 @@
+# backend/benchmarks/__main__.py
+"""
+Run the benchmarks (from the backend directory):
+
+    python -m benchmarks                              # all cases
+    python -m benchmarks chat stream --quick          # some cases, smaller runs
+    python -m benchmarks --baseline baseline.json     # fail on regressions
+    python -m benchmarks --check results.json --baseline baseline.json
+
+Exits with 1 when a result breaks thresholds.json.
+"""
+from contextlib import nullcontext
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+
+import httpx
+from benchmarks import compare, fixtures
+from benchmarks.cases import CASES, Options
+from benchmarks.harness import BACKEND_ROOT, Server, server_env
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="End-to-end backend benchmarks")
+    parser.add_argument("cases", nargs="*", help=f"Cases to run: {', '.join(CASES)} (default: all)")
+    parser.add_argument("--quick", action="store_true", help="Fewer requests and smaller tables, e.g. for CI")
+    parser.add_argument("--output", default="benchmark-results.json", help="Where to write the results")
+    parser.add_argument("--baseline", help="Results to compare against")
+    parser.add_argument("--thresholds", default=compare.DEFAULT_THRESHOLDS)
+    parser.add_argument("--check", metavar="RESULTS", help="Compare an existing results file instead of running")
+    parser.add_argument("--url", help="Benchmark a running server instead of starting one")
+    parser.add_argument(
+        "--database-url",
+        help="Benchmark database, whose name must end in _benchmark (default: DATABASE_URL's database + _benchmark)"
+    )
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers of the started server")
+    parser.add_argument("--prompt-rows", default=None, help="Comma-separated prompt table sizes")
+    parser.add_argument("--conversation-rows", type=int, default=None)
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.cases if name not in CASES]
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(unknown)}")
+    return args
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BACKEND_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    names = args.cases or list(CASES)
+    database_url = fixtures.benchmark_database_url(args.database_url)
+
+    options = Options(quick=args.quick)
+    if args.prompt_rows:
+        options.prompt_rows = [int(rows) for rows in args.prompt_rows.split(",")]
+    elif args.quick:
+        options.prompt_rows = [10_000, 100_000]
+    if args.conversation_rows:
+        options.conversation_rows = args.conversation_rows
+    elif args.quick:
+        options.conversation_rows = 10_000
+
+    if any(CASES[name][1] for name in names):
+        options.engine = fixtures.prepare_database(database_url)
+
+    results: Dict[str, Dict[str, Any]] = {}
+    server = nullcontext() if args.url else Server(server_env(database_url), workers=args.workers)
+    try:
+        async with server:
+            base_url = args.url or server.url
+            limits = httpx.Limits(max_connections=200, max_keepalive_connections=200)
+            async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+                for name in names:
+                    print(f"▶ {name}")
+                    case_results = await CASES[name][0](client, options)
+                    print(compare.report(case_results))
+                    results.update(case_results)
+    finally:
+        if options.engine is not None:
+            options.engine.dispose()
+
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "cases": names,
+            "quick": args.quick,
+            "workers": args.workers,
+            "target": args.url or "local"
+        },
+        "results": results
+    }
+
+
+def main(argv: List[str]) -> int:
+    args = parse_args(argv)
+
+    if args.check:
+        current = compare.load(args.check)
+    else:
+        current = asyncio.run(run(args))
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+            f.write("\n")
+        print(f"Results written to {args.output}")
+
+    baseline = compare.load(args.baseline)["results"] if args.baseline else None
+    if baseline is not None:
+        print(compare.report(current["results"], baseline))
+
+    violations = compare.check(current["results"], compare.load(args.thresholds), baseline)
+    for violation in violations:
+        print(f"❌ {violation}")
+    if violations:
+        return 1
+    print("✅ Within thresholds" if baseline is not None else "✅ Within absolute thresholds (no baseline given)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
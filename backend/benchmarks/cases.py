@@ -0,0 +1,292 @@
+# backend/benchmarks/cases.py
+"""
+The benchmark cases. Each takes an HTTP client for the server under test
+and the run's options, and returns {result name: {metric: value}}.
+
+LLM calls go to the simulated provider with the fixed-latency models in
+profiles.json, so the numbers measure the stack rather than a provider:
+bench-stream always takes 50 ms to its first token and 5 ms per token
+after that, so anything above that is overhead.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import asyncio
+import json
+import time
+
+import httpx
+from sqlalchemy.engine import Engine
+
+from benchmarks import fixtures
+from benchmarks.harness import error_summary, latency_stats, percentile, run_load
+
+Results = Dict[str, Dict[str, Any]]
+
+LLM = "/api/v1/llm"
+PROMPTS = "/api/v1/prompts"
+RAG_BUILDER = "/api/v1/rag-builder"
+
+STREAM_FIRST_TOKEN_MS = 50  # bench-stream's configured time to first token
+
+
+@dataclass
+class Options:
+    quick: bool = False
+    prompt_rows: List[int] = field(default_factory=lambda: [10_000, 100_000, 1_000_000])
+    conversation_rows: int = 100_000
+    engine: Optional[Engine] = None  # The benchmark database, for seeding
+
+    def scale(self, full: int, quick: int) -> int:
+        return quick if self.quick else full
+
+
+def _chat_request(model: str, content: str) -> Dict[str, Any]:
+    return {
+        "llm_model_provider": "simulated",
+        "llm_model_name": model,
+        "messages": [{"role": "user", "content": content}],
+        "parameters": {"temperature": 0.7, "max_tokens": 1000}
+    }
+
+
+def _summary(result, rate_name: str = "requests_per_second") -> Dict[str, Any]:
+    summary = {
+        rate_name: round(result.throughput, 2),
+        **latency_stats(result.latencies),
+        "errors": len(result.errors)
+    }
+    if result.errors:
+        print(f"  errors: {error_summary(result.errors)}")
+    return summary
+
+
+async def chat_throughput(client: httpx.AsyncClient, options: Options) -> Results:
+    """Non-streaming /chat against a model without latency: the stack's own cost per request."""
+    async def call(index: int) -> None:
+        response = await client.post(f"{LLM}/chat", json=_chat_request("bench-instant", f"Benchmark request {index}"))
+        response.raise_for_status()
+
+    await run_load(call, 20, 4)  # Warm up connections and caches
+    result = await run_load(call, options.scale(3000, 300), 32)
+    return {"chat": _summary(result)}
+
+
+async def _stream_once(client: httpx.AsyncClient, index: int) -> Tuple[float, float]:
+    """Time one /stream call; returns (seconds to first token, tokens per second after it)."""
+    started = time.perf_counter()
+    first_token_at = None
+    parts: List[str] = []
+    request = _chat_request("bench-stream", f"Benchmark stream {index}")
+
+    async with client.stream("POST", f"{LLM}/stream", json=request) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if not line.startswith("data: "):
+                continue
+            event = json.loads(line[len("data: "):])
+            content = event.get("content") or ""
+            if event.get("finished") and content.startswith("Error:"):
+                raise RuntimeError(content)
+            if content:
+                if first_token_at is None:
+                    first_token_at = time.perf_counter()
+                parts.append(content)
+
+    if first_token_at is None:
+        raise RuntimeError("Stream ended without content")
+    finished = time.perf_counter()
+    # bench-stream's tokens are words, so words count tokens even when coalesced
+    tokens = len("".join(parts).split())
+    return first_token_at - started, (tokens - 1) / max(finished - first_token_at, 1e-6)
+
+
+async def stream_latency(client: httpx.AsyncClient, options: Options) -> Results:
+    """Concurrent /stream calls: time to first token and token rate as clients see them."""
+    results: Results = {}
+    await run_load(lambda index: _stream_once(client, index), 4, 2)
+
+    for concurrency in ([1, 16] if options.quick else [1, 16, 64]):
+        result = await run_load(
+            lambda index: _stream_once(client, index),
+            concurrency * options.scale(8, 3),
+            concurrency
+        )
+        first_tokens = [value[0] for value in result.values]
+        rates = [value[1] for value in result.values]
+        ttft_p50 = percentile(first_tokens, 50) * 1000
+        results[f"stream.c{concurrency}"] = {
+            **latency_stats(first_tokens, "ttft"),
+            "ttft_overhead_p50_ms": round(ttft_p50 - STREAM_FIRST_TOKEN_MS, 3),
+            "tokens_per_second_p50": round(percentile(rates, 50), 2),
+            "tokens_per_second_p05": round(percentile(rates, 5), 2),
+            "errors": len(result.errors)
+        }
+        if result.errors:
+            print(f"  errors: {error_summary(result.errors)}")
+    return results
+
+
+async def _query_load(client: httpx.AsyncClient, path: str, params: Dict[str, Any], total: int) -> Dict[str, Any]:
+    async def call(index: int) -> None:
+        response = await client.get(path, params=params)
+        response.raise_for_status()
+
+    await run_load(call, 3, 1)
+    return _summary(await run_load(call, total, 4))
+
+
+async def prompt_search(client: httpx.AsyncClient, options: Options) -> Results:
+    """Prompt listing and search (GET /prompts) at growing table sizes."""
+    queries = {
+        "text": {"search": "retrieval"},  # Matches most rows
+        "rare": {"search": "zeppelin"},  # Matches one row in 3000
+        "tag": {"tags": ["rag"]},
+        "list": {},
+        "deep_page": {"page": 100}
+    }
+    results: Results = {}
+    for rows in sorted(options.prompt_rows):
+        await asyncio.to_thread(fixtures.seed_prompts, options.engine, rows)
+        for name, params in queries.items():
+            results[f"prompt_search.{rows}.{name}"] = await _query_load(
+                client,
+                PROMPTS,
+                {"page_size": 50, **params},
+                options.scale(50, 15)
+            )
+    return results
+
+
+async def conversation_listing(client: httpx.AsyncClient, options: Options) -> Results:
+    """GET /conversations over a table of options.conversation_rows conversations."""
+    await asyncio.to_thread(fixtures.seed_conversations, options.engine, options.conversation_rows)
+    queries = {
+        "first_page": {"page": 1},
+        "deep_page": {"page": 100},
+        "by_provider": {"llm_model_provider": "simulated"}
+    }
+    return {
+        f"conversations.{name}": await _query_load(
+            client,
+            f"{LLM}/conversations",
+            {"page_size": 50, **params},
+            options.scale(50, 15)
+        )
+        for name, params in queries.items()
+    }
+
+
+def _node(node_id: str, node_type: str, index: int, config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    return {
+        "id": node_id,
+        "type": node_type,
+        "position": {"x": 250 * index, "y": 0},
+        "data": {"label": node_id, "config": config or {}}
+    }
+
+
+def _edge(source: str, target: str) -> Dict[str, Any]:
+    return {"id": f"{source}-{target}", "source": source, "target": target}
+
+
+_LLM_CONFIG = {"provider": "simulated", "model": "bench-workflow", "maxTokens": 64}
+
+
+def linear_workflow() -> Dict[str, Any]:
+    """input -> template -> llm -> output: the common single-call shape."""
+    nodes = [
+        _node("input", "userInput", 0),
+        _node("template", "promptTemplate", 1, {"template": "Answer briefly: {text}"}),
+        _node("llm", "llm", 2, _LLM_CONFIG),
+        _node("output", "output", 3)
+    ]
+    edges = [_edge("input", "template"), _edge("template", "llm"), _edge("llm", "output")]
+    return {"nodes": nodes, "edges": edges}
+
+
+def fan_out_workflow(width: int = 8) -> Dict[str, Any]:
+    """input -> `width` parallel llm calls -> merging template -> output."""
+    nodes = [_node("input", "userInput", 0), _node("merge", "promptTemplate", 2, {"template": "{text}"})]
+    edges = [_edge("merge", "output")]
+    for branch in range(width):
+        node_id = f"llm{branch}"
+        nodes.append(_node(node_id, "llm", 1, {**_LLM_CONFIG, "systemPrompt": f"Perspective {branch}"}))
+        edges += [_edge("input", node_id), _edge(node_id, "merge")]
+    nodes.append(_node("output", "output", 3))
+    return {"nodes": nodes, "edges": edges}
+
+
+def deep_workflow(depth: int = 25) -> Dict[str, Any]:
+    """A chain of `depth` template nodes without LLM calls: per-node engine overhead."""
+    nodes = [_node("input", "userInput", 0)]
+    edges = []
+    previous = "input"
+    for step in range(depth):
+        node_id = f"step{step}"
+        nodes.append(_node(node_id, "promptTemplate", step + 1, {"template": "{text}."}))
+        edges.append(_edge(previous, node_id))
+        previous = node_id
+    nodes.append(_node("output", "output", depth + 1))
+    edges.append(_edge(previous, "output"))
+    return {"nodes": nodes, "edges": edges}
+
+
+WORKFLOW_SHAPES: Dict[str, Callable[[], Dict[str, Any]]] = {
+    "linear": linear_workflow,
+    "fan_out": fan_out_workflow,
+    "deep": deep_workflow
+}
+
+
+async def _execute(client: httpx.AsyncClient, workflow_id: str, index: int, poll_interval: float = 0.01) -> int:
+    """Run a workflow to completion; returns its server-side execution time in ms."""
+    response = await client.post(
+        f"{RAG_BUILDER}/workflows/{workflow_id}/execute",
+        # Distinct inputs and no node cache, so every run does the work
+        json={"inputs": {"input": f"Benchmark run {index}"}, "config": {"use_cache": False}}
+    )
+    response.raise_for_status()
+    execution_id = response.json()["id"]
+
+    while True:
+        await asyncio.sleep(poll_interval)
+        response = await client.get(f"{RAG_BUILDER}/executions/{execution_id}")
+        response.raise_for_status()
+        execution = response.json()
+        if execution["status"] == "completed":
+            return execution["execution_time_ms"] or 0
+        if execution["status"] != "running":
+            raise RuntimeError(f"Execution {execution['status']}: {execution.get('error_message')}")
+
+
+async def workflow_execution(client: httpx.AsyncClient, options: Options) -> Results:
+    """Workflow runs of representative DAG shapes, start to completion, 8 at a time."""
+    results: Results = {}
+    for shape, build in WORKFLOW_SHAPES.items():
+        response = await client.post(
+            f"{RAG_BUILDER}/workflows",
+            json={"name": f"benchmark-{shape}", "description": "Created by the benchmark suite", **build()}
+        )
+        response.raise_for_status()
+        workflow_id = response.json()["id"]
+        try:
+            await run_load(lambda index: _execute(client, workflow_id, index), 4, 2)
+            result = await run_load(lambda index: _execute(client, workflow_id, index), options.scale(160, 24), 8)
+            server_times = [value / 1000 for value in result.values]
+            results[f"workflow.{shape}"] = {
+                **_summary(result, "runs_per_second"),
+                **latency_stats(server_times, "execution")
+            }
+        finally:
+            await client.delete(f"{RAG_BUILDER}/workflows/{workflow_id}")
+    return results
+
+
+# name -> (case, needs the database)
+CASES: Dict[str, Tuple[Callable, bool]] = {
+    "chat": (chat_throughput, False),
+    "stream": (stream_latency, False),
+    "prompt_search": (prompt_search, True),
+    "conversations": (conversation_listing, True),
+    "workflows": (workflow_execution, True)
+}
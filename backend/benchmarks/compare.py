@@ -0,0 +1,95 @@
+# backend/benchmarks/compare.py
+"""
+Regression checks of a results file against a baseline.
+
+thresholds.json maps result-name patterns (fnmatch) to metric limits:
+
+    {"prompt_search.*": {"latency_p95_ms": {"max_ratio": 1.25}}}
+
+`max_ratio`/`min_ratio` bound a metric relative to the baseline's value,
+and `max`/`min` bound it absolutely. `slack` is an absolute amount added
+to the ratio bound, so tiny values (a 2 ms p50) don't fail on noise.
+Every pattern that matches a result applies.
+"""
+from dataclasses import dataclass
+from fnmatch import fnmatch
+from typing import Any, Dict, List, Optional
+import json
+import math
+import os
+
+DEFAULT_THRESHOLDS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "thresholds.json")
+
+
+@dataclass
+class Violation:
+    result: str
+    metric: str
+    value: float
+    limit: float
+    baseline: Optional[float]
+    rule: str
+
+    def __str__(self) -> str:
+        baseline = f" (baseline {self.baseline:g})" if self.baseline is not None else ""
+        return f"{self.result} {self.metric} = {self.value:g} breaks {self.rule} -> limit {self.limit:g}{baseline}"
+
+
+def load(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def check(
+    results: Dict[str, Dict[str, float]],
+    thresholds: Dict[str, Dict[str, Dict[str, float]]],
+    baseline: Optional[Dict[str, Dict[str, float]]] = None
+) -> List[Violation]:
+    """Violations of the thresholds by `results` (both as in results["results"])."""
+    violations: List[Violation] = []
+    for name, metrics in sorted(results.items()):
+        for pattern, limits in thresholds.items():
+            if not fnmatch(name, pattern):
+                continue
+            for metric, rules in limits.items():
+                value = metrics.get(metric)
+                if value is None or math.isnan(value):
+                    continue
+                previous = (baseline or {}).get(name, {}).get(metric)
+                violations.extend(_check_metric(name, metric, value, rules, previous))
+    return violations
+
+
+def _check_metric(name: str, metric: str, value: float, rules: Dict[str, float], previous: Optional[float]) -> List[Violation]:
+    found = []
+    slack = rules.get("slack", 0.0)
+
+    if "max" in rules and value > rules["max"]:
+        found.append(Violation(name, metric, value, rules["max"], previous, "max"))
+    if "min" in rules and value < rules["min"]:
+        found.append(Violation(name, metric, value, rules["min"], previous, "min"))
+
+    if previous is not None and not math.isnan(previous):
+        if "max_ratio" in rules:
+            limit = previous * rules["max_ratio"] + slack
+            if value > limit:
+                found.append(Violation(name, metric, value, limit, previous, f"max_ratio {rules['max_ratio']}"))
+        if "min_ratio" in rules:
+            limit = previous * rules["min_ratio"] - slack
+            if value < limit:
+                found.append(Violation(name, metric, value, limit, previous, f"min_ratio {rules['min_ratio']}"))
+    return found
+
+
+def report(results: Dict[str, Dict[str, float]], baseline: Optional[Dict[str, Dict[str, float]]] = None) -> str:
+    """The results as a table, with the change against the baseline where there is one."""
+    lines = []
+    for name, metrics in sorted(results.items()):
+        lines.append(name)
+        for metric, value in metrics.items():
+            previous = (baseline or {}).get(name, {}).get(metric)
+            change = ""
+            if isinstance(previous, (int, float)) and previous and isinstance(value, (int, float)):
+                change = f"  ({(value - previous) / previous * 100:+.1f}% vs {previous:g})"
+            lines.append(f"  {metric:<28} {value:>12g}{change}")
+    return "\n".join(lines)
@@ -0,0 +1,164 @@
+# backend/benchmarks/harness.py
+"""Load generation, statistics and the server under test."""
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import asyncio
+import math
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_ROOT = os.path.dirname(BENCHMARKS_DIR)
+
+
+def percentile(values: List[float], q: float) -> float:
+    """The q-th percentile (0-100) with linear interpolation."""
+    if not values:
+        return math.nan
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    if lower == upper:
+        return ordered[lower]
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def latency_stats(seconds: List[float], prefix: str = "latency") -> Dict[str, float]:
+    """p50/p95/p99/max of durations, in milliseconds."""
+    milliseconds = [value * 1000 for value in seconds]
+    return {
+        f"{prefix}_p50_ms": round(percentile(milliseconds, 50), 3),
+        f"{prefix}_p95_ms": round(percentile(milliseconds, 95), 3),
+        f"{prefix}_p99_ms": round(percentile(milliseconds, 99), 3),
+        f"{prefix}_max_ms": round(max(milliseconds), 3) if milliseconds else math.nan
+    }
+
+
+@dataclass
+class LoadResult:
+    """Outcome of one load run."""
+    elapsed: float
+    latencies: List[float] = field(default_factory=list)  # Successful calls only
+    values: List[Any] = field(default_factory=list)  # What successful calls returned
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def completed(self) -> int:
+        return len(self.latencies)
+
+    @property
+    def throughput(self) -> float:
+        return self.completed / self.elapsed if self.elapsed else 0.0
+
+
+async def run_load(
+    call: Callable[[int], Awaitable[Any]],
+    total: int,
+    concurrency: int
+) -> LoadResult:
+    """
+    Make `total` calls with at most `concurrency` in flight; `call` gets the
+    call's index. Failures are counted, not raised.
+    """
+    result = LoadResult(elapsed=0.0)
+    indexes = iter(range(total))
+
+    async def worker() -> None:
+        for index in indexes:
+            started = time.perf_counter()
+            try:
+                value = await call(index)
+            except Exception as e:
+                result.errors.append(f"{type(e).__name__}: {e}")
+                continue
+            result.latencies.append(time.perf_counter() - started)
+            result.values.append(value)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, total))))
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+def error_summary(errors: List[str], limit: int = 3) -> Optional[str]:
+    if not errors:
+        return None
+    distinct = sorted(set(errors))
+    return "; ".join(distinct[:limit]) + (f" (+{len(distinct) - limit} more)" if len(distinct) > limit else "")
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def server_env(database_url: str) -> Dict[str, str]:
+    """Settings of a server under test: the given database and simulated LLMs only."""
+    return {
+        "DATABASE_URL": database_url,
+        "DEBUG": "false",
+        "ENABLE_JSON_STORAGE": "false",
+        "SIMULATED_LLM_ENABLED": "true",
+        "SIMULATED_LLM_SEED": "0",
+        "SIMULATED_LLM_PROFILES_PATH": os.path.join(BENCHMARKS_DIR, "profiles.json")
+    }
+
+
+class Server:
+    """
+    The backend under uvicorn in a subprocess, so that the load generator
+    does not share its event loop or CPU time with the server.
+    """
+
+    def __init__(self, env: Dict[str, str], workers: int = 1, startup_timeout: float = 60.0):
+        self.env = env
+        self.workers = workers
+        self.startup_timeout = startup_timeout
+        self.port = _free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self._process: Optional[subprocess.Popen] = None
+
+    async def __aenter__(self) -> "Server":
+        command = [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--host", "127.0.0.1",
+            "--port", str(self.port),
+            "--workers", str(self.workers),
+            "--log-level", "warning",
+            "--no-access-log"
+        ]
+        self._process = subprocess.Popen(command, cwd=BACKEND_ROOT, env={**os.environ, **self.env})
+        await self._wait_until_healthy()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        if self._process is None:
+            return
+        self._process.terminate()
+        try:
+            self._process.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            self._process.kill()
+            self._process.wait()
+
+    async def _wait_until_healthy(self) -> None:
+        deadline = time.monotonic() + self.startup_timeout
+        async with httpx.AsyncClient(base_url=self.url) as client:
+            while time.monotonic() < deadline:
+                if self._process.poll() is not None:
+                    raise RuntimeError(f"Server exited during startup with code {self._process.returncode}")
+                try:
+                    response = await client.get("/api/v1/health")
+                    if response.status_code == 200:
+                        return
+                except httpx.TransportError:
+                    pass
+                await asyncio.sleep(0.2)
+        raise RuntimeError(f"Server did not become healthy within {self.startup_timeout}s")
@@ -0,0 +1,458 @@
+# backend/benchmarks/replay.py
+"""
+Replay captured traffic (TRAFFIC_CAPTURE_PATH) against a build:
+
+    python -m benchmarks.replay capture.jsonl                  # at the recorded pace
+    python -m benchmarks.replay capture.jsonl --speed 4        # 4x the recorded pace
+    python -m benchmarks.replay capture.jsonl --rate 200 --duration 120
+
+Arrivals are open-loop: requests are sent on schedule whether or not
+earlier ones have finished, so a slow server builds a queue instead of
+slowing the load down. Latencies count from the scheduled arrival, which
+includes waiting for one of the --concurrency connection slots; service
+times count from the moment the request was sent. Both are reported per
+route, next to the latencies recorded in the capture.
+
+Requests are rebuilt from their captured shapes. Text placeholders are
+filled with text of the same length, and LLM providers and models are
+rewritten to the simulated provider (--model, --model-map). Path
+parameters are bound to objects created before the replay (a prompt, a
+workflow, a conversation, an execution). DELETE requests with path
+parameters are skipped, since they would delete those objects.
+"""
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import sys
+import time
+import uuid
+
+import httpx
+
+from benchmarks import compare, fixtures
+from benchmarks.cases import LLM, PROMPTS, RAG_BUILDER, linear_workflow
+from benchmarks.harness import Server, error_summary, latency_stats, percentile, server_env
+
+TEXT = "$text"  # The capture's placeholder for sanitized strings
+FILLER = " ".join(fixtures.COMMON_WORDS * 4)
+
+# How faults injected by the simulated provider read in responses and stream frames
+SIMULATED_FAULTS = {
+    "rate_limited": b"Please try again later. (429)",
+    "failed": b"error: simulated failure of"
+}
+
+
+def simulated_fault(body: bytes) -> Optional[str]:
+    """The kind of simulated fault a response body reports, if any."""
+    for kind, marker in SIMULATED_FAULTS.items():
+        if marker in body:
+            return kind
+    return None
+
+
+def load_capture(path: str) -> List[Dict[str, Any]]:
+    """Captured requests in arrival order; malformed lines are skipped."""
+    entries = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(entry, dict) and "route" in entry and "t" in entry:
+                entries.append(entry)
+    entries.sort(key=lambda entry: entry["t"])
+    return entries
+
+
+def fill(value: Any) -> Any:
+    """A captured shape with its placeholders replaced by filler text."""
+    if isinstance(value, dict):
+        if set(value) == {TEXT}:
+            length = value[TEXT]
+            return (FILLER * (length // len(FILLER) + 1))[:length]
+        return {key: fill(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [fill(item) for item in value]
+    return value
+
+
+def simulate_models(value: Any, model: str, model_map: Dict[str, str]) -> Any:
+    """Point every LLM provider/model pair in a request at the simulated provider."""
+    if isinstance(value, list):
+        return [simulate_models(item, model, model_map) for item in value]
+    if not isinstance(value, dict):
+        return value
+    value = {key: simulate_models(item, model, model_map) for key, item in value.items()}
+    if "llm_model_provider" in value:
+        value["llm_model_provider"] = "simulated"
+        value["llm_model_name"] = model_map.get(value.get("llm_model_name"), model)
+    elif "provider" in value and "model" in value:
+        value["provider"] = "simulated"
+        value["model"] = model_map.get(value.get("model"), model)
+    return value
+
+
+@dataclass
+class Request:
+    """One replayable request."""
+    method: str
+    route: str
+    path: str
+    params: Dict[str, Any]
+    body: Any
+    stream: bool
+    recorded_ms: Optional[float]
+
+    @property
+    def key(self) -> str:
+        return f"{self.method} {self.route}"
+
+
+@dataclass
+class RouteStats:
+    latencies: List[float] = field(default_factory=list)
+    service_times: List[float] = field(default_factory=list)
+    first_bytes: List[float] = field(default_factory=list)
+    recorded: List[float] = field(default_factory=list)
+    statuses: Dict[int, int] = field(default_factory=dict)
+    errors: List[str] = field(default_factory=list)
+    simulated: Dict[str, int] = field(default_factory=dict)  # Faults injected by the simulated provider
+    simulated_5xx: int = 0  # Of those, answered with a server error status
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        summary: Dict[str, Any] = {
+            "requests": len(self.latencies) + len(self.errors),
+            "requests_per_second": round(len(self.latencies) / elapsed, 2) if elapsed else 0.0,
+            **latency_stats(self.latencies),
+            **latency_stats(self.service_times, "service")
+        }
+        if self.first_bytes:
+            summary.update(latency_stats(self.first_bytes, "first_byte"))
+        if self.recorded:
+            summary["recorded_p50_ms"] = round(percentile(self.recorded, 50), 3)
+            summary["recorded_p95_ms"] = round(percentile(self.recorded, 95), 3)
+        # Simulated faults answered with a 5xx aren't errors of the server
+        server_errors = sum(count for status, count in self.statuses.items() if status >= 500)
+        summary["errors"] = len(self.errors) + server_errors - self.simulated_5xx
+        summary["simulated_rate_limited"] = self.simulated.get("rate_limited", 0)
+        summary["simulated_failures"] = self.simulated.get("failed", 0)
+        summary["statuses"] = {str(status): count for status, count in sorted(self.statuses.items())}
+        return summary
+
+
+class Replayer:
+    """Rebuilds captured requests and sends them on an open-loop schedule."""
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        concurrency: int,
+        model: str = "sim-fast",
+        model_map: Optional[Dict[str, str]] = None
+    ):
+        self.client = client
+        self.slots = asyncio.Semaphore(concurrency)
+        self.model = model
+        self.model_map = model_map or {}
+        self.bindings: Dict[str, str] = {"provider": "simulated"}
+        self.execution_ids: List[str] = []
+        self.stats: Dict[str, RouteStats] = {}
+        self.skipped: Dict[str, int] = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.max_lag = 0.0
+
+    async def prepare(self) -> None:
+        """Create the objects that path parameters are bound to."""
+        tag = uuid.uuid4().hex[:8]
+
+        response = await self.client.post(PROMPTS, json={
+            "name": f"replay-{tag}",
+            "content": "Answer the question using the context.\n\n{context}\n\n{question}",
+            "description": "Created by the traffic replay",
+            "author": "benchmark"
+        })
+        response.raise_for_status()
+        self.bindings["prompt_id"] = response.json()["id"]
+
+        workflow = linear_workflow()
+        workflow = simulate_models(workflow, self.model, self.model_map)
+        response = await self.client.post(f"{RAG_BUILDER}/workflows", json={"name": f"replay-{tag}", **workflow})
+        response.raise_for_status()
+        self.bindings["workflow_id"] = response.json()["id"]
+
+        response = await self.client.post(
+            f"{RAG_BUILDER}/workflows/{self.bindings['workflow_id']}/execute",
+            json={"inputs": {"input": "Replay warm-up"}}
+        )
+        response.raise_for_status()
+        self.execution_ids.append(response.json()["id"])
+
+        session_id = f"replay-{tag}"
+        response = await self.client.post(f"{LLM}/chat", json={
+            "llm_model_provider": "simulated",
+            "llm_model_name": "sim-instant",
+            "messages": [{"role": "user", "content": "Replay warm-up"}],
+            "session_id": session_id
+        })
+        response.raise_for_status()
+        self.bindings["session_id"] = session_id
+
+    def build(self, entry: Dict[str, Any]) -> Optional[Request]:
+        """The request to send for a captured entry, or None if it can't be replayed."""
+        method, route = entry["method"], entry["route"]
+        path_params = entry.get("path_params") or []
+
+        if method == "DELETE" and path_params:
+            return self._skip(f"{method} {route}")
+        if entry.get("body") is None and entry.get("body_bytes"):
+            # Uploads and other bodies that were not captured as JSON shapes
+            return self._skip(f"{method} {route}")
+
+        path = route
+        for name in path_params:
+            value = self.execution_ids[-1] if name == "execution_id" and self.execution_ids else self.bindings.get(name)
+            if value is None:
+                return self._skip(f"{method} {route}")
+            path = path.replace("{" + name + "}", value)
+
+        params = simulate_models(fill(entry.get("query") or {}), self.model, self.model_map)
+        body = simulate_models(fill(entry["body"]), self.model, self.model_map) if entry.get("body") is not None else None
+        return Request(method, route, path, params, body, bool(entry.get("stream")), entry.get("duration_ms"))
+
+    async def run(self, schedule: Iterator[Tuple[float, Request]]) -> float:
+        """Send each request at its offset (seconds from now); returns the elapsed time."""
+        started = time.perf_counter()
+        tasks = set()
+        for offset, request in schedule:
+            delay = started + offset - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                self.max_lag = max(self.max_lag, -delay)
+            task = asyncio.create_task(self._send(request, started + offset))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks)
+        return time.perf_counter() - started
+
+    async def _send(self, request: Request, scheduled: float) -> None:
+        stats = self.stats.setdefault(request.key, RouteStats())
+        if request.recorded_ms is not None:
+            stats.recorded.append(request.recorded_ms)
+
+        async with self.slots:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            sent = time.perf_counter()
+            try:
+                status, first_byte, fault = await self._exchange(request)
+            except Exception as e:
+                stats.errors.append(f"{type(e).__name__}: {e}")
+                return
+            finally:
+                self.in_flight -= 1
+
+        finished = time.perf_counter()
+        stats.statuses[status] = stats.statuses.get(status, 0) + 1
+        if fault is not None:
+            stats.simulated[fault] = stats.simulated.get(fault, 0) + 1
+            if status >= 500:
+                stats.simulated_5xx += 1
+        stats.latencies.append(finished - scheduled)
+        stats.service_times.append(finished - sent)
+        if first_byte is not None:
+            stats.first_bytes.append(first_byte - sent)
+
+    async def _exchange(self, request: Request) -> Tuple[int, Optional[float], Optional[str]]:
+        """Status, time of the first streamed byte and simulated fault of one request."""
+        kwargs: Dict[str, Any] = {"params": request.params}
+        if request.body is not None:
+            kwargs["json"] = request.body
+
+        if not request.stream:
+            response = await self.client.request(request.method, request.path, **kwargs)
+            self._remember_execution(request, response)
+            fault = simulated_fault(response.content) if response.status_code >= 500 else None
+            return response.status_code, None, fault
+
+        first_byte = None
+        fault = None
+        tail = b""  # A marker may straddle two chunks
+        async with self.client.stream(request.method, request.path, **kwargs) as response:
+            async for chunk in response.aiter_raw():
+                if chunk and first_byte is None:
+                    first_byte = time.perf_counter()
+                if fault is None:
+                    fault = simulated_fault(tail + chunk)
+                    tail = chunk[-64:]
+        return response.status_code, first_byte, fault
+
+    def _remember_execution(self, request: Request, response: httpx.Response) -> None:
+        if request.route.endswith("/execute") and response.status_code == 200:
+            self.execution_ids.append(response.json()["id"])
+            del self.execution_ids[:-100]
+
+    def _skip(self, key: str) -> None:
+        self.skipped[key] = self.skipped.get(key, 0) + 1
+        return None
+
+
+def recorded_schedule(
+    requests: List[Tuple[float, Request]],
+    speed: float,
+    duration: Optional[float]
+) -> Iterator[Tuple[float, Request]]:
+    """The captured arrivals at `speed` times their pace, looped until `duration` if given."""
+    if not requests:
+        return
+    last = requests[-1][0]
+    # Each loop starts one average gap after the previous one's last request
+    period = last + (last / (len(requests) - 1) if len(requests) > 1 else 1.0)
+    for loop in itertools.count():
+        for offset, request in requests:
+            at = (offset + loop * period) / speed
+            if duration is not None and at >= duration:
+                return
+            yield at, request
+        if duration is None:
+            return
+
+
+def poisson_schedule(
+    requests: List[Tuple[float, Request]],
+    rate: float,
+    duration: float,
+    seed: int = 0
+) -> Iterator[Tuple[float, Request]]:
+    """Poisson arrivals at `rate` per second, drawing requests from the captured mix."""
+    rng = random.Random(seed)
+    at = 0.0
+    while requests:
+        at += rng.expovariate(rate)
+        if at >= duration:
+            return
+        yield at, rng.choice(requests)[1]
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.replay", description="Replay captured traffic")
+    parser.add_argument("capture", help="JSON lines written with TRAFFIC_CAPTURE_PATH")
+    parser.add_argument("--speed", type=float, default=1.0, help="Multiple of the recorded arrival rate")
+    parser.add_argument("--rate", type=float, help="Poisson arrivals per second instead of the recorded timing")
+    parser.add_argument("--duration", type=float, help="Seconds to replay; the capture loops (default: once through)")
+    parser.add_argument("--concurrency", type=int, default=256, help="Maximum requests in flight")
+    parser.add_argument("--model", default="sim-fast", help="Simulated model replacing recorded ones (sim-fast injects no faults)")
+    parser.add_argument("--model-map", default="", help="Per-model replacements, e.g. gpt-4.1=sim-slow,gpt-4.1-mini=sim-fast")
+    parser.add_argument("--routes", nargs="*", help="Only replay these route templates")
+    parser.add_argument("--url", help="Replay against a running server instead of starting one")
+    parser.add_argument("--database-url", help="Database of the started server (default: DATABASE_URL's + _benchmark)")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers of the started server")
+    parser.add_argument("--output", default="replay-results.json")
+    parser.add_argument("--baseline", help="Earlier replay results to compare against")
+    parser.add_argument("--thresholds", default=compare.DEFAULT_THRESHOLDS)
+    args = parser.parse_args(argv)
+    if args.rate is not None and args.duration is None:
+        parser.error("--rate needs --duration")
+    return args
+
+
+async def replay(args: argparse.Namespace) -> Dict[str, Any]:
+    entries = load_capture(args.capture)
+    if args.routes:
+        entries = [entry for entry in entries if entry["route"] in args.routes]
+    if not entries:
+        raise SystemExit(f"No replayable requests in {args.capture}")
+    model_map = dict(pair.split("=", 1) for pair in args.model_map.split(",") if "=" in pair)
+
+    server = nullcontext()
+    if not args.url:
+        database_url = fixtures.benchmark_database_url(args.database_url)
+        fixtures.prepare_database(database_url).dispose()
+        server = Server(server_env(database_url), workers=args.workers)
+
+    async with server:
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=args.url or server.url, timeout=300, limits=limits) as client:
+            replayer = Replayer(client, args.concurrency, args.model, model_map)
+            await replayer.prepare()
+
+            first = entries[0]["t"]
+            requests = []
+            for entry in entries:
+                request = replayer.build(entry)
+                if request is not None:
+                    requests.append((entry["t"] - first, request))
+
+            if args.rate is not None:
+                schedule = poisson_schedule(requests, args.rate, args.duration)
+            else:
+                schedule = recorded_schedule(requests, args.speed, args.duration)
+            print(f"Replaying {len(requests)} captured requests ({sum(replayer.skipped.values())} skipped)")
+            elapsed = await replayer.run(schedule)
+
+    results = {
+        f"replay.{key}": stats.summary(elapsed)
+        for key, stats in sorted(replayer.stats.items())
+    }
+    total = sum(result["requests"] for result in results.values())
+    for key, stats in replayer.stats.items():
+        if stats.errors:
+            print(f"  {key} errors: {error_summary(stats.errors)}")
+        if stats.simulated:
+            print(f"  {key} simulated faults: {stats.simulated}")
+
+    return {
+        "meta": {
+            "capture": args.capture,
+            "mode": f"poisson {args.rate}/s" if args.rate is not None else f"recorded x{args.speed}",
+            "duration_s": round(elapsed, 3),
+            "requests": total,
+            "throughput_rps": round(total / elapsed, 2) if elapsed else 0.0,
+            "concurrency": args.concurrency,
+            "max_in_flight": replayer.max_in_flight,
+            "max_schedule_lag_ms": round(replayer.max_lag * 1000, 3),
+            "skipped": replayer.skipped,
+            "target": args.url or "local",
+            "workers": args.workers
+        },
+        "results": results
+    }
+
+
+def main(argv: List[str]) -> int:
+    args = parse_args(argv)
+    current = asyncio.run(replay(args))
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(current, f, indent=2)
+        f.write("\n")
+
+    baseline = compare.load(args.baseline)["results"] if args.baseline else None
+    numeric = {
+        name: {metric: value for metric, value in result.items() if isinstance(value, (int, float))}
+        for name, result in current["results"].items()
+    }
+    print(compare.report(numeric, baseline))
+    meta = current["meta"]
+    print(
+        f"{meta['requests']} requests in {meta['duration_s']}s ({meta['throughput_rps']}/s), "
+        f"at most {meta['max_in_flight']} in flight, schedule lag up to {meta['max_schedule_lag_ms']} ms"
+    )
+    print(f"Results written to {args.output}")
+
+    violations = compare.check(numeric, compare.load(args.thresholds), baseline)
+    for violation in violations:
+        print(f"❌ {violation}")
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,56 @@
+import asyncio
+
+from app.core.config import settings
+
+from app.services.workflow.batch import WorkflowBatchRunner
+from app.services.workflow.compiler import CompiledNode, ExecutionPlan
+from app.services.workflow.node_handlers import NodeHandler
+from app.services.workflow.run_control import RunControl, RunLimits
+
+
+def charging_plan(tokens: int) -> ExecutionPlan:
+    async def llm_like(ctx):
+        ctx.charge(tokens)
+        return {"text": "done"}
+
+    node = CompiledNode(
+        id="llm",
+        type="llm",
+        config={},
+        config_hash="llm",
+        handler=NodeHandler(llm_like, cacheable=False),
+        upstream=(),
+        downstream=()
+    )
+    return ExecutionPlan(nodes={"llm": node}, order=("llm",), dependency_counts={"llm": 0}, sinks=frozenset({"llm"}))
+
+
+def run_batch(plan: ExecutionPlan, rows: int, config: dict):
+    async def main():
+        control = RunControl(RunLimits.for_batch(config))
+        runner = WorkflowBatchRunner(None, "batch", plan, control, config)
+        messages = []
+
+        async def emit(message):
+            messages.append(message)
+
+        summary = await runner.run([({"row": number}, None) for number in range(rows)], emit)
+        return summary, messages
+
+    return asyncio.run(main())
+
+
+def test_token_budget_applies_per_row_not_to_the_whole_batch():
+    # Together the rows use more tokens than one run may (WORKFLOW_MAX_TOKENS)
+    tokens = settings.WORKFLOW_MAX_TOKENS // 10
+    summary, messages = run_batch(charging_plan(tokens), 30, {"use_cache": False})
+    assert summary["completed"] == 30
+    assert summary["failed"] == 0
+    assert summary["tokens_used"] == 30 * tokens
+
+
+def test_row_over_its_own_budget_fails_alone():
+    summary, messages = run_batch(charging_plan(1000), 5, {"row_max_tokens": 500, "use_cache": False})
+    assert summary["completed"] == 0
+    assert summary["failed"] == 5
+    assert all("Row exceeded its budget of 500 tokens" in message["error"] for message in messages)
@@ -0,0 +1,20 @@
+from app.services.conversation_service import _last_message_at
+
+
+def test_last_message_at_compares_mixed_timestamp_formats():
+    zulu = [{"role": "user", "timestamp": "2024-05-01T10:00:00Z"}]
+    offset = [{"role": "user", "timestamp": "2024-05-01T11:30:00+02:00"}]
+    naive = [{"role": "user", "timestamp": "2024-05-01T09:59:59.500000"}]
+
+    assert _last_message_at(offset) < _last_message_at(naive) < _last_message_at(zulu)
+
+
+def test_last_message_at_skips_missing_and_malformed_timestamps():
+    messages = [
+        {"role": "user", "timestamp": "2024-05-01T10:00:00"},
+        {"role": "assistant", "timestamp": "yesterday"},
+        {"role": "assistant"},
+    ]
+
+    assert _last_message_at(messages) > _last_message_at([])
+    assert _last_message_at(messages).isoformat() == "2024-05-01T10:00:00+00:00"
@@ -0,0 +1,62 @@
+import asyncio
+import json
+
+from app.services.workflow.event_hub import Subscriber, execution_hub
+
+
+class FakeWebSocket:
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.sent = []
+        self.closed_with = None
+
+    async def send_text(self, text: str) -> None:
+        if self.fail:
+            raise RuntimeError("socket gone")
+        self.sent.append(json.loads(text))
+
+    async def close(self, code: int = 1000) -> None:
+        self.closed_with = code
+
+
+def test_appended_deltas_are_merged_when_sent():
+    async def main():
+        websocket = FakeWebSocket()
+        subscriber = Subscriber(websocket, max_queue=10)
+        for token in ["Hel", "lo", " world"]:
+            subscriber.offer(json.dumps({"type": "node_partial", "delta": token}), "node-1", False, append=True)
+        await asyncio.sleep(0.01)
+        subscriber.close()
+        return websocket.sent
+
+    assert asyncio.run(main()) == [{"type": "node_partial", "delta": "Hello world"}]
+
+
+def test_subscriber_too_far_behind_is_closed_with_1013():
+    async def main():
+        websocket = FakeWebSocket()
+        subscriber = execution_hub.subscribe("behind", websocket)
+        subscriber.max_queue = 1
+        subscriber.offer(json.dumps({"type": "execution_start"}), droppable=False)
+        subscriber.offer(json.dumps({"type": "execution_complete"}), droppable=False)
+        await asyncio.sleep(0.01)
+        return subscriber, websocket
+
+    subscriber, websocket = asyncio.run(main())
+    assert subscriber.closed
+    assert websocket.closed_with == Subscriber.CLOSE_BEHIND
+    assert "behind" not in execution_hub.subscriptions
+
+
+def test_failed_send_closes_the_socket_with_1011():
+    async def main():
+        websocket = FakeWebSocket(fail=True)
+        subscriber = execution_hub.subscribe("failing", websocket)
+        subscriber.offer(json.dumps({"type": "node_update"}))
+        await asyncio.sleep(0.01)
+        return subscriber, websocket
+
+    subscriber, websocket = asyncio.run(main())
+    assert subscriber.closed
+    assert websocket.closed_with == Subscriber.CLOSE_SEND_FAILED
+    assert "failing" not in execution_hub.subscriptions
@@ -0,0 +1,27 @@
+import json
+
+from app.core.config import settings
+from app.services.model_registry import ModelRegistry
+
+
+def _write(path, provider, names):
+    path.write_text(json.dumps({"provider": provider, "models": [
+        {"name": name, "description": name, "max_tokens": 1024, "parameters": {}} for name in names
+    ]}))
+
+
+def test_simulated_models_are_listed_only_when_enabled(tmp_path, monkeypatch):
+    _write(tmp_path / "openai.json", "openai", ["gpt-4.1"])
+    _write(tmp_path / "simulated.json", "simulated", ["sim-fast", "sim-standard"])
+
+    monkeypatch.setattr(settings, "SIMULATED_LLM_ENABLED", False)
+    registry = ModelRegistry(str(tmp_path))
+    assert [model.name for model in registry.models()] == ["gpt-4.1"]
+    assert registry.models("simulated") == ()
+    assert not registry.knows("sim-fast")
+    assert b"sim-fast" not in registry.payload().body
+
+    monkeypatch.setattr(settings, "SIMULATED_LLM_ENABLED", True)
+    registry = ModelRegistry(str(tmp_path))
+    assert [model.name for model in registry.models("simulated")] == ["sim-fast", "sim-standard"]
+    assert registry.knows("sim-standard")
@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta, timezone
+import uuid
+
+import pytest
+
+from app.services.prompt_version_store import PromptVersionStore, apply_delta, compute_delta
+
+
+@pytest.mark.parametrize("base, target", [
+    ("", ""),
+    ("", "one\ntwo\n"),
+    ("one\ntwo\n", ""),
+    ("one\ntwo\nthree\n", "one\ntwo\nthree\n"),
+    ("one\ntwo\nthree", "one\ntwo\nthree\n"),
+    ("one\ntwo\nthree\n", "one\ntwo\nthree"),
+    ("one\ntwo\nthree\n", "one\n2\nthree\nfour\n"),
+    ("header\nbody\nfooter", "body\nfooter\nnew footer"),
+    ("crlf\r\nlines\r\n", "crlf\r\nchanged\r\n"),
+    ("no newline at all", "still none"),
+])
+def test_round_trip(base, target):
+    assert apply_delta(base, compute_delta(base, target)) == target
+
+
+def test_identical_texts_copy_everything():
+    text = "one\ntwo\nthree\n"
+    assert compute_delta(text, text) == [[0, 3]]
+
+
+def test_empty_texts_need_no_operations():
+    assert compute_delta("", "") == []
+    assert apply_delta("anything\n", []) == ""
+
+
+def test_unchanged_lines_are_copied_not_inserted():
+    base = "".join(f"line {i}\n" for i in range(100))
+    target = base.replace("line 50\n", "line fifty\n")
+    delta = compute_delta(base, target)
+    assert delta == [[0, 50], "line fifty\n", [51, 100]]
+    assert apply_delta(base, delta) == target
+
+
+class _EmptyQuery:
+    """Query of a database holding no prompts yet."""
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    def all(self):
+        return []
+
+    def update(self, *args, **kwargs):
+        return 0
+
+
+class _EmptySession:
+    def query(self, *entities):
+        return _EmptyQuery()
+
+
+def test_only_the_newest_delta_version_is_searchable_by_content():
+    started = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    body = "".join(f"Step {i}: do the thing carefully.\n" for i in range(40))
+    rows = [
+        {"id": uuid.uuid4(), "name": "guide", "content": body + f"Version {n}\n", "created_at": started + timedelta(seconds=n)}
+        for n in range(3)
+    ]
+    PromptVersionStore(_EmptySession()).assign_imported(rows, set())
+
+    snapshot, older, newest = rows
+    assert snapshot["base_prompt_id"] is None and snapshot["content"] is not None
+    assert older["base_prompt_id"] == newest["base_prompt_id"] == snapshot["id"]
+    # Content search reads content and search_content: the older delta has neither
+    assert older["content"] is None and older["search_content"] is None
+    assert newest["content"] is None and newest["search_content"] == body + "Version 2\n"
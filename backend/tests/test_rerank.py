@@ -0,0 +1,46 @@
+import asyncio
+from typing import List, Tuple
+
+from app.services.retrieval.rerank import PairScorer, Reranker
+
+
+class CountingScorer(PairScorer):
+    model_key = "test"
+
+    def __init__(self):
+        self.batches: List[int] = []
+
+    async def score(self, query: str, passages: List[str]) -> Tuple[List[float], int]:
+        self.batches.append(len(passages))
+        return [0.9] * len(passages), 0
+
+
+def documents(count: int):
+    return [{"id": f"doc-{count}-{number}", "text": f"passage {number}"} for number in range(count)]
+
+
+def test_without_threshold_all_candidates_go_in_one_call():
+    scorer = CountingScorer()
+    result = asyncio.run(Reranker(scorer, batch_size=24).rerank("one call", documents(100), top_k=5))
+    assert scorer.batches == [100]
+    assert result.round_trips == 1
+    assert not result.early_exit
+
+
+def test_threshold_scores_in_batches_and_stops_early():
+    scorer = CountingScorer()
+    result = asyncio.run(
+        Reranker(scorer, batch_size=24).rerank("early exit", documents(100), top_k=5, threshold=0.5)
+    )
+    assert scorer.batches == [24]
+    assert result.early_exit
+    assert len(result.documents) == 5
+
+
+def test_cached_scores_are_not_requested_again():
+    scorer = CountingScorer()
+    reranker = Reranker(scorer)
+    asyncio.run(reranker.rerank("cached", documents(10), top_k=3))
+    result = asyncio.run(reranker.rerank("cached", documents(10), top_k=3))
+    assert scorer.batches == [10]
+    assert result.cache_hits == 10
@@ -0,0 +1,119 @@
+import math
+
+import numpy as np
+import pytest
+
+from app.services.retrieval.bm25 import BM25Index
+from app.services.retrieval.fusion import reciprocal_rank_fusion
+from app.services.retrieval.index import HybridIndex
+from app.services.retrieval.vector import VectorIndex
+
+
+def test_bm25_matches_the_okapi_formula():
+    index = BM25Index(k1=1.2, b=0.75)
+    index.add("apple banana")
+    index.add("apple apple cherry")
+    index.add("durian")
+    scores, matched = index.scores("apple")
+
+    average = 6 / 3
+    idf = math.log(1 + (3 - 2 + 0.5) / (2 + 0.5))
+    expected = [
+        idf * 1 * 2.2 / (1 + 1.2 * (0.25 + 0.75 * 2 / average)),
+        idf * 2 * 2.2 / (2 + 1.2 * (0.25 + 0.75 * 3 / average)),
+        0.0,
+    ]
+    assert scores.tolist() == pytest.approx(expected, rel=1e-5)
+    assert matched.tolist() == [0, 1]
+
+
+def test_bm25_prefers_rare_terms_and_short_documents():
+    index = BM25Index()
+    for text in ["common words here", "common rare", "common", "other text"]:
+        index.add(text)
+
+    assert [doc_id for doc_id, _ in index.search("common rare", top_k=2)] == [1, 2]
+    mask = np.array([True, False, True, True])
+    assert [doc_id for doc_id, _ in index.search("common rare", top_k=2, mask=mask)] == [2, 0]
+    assert index.search("missing", top_k=3) == []
+
+
+def test_bm25_removed_documents_leave_the_statistics():
+    index = BM25Index()
+    index.add("alpha beta")
+    index.add("alpha gamma")
+    index.add("delta")
+    index.remove(1, "alpha gamma")
+    index.remove(1, "alpha gamma")  # Removing twice counts once
+
+    fresh = BM25Index()
+    fresh.add("alpha beta")
+    fresh.add("delta")
+
+    assert len(index) == 2
+    assert index.document_frequency("alpha") == 1
+    assert index.document_frequency("gamma") == 0
+    assert index.scores("alpha")[0][0] == pytest.approx(fresh.scores("alpha")[0][0])
+
+
+def test_hybrid_index_deleted_and_superseded_chunks_leave_bm25():
+    index = HybridIndex("test")
+    index.add([
+        {"id": "a", "text": "alpha beta"},
+        {"id": "b", "text": "alpha gamma"},
+        {"id": "c", "text": "delta"},
+    ])
+    index.delete(["b"])
+    index.add([{"id": "a", "text": "epsilon"}])
+
+    assert len(index) == 2
+    assert index.bm25.document_frequency("alpha") == 0
+    assert index.search("alpha", strategy="keyword") == []
+    assert [hit.id for hit in index.search("epsilon", strategy="keyword")] == ["a"]
+
+
+def test_rrf_sums_weighted_reciprocal_ranks():
+    fused = dict(reciprocal_rank_fusion([[1, 2, 3], [3, 1]], k=60))
+    assert fused[1] == pytest.approx(1 / 61 + 1 / 62)
+    assert fused[2] == pytest.approx(1 / 62)
+    assert fused[3] == pytest.approx(1 / 63 + 1 / 61)
+
+    weighted = reciprocal_rank_fusion([[1, 2], [2, 1]], k=1, weights=[2.0, 1.0])
+    assert [doc_id for doc_id, _ in weighted] == [1, 2]
+    assert weighted[0][1] == pytest.approx(2 / 2 + 1 / 3)
+
+
+def test_rrf_orders_documents_found_by_both_lists_first():
+    fused = reciprocal_rank_fusion([[1, 2, 3], [4, 3, 5]])
+    assert fused[0][0] == 3
+    assert reciprocal_rank_fusion([]) == []
+
+
+def test_exact_vector_search_returns_cosine_similarities():
+    index = VectorIndex(2)
+    index.add(np.array([[1, 0], [0, 2], [1, 1]], dtype=np.float32))
+    results = index.search(np.array([3, 0]), top_k=2)
+    assert [vector_id for vector_id, _ in results] == [0, 2]
+    assert [score for _, score in results] == pytest.approx([1.0, math.sqrt(0.5)])
+    assert index.search(np.array([0, 0]), top_k=2) == []
+
+
+def test_ivf_search_recalls_most_exact_neighbours():
+    rng = np.random.default_rng(42)
+    centers = rng.normal(size=(20, 16))
+    vectors = centers[rng.integers(0, 20, size=4000)] + 0.1 * rng.normal(size=(4000, 16))
+    queries = centers[rng.integers(0, 20, size=50)] + 0.1 * rng.normal(size=(50, 16))
+
+    exact = VectorIndex(16, ivf_min_size=10 ** 9)
+    exact.add(vectors)
+    ivf = VectorIndex(16, ivf_min_size=1000, nprobe=8)
+    ivf.add(vectors)
+
+    recalled = 0
+    for query in queries:
+        truth = {vector_id for vector_id, _ in exact.search(query, top_k=10)}
+        found = {vector_id for vector_id, _ in ivf.search(query, top_k=10)}
+        recalled += len(truth & found)
+
+    assert ivf._centroids is not None
+    assert recalled / (10 * len(queries)) >= 0.9
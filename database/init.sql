@@ -1,4 +1,8 @@
 -- ROAD Platform Database Initialization
+--
+-- Base schema only. Later changes live in database/migrations and are
+-- applied on top of it by backend/app/db/migrations.py, starting with
+-- 003; none are recorded as applied here.
 
 -- Create database (if not using docker-compose default)
 -- CREATE DATABASE road_db;
@@ -6,6 +10,12 @@
 -- Enable UUID extension
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
 
+-- Migrations applied since this base schema (see database/migrations)
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version VARCHAR(255) PRIMARY KEY,
+    applied_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
 -- Prompts table for storing prompt templates and versions
 CREATE TABLE IF NOT EXISTS prompts (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
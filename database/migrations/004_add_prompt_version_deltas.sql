@@ -0,0 +1,21 @@
+-- Migration: Add delta-compressed prompt version storage
+-- Date: 2026-10-19
+-- Description: Store prompt versions as periodic full snapshots plus line deltas
+
+-- Delta rows keep their text in content_delta instead of content
+ALTER TABLE prompts ALTER COLUMN content DROP NOT NULL;
+ALTER TABLE prompts ADD COLUMN IF NOT EXISTS content_delta JSONB;
+ALTER TABLE prompts ADD COLUMN IF NOT EXISTS base_prompt_id UUID REFERENCES prompts(id);
+
+-- Every row is either a snapshot or a delta against a snapshot
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint WHERE conname = 'chk_prompts_content_or_delta'
+    ) THEN
+        ALTER TABLE prompts ADD CONSTRAINT chk_prompts_content_or_delta
+            CHECK (content IS NOT NULL OR (content_delta IS NOT NULL AND base_prompt_id IS NOT NULL));
+    END IF;
+END $$;
+
+CREATE INDEX IF NOT EXISTS idx_prompts_base_prompt_id ON prompts(base_prompt_id);
@@ -0,0 +1,13 @@
+-- Migration: Enforce unique prompt name/version pairs
+-- Date: 2026-10-19
+-- Description: Bulk prompt imports upsert with ON CONFLICT (name, version),
+-- which requires a unique constraint on databases created without init.sql
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint WHERE conname = 'prompts_name_version_key'
+    ) THEN
+        ALTER TABLE prompts ADD CONSTRAINT prompts_name_version_key UNIQUE (name, version);
+    END IF;
+END $$;
@@ -0,0 +1,12 @@
+-- Migration: Add workflow node output cache
+-- Date: 2026-10-19
+-- Description: Persistent backing for memoized node outputs used by incremental re-execution
+
+CREATE TABLE IF NOT EXISTS node_output_cache (
+    cache_key VARCHAR(64) PRIMARY KEY,
+    node_type VARCHAR(100) NOT NULL,
+    output_data JSONB NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_node_output_cache_created_at ON node_output_cache(created_at);
@@ -0,0 +1,18 @@
+-- Migration: Add ingestion manifest
+-- Date: 2026-10-19
+-- Description: Per-source content hashes and chunk ids for incremental document ingestion
+
+CREATE TABLE IF NOT EXISTS ingestion_manifest (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    index_name VARCHAR(255) NOT NULL,
+    index_generation VARCHAR(64) NOT NULL,
+    source_path TEXT NOT NULL,
+    content_hash VARCHAR(64) NOT NULL,
+    mtime BIGINT NOT NULL,
+    size BIGINT NOT NULL,
+    chunk_ids JSONB NOT NULL DEFAULT '[]',
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT ingestion_manifest_index_source_key UNIQUE (index_name, source_path)
+);
+
+CREATE INDEX IF NOT EXISTS idx_ingestion_manifest_index_name ON ingestion_manifest(index_name);
@@ -0,0 +1,25 @@
+-- Migration: Add file uploads
+-- Date: 2026-10-19
+-- Description: State of chunked, resumable uploads and their content-addressed files
+
+CREATE TABLE IF NOT EXISTS file_uploads (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    filename VARCHAR(255) NOT NULL,
+    content_type VARCHAR(255),
+    size BIGINT,
+    received_bytes BIGINT NOT NULL DEFAULT 0,
+    status VARCHAR(50) NOT NULL DEFAULT 'uploading',
+    sha256 VARCHAR(64),
+    storage_path TEXT,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    completed_at TIMESTAMP WITH TIME ZONE
+);
+
+CREATE INDEX IF NOT EXISTS idx_file_uploads_sha256 ON file_uploads(sha256);
+
+DROP TRIGGER IF EXISTS update_file_uploads_updated_at ON file_uploads;
+CREATE TRIGGER update_file_uploads_updated_at 
+    BEFORE UPDATE ON file_uploads 
+    FOR EACH ROW 
+    EXECUTE FUNCTION update_updated_at_column();
@@ -0,0 +1,5 @@
+-- Migration: Record split settings in the ingestion manifest
+-- Date: 2026-10-19
+-- Description: Sources split with other chunk settings are re-ingested
+
+ALTER TABLE ingestion_manifest ADD COLUMN IF NOT EXISTS split_hash VARCHAR(64);
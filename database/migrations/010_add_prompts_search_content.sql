@@ -0,0 +1,7 @@
+-- Migration: Keep the newest prompt version searchable
+-- Date: 2026-10-19
+-- Description: Full text of the newest version of a prompt name while it is
+-- stored as a delta, so that content search finds it. Fill it for existing
+-- prompts with: python -m app.services.prompt_version_store --index-latest
+
+ALTER TABLE prompts ADD COLUMN IF NOT EXISTS search_content TEXT;
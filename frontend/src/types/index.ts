@@ -48,7 +48,7 @@ export interface PromptUpdate {
 }
 
 // LLM types
-export type LLMProviderType = 'openai' | 'anthropic' | 'google' | 'groq' | 'huggingface'
+export type LLMProviderType = 'openai' | 'anthropic' | 'google' | 'groq' | 'huggingface' | 'simulated'
 
 export interface LLMProvider {
   id: string